@@ -1,13 +1,35 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+import asyncio
+import re
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from cocbot.config import settings
+from cocbot.db.backup import read_status as read_backup_status
+from cocbot.runtime.metrics import read_snapshot
+from cocbot.runtime.profiler import read_index
+from cocbot.runtime.roll_feed import RollFeedHub
+from cocbot.runtime.roll_history import load_dump, summarize
+
+# live roll feed: the bot sends each roll to this process over local UDP (see /live)
+feed = RollFeedHub(client_queue=settings.FEED_CLIENT_QUEUE, replay=settings.FEED_REPLAY)
+_KEEPALIVE_S = 15.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.FEED_PORT > 0:
+        await feed.start(settings.FEED_HOST, settings.FEED_PORT)
+    yield
+    feed.close()
 
-app = FastAPI(title="CoC Dice Bot Dashboard")
+
+app = FastAPI(title="CoC Dice Bot Dashboard", lifespan=lifespan)
 
 templates_dir = settings.ROOT / "apps" / "dashboard" / "templates"
 static_dir = settings.ROOT / "apps" / "dashboard" / "static"
@@ -22,6 +44,99 @@ if static_dir.exists():
 async def home(request: Request):
     # temporary placeholder page so we know it's running
     return templates.TemplateResponse(
+        request,
         "index.html",
-        {"request": request, "db_path": str(settings.DB_PATH)},
+        {
+            "db_path": str(settings.DB_PATH),
+            "backup": read_backup_status(settings.RUNTIME_DIR / "backup.json"),
+        },
+    )
+
+
+@app.get("/metrics", response_class=JSONResponse)
+async def metrics_snapshot():
+    # latest snapshot written by the bot (counters incl. rate limiting, command timings)
+    return read_snapshot(settings.RUNTIME_DIR / "metrics.json")
+
+
+@app.get("/backups", response_class=JSONResponse)
+async def backup_status():
+    # last online-backup runs (duration, pages/s, sizes) and the snapshots on disk
+    return read_backup_status(settings.RUNTIME_DIR / "backup.json")
+
+
+@app.get("/rolls", response_class=JSONResponse)
+async def rolls():
+    # summary of the bot's in-memory roll buffer (memory-mapped dump, no copy)
+    dump = load_dump(settings.RUNTIME_DIR / "rolls.bin")
+    if dump is None:
+        return {"buffered": 0}
+    return summarize(dump["columns"], capacity=dump["capacity"], total=dump["count"])
+
+
+@app.get("/rolls.bin")
+async def rolls_raw():
+    # raw columnar dump for offline analysis (see cocbot.runtime.roll_history.load_dump)
+    path = settings.RUNTIME_DIR / "rolls.bin"
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="No roll history yet")
+    return FileResponse(path, media_type="application/octet-stream", filename="rolls.bin")
+
+
+@app.get("/live", response_class=HTMLResponse)
+async def live(request: Request, guild: str | None = None):
+    # second-screen view of the table's rolls, fed by /feed
+    return templates.TemplateResponse(
+        request, "live.html", {"db_path": str(settings.DB_PATH), "guild": guild}
+    )
+
+
+@app.get("/feed")
+async def feed_stream(request: Request, guild: str | None = None):
+    """
+    Server-sent events, one `roll` event per check the bot makes (optionally
+    only for one guild). Starts with the most recent rolls; a reconnecting
+    EventSource resumes after its Last-Event-ID.
+    """
+    last_id = request.headers.get("last-event-id", "")
+    client = feed.subscribe(guild, int(last_id) if last_id.isdigit() else None)
+
+    async def frames():
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(client.queue.get(), _KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            feed.unsubscribe(client)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+@app.get("/feed/stats", response_class=JSONResponse)
+async def feed_stats():
+    # viewers connected, events received from the bot, frames dropped for slow viewers
+    return feed.stats()
+
+
+_PROFILE_ID = re.compile(r"^[\w.-]+$")
+
+
+@app.get("/profiles", response_class=JSONResponse)
+async def profiles():
+    # slowest command invocations captured by the bot (COC_PROFILE=1), with DB query timings
+    return read_index(settings.RUNTIME_DIR / "profiles")
+
+
+@app.get("/profiles/{profile_id}.folded")
+async def profile_folded(profile_id: str):
+    # collapsed stacks: feed to flamegraph.pl, speedscope or inferno
+    path = settings.RUNTIME_DIR / "profiles" / f"{profile_id}.folded"
+    if not _PROFILE_ID.match(profile_id) or not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+
+# Offline stand-ins for the parts of discord.Interaction our command callbacks touch.
+# Good enough to drive /roll, /check and /setchar without a gateway connection.
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class SentMessage:
+    content: Optional[str]
+    embed: Any = None
+    view: Any = None
+    ephemeral: bool = False
+    at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def is_error(self) -> bool:
+        return bool(self.content) and self.content.startswith("❌")
+
+
+@dataclass
+class FakeUser:
+    id: int
+    display_name: str
+
+    @property
+    def name(self) -> str:
+        return self.display_name
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, *, thinking: bool = False, ephemeral: bool = False) -> None:
+        self._done = True
+
+    async def send_message(
+        self,
+        content: Optional[str] = None,
+        *,
+        embed: Any = None,
+        view: Any = None,
+        ephemeral: bool = False,
+        **_: Any,
+    ) -> None:
+        self._done = True
+        self._interaction.sent.append(SentMessage(content, embed, view, ephemeral))
+
+    async def edit_message(self, *, content: Optional[str] = None, embed: Any = None, view: Any = None, **_: Any) -> None:
+        self._done = True
+        self._interaction.sent.append(SentMessage(content, embed, view))
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+
+    async def send(
+        self,
+        content: Optional[str] = None,
+        *,
+        embed: Any = None,
+        view: Any = None,
+        ephemeral: bool = False,
+        **_: Any,
+    ) -> None:
+        self._interaction.sent.append(SentMessage(content, embed, view, ephemeral))
+
+
+class FakeInteraction:
+    """
+    Minimal discord.Interaction look-alike. Everything the bot sends back is
+    collected in `sent` so a harness can inspect or time it.
+    """
+
+    def __init__(
+        self,
+        *,
+        user_id: int,
+        guild_id: Optional[int],
+        display_name: Optional[str] = None,
+        command_name: Optional[str] = None,
+        data: Optional[dict] = None,
+    ) -> None:
+        self.id = next(_ids)
+        self.user = FakeUser(id=user_id, display_name=display_name or f"user{user_id}")
+        self.guild_id = guild_id
+        self.channel_id = guild_id
+        self.command_name = command_name
+        self.data = data or {}
+        self.sent: List[SentMessage] = []
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.created_at = time.perf_counter()
+
+    @property
+    def failed(self) -> bool:
+        return any(m.is_error for m in self.sent)
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import importlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from apps.discord_bot.fakes import FakeInteraction
+from cocbot.db.backup import online_backup
+
+
+# Offline load harness for the slash commands.
+#
+#   python -m apps.discord_bot.loadtest --requests 2000 --rate 200 --concurrency 50
+#   python -m apps.discord_bot.loadtest --trace traces/friday.jsonl --speed 4
+#
+# Trace files are JSON lines:
+#   {"at": 0.125, "command": "check", "args": {"target_or_skill": "listen"}, "user_id": 1, "guild_id": 10}
+# `at` is seconds since the start of the trace.
+#
+# By default the run uses a scratch copy of the DB (traces write, e.g. /setchar)
+# and the rate limiter is off, so the numbers are the commands' own cost.
+# The bot module is imported only after the copy is in place: settings are
+# read from the environment once, when cocbot.config is first imported.
+
+
+@functools.lru_cache(maxsize=None)
+def commands() -> Dict[str, Any]:
+    from apps.discord_bot import main as bot_main
+
+    return {
+        "roll": bot_main.roll,
+        "check": bot_main.check,
+        "setchar": bot_main.setchar,
+    }
+
+
+def use_scratch_db(tmp: Path) -> Path:
+    """
+    Copy the configured DB (and, in guild storage, every guild file) into
+    `tmp` and point COC_DB_PATH / COC_GUILD_DB_DIR at the copies. Call before
+    the bot module is imported. Returns the scratch DB path.
+    """
+    import cocbot.config
+
+    settings = cocbot.config.settings
+    db = tmp / settings.DB_PATH.name
+    online_backup(settings.DB_PATH, db, pages_per_step=-1, step_pause_s=0)
+    os.environ["COC_DB_PATH"] = str(db)
+    if settings.STORAGE_MODE == "guild":
+        guild_dir = tmp / "guilds"
+        guild_dir.mkdir()
+        for p in sorted(settings.GUILD_DB_DIR.glob("*.sqlite3")):
+            online_backup(p, guild_dir / p.name, pages_per_step=-1, step_pause_s=0)
+        os.environ["COC_GUILD_DB_DIR"] = str(guild_dir)
+    # nothing has read the settings yet; re-evaluate them with the new paths
+    importlib.reload(cocbot.config)
+    return db
+
+# Default synthetic mix, roughly what a table produces during a session.
+DEFAULT_MIX: List[tuple[float, str, Dict[str, Any]]] = [
+    (0.35, "check", {"target_or_skill": "spot hidden"}),
+    (0.15, "check", {"target_or_skill": "聆听"}),
+    (0.10, "check", {"target_or_skill": "dodge"}),
+    (0.10, "check", {"target_or_skill": "55", "bonus_penalty": 1}),
+    (0.05, "check", {"target_or_skill": "library use", "bonus_penalty": -2}),
+    (0.20, "roll", {"expr": "1d100"}),
+    (0.04, "roll", {"expr": "2d6+1"}),
+    (0.01, "setchar", {"character_id": 1}),
+]
+
+
+@dataclass(frozen=True)
+class TraceEvent:
+    at: float
+    command: str
+    args: Dict[str, Any]
+    user_id: int
+    guild_id: Optional[int]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "at": round(self.at, 6),
+                "command": self.command,
+                "args": self.args,
+                "user_id": self.user_id,
+                "guild_id": self.guild_id,
+            },
+            ensure_ascii=False,
+        )
+
+
+def load_trace(path: Path) -> List[TraceEvent]:
+    events: List[TraceEvent] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        d = json.loads(line)
+        events.append(
+            TraceEvent(
+                at=float(d.get("at", 0.0)),
+                command=str(d["command"]),
+                args=dict(d.get("args") or {}),
+                user_id=int(d.get("user_id", 1)),
+                guild_id=d.get("guild_id"),
+            )
+        )
+    events.sort(key=lambda e: e.at)
+    return events
+
+
+def synthetic_trace(
+    n: int,
+    rate: float,
+    users: int,
+    guilds: int,
+    seed: Optional[int] = None,
+) -> List[TraceEvent]:
+    """
+    Open-loop arrivals at `rate` req/s (Poisson), spread over `users` and `guilds`.
+    """
+    rng = random.Random(seed)
+    weights = [w for w, _, _ in DEFAULT_MIX]
+    t = 0.0
+    events: List[TraceEvent] = []
+    for _ in range(n):
+        _, cmd, args = rng.choices(DEFAULT_MIX, weights=weights)[0]
+        user_id = rng.randint(1, max(1, users))
+        guild_id = 1000 + rng.randint(1, max(1, guilds))
+        events.append(TraceEvent(at=t, command=cmd, args=dict(args), user_id=user_id, guild_id=guild_id))
+        if rate > 0:
+            t += rng.expovariate(rate)
+    return events
+
+
+@dataclass
+class RunStats:
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: int = 0
+    rejected: int = 0
+    completed: int = 0
+    loop_lag: List[float] = field(default_factory=list)
+    wall: float = 0.0
+
+    def add(self, command: str, seconds: float) -> None:
+        self.latencies.setdefault(command, []).append(seconds)
+
+
+def _pct(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(p / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+def summarize(stats: RunStats) -> Dict[str, Any]:
+    def block(vals: List[float]) -> Dict[str, float]:
+        s = sorted(vals)
+        return {
+            "count": len(s),
+            "mean_ms": (statistics.fmean(s) * 1000) if s else 0.0,
+            "p50_ms": _pct(s, 50) * 1000,
+            "p95_ms": _pct(s, 95) * 1000,
+            "p99_ms": _pct(s, 99) * 1000,
+            "max_ms": (s[-1] * 1000) if s else 0.0,
+        }
+
+    all_lat = [v for vals in stats.latencies.values() for v in vals]
+    lag = sorted(stats.loop_lag)
+    return {
+        "completed": stats.completed,
+        "errors": stats.errors,
+        "rejected": stats.rejected,
+        "wall_s": stats.wall,
+        "throughput_rps": (stats.completed / stats.wall) if stats.wall > 0 else 0.0,
+        "latency": block(all_lat),
+        "per_command": {cmd: block(vals) for cmd, vals in sorted(stats.latencies.items())},
+        "loop_lag": {
+            "samples": len(lag),
+            "p50_ms": _pct(lag, 50) * 1000,
+            "p99_ms": _pct(lag, 99) * 1000,
+            "max_ms": (lag[-1] * 1000) if lag else 0.0,
+        },
+    }
+
+
+async def _monitor_loop_lag(stats: RunStats, interval: float, stop: asyncio.Event) -> None:
+    # How late does a sleep(interval) wake up? That's the time the loop was blocked.
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        stats.loop_lag.append(max(0.0, loop.time() - t0 - interval))
+
+
+async def _invoke(ev: TraceEvent, stats: RunStats, sem: asyncio.Semaphore) -> None:
+    cmd = commands().get(ev.command)
+    if cmd is None:
+        stats.errors += 1
+        return
+    async with sem:
+        inter = FakeInteraction(user_id=ev.user_id, guild_id=ev.guild_id, command_name=ev.command)
+        t0 = time.perf_counter()
+        try:
+            await cmd.callback(inter, **ev.args)
+        except Exception:
+            stats.errors += 1
+            return
+        stats.add(ev.command, time.perf_counter() - t0)
+        stats.completed += 1
+        if any(m.content and "Internal error" in m.content for m in inter.sent):
+            stats.errors += 1
+        elif inter.failed:
+            stats.rejected += 1
+
+
+async def run_trace(
+    events: List[TraceEvent],
+    *,
+    concurrency: int = 50,
+    speed: float = 1.0,
+    lag_interval: float = 0.01,
+) -> RunStats:
+    """
+    Replay `events` on their own schedule (scaled by `speed`), at most
+    `concurrency` in flight. speed <= 0 fires everything as fast as possible.
+    """
+    from cocbot.runtime.profiler import profiler
+
+    stats = RunStats()
+    profiler.start()   # no-op unless COC_PROFILE=1
+    sem = asyncio.Semaphore(max(1, concurrency))
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop_lag(stats, lag_interval, stop))
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks: List[asyncio.Task] = []
+    for ev in events:
+        if speed > 0:
+            delay = start + ev.at / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_invoke(ev, stats, sem)))
+
+    await asyncio.gather(*tasks)
+    stats.wall = loop.time() - start
+    stop.set()
+    await monitor
+    await asyncio.to_thread(profiler.flush)
+    return stats
+
+
+def print_report(summary: Dict[str, Any]) -> None:
+    lat = summary["latency"]
+    lag = summary["loop_lag"]
+    print(
+        f"[loadtest] {summary['completed']} done in {summary['wall_s']:.2f}s "
+        f"→ {summary['throughput_rps']:.1f} req/s "
+        f"(errors={summary['errors']}, rejected={summary['rejected']})"
+    )
+    print(
+        f"[loadtest] latency p50={lat['p50_ms']:.2f}ms p95={lat['p95_ms']:.2f}ms "
+        f"p99={lat['p99_ms']:.2f}ms max={lat['max_ms']:.2f}ms"
+    )
+    for cmd, b in summary["per_command"].items():
+        print(f"  /{cmd:<8} n={b['count']:<6} p50={b['p50_ms']:.2f}ms p95={b['p95_ms']:.2f}ms p99={b['p99_ms']:.2f}ms")
+    print(f"[loadtest] event-loop lag p50={lag['p50_ms']:.2f}ms p99={lag['p99_ms']:.2f}ms max={lag['max_ms']:.2f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Offline load benchmark for the bot's slash commands.")
+    ap.add_argument("--trace", type=Path, help="Replay a recorded JSONL trace instead of synthetic traffic.")
+    ap.add_argument("--speed", type=float, default=1.0, help="Trace replay speed multiplier (0 = as fast as possible).")
+    ap.add_argument("--requests", type=int, default=1000, help="Synthetic request count.")
+    ap.add_argument("--rate", type=float, default=100.0, help="Synthetic arrival rate (req/s, 0 = burst).")
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--users", type=int, default=20)
+    ap.add_argument("--guilds", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--record", type=Path, help="Write the synthetic workload out as a trace file.")
+    ap.add_argument("--json", type=Path, help="Write the summary as JSON (for CI artifacts).")
+    ap.add_argument(
+        "--rate-limit", action="store_true",
+        help="Keep the per-user/guild limiter on (it rejects most synthetic traffic).",
+    )
+    ap.add_argument("--no-rate-limit", action="store_true", help=argparse.SUPPRESS)  # the default now
+    ap.add_argument("--real-db", action="store_true", help="Run against the configured DB instead of a scratch copy.")
+    ap.add_argument("--max-p95-ms", type=float, default=None, help="Exit non-zero if overall p95 exceeds this.")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="cocbot-loadtest-") as tmp:
+        if not args.real_db:
+            print(f"[loadtest] Using a scratch copy of the DB: {use_scratch_db(Path(tmp))}")
+        return _run(args)
+
+
+def _run(args: argparse.Namespace) -> int:
+    from apps.discord_bot import main as bot_main
+    from cocbot.runtime.metrics import metrics
+
+    bot_main.limiter.enabled = args.rate_limit
+
+    if args.trace:
+        events = load_trace(args.trace)
+    else:
+        events = synthetic_trace(args.requests, args.rate, args.users, args.guilds, seed=args.seed)
+
+    if args.record:
+        args.record.parent.mkdir(parents=True, exist_ok=True)
+        args.record.write_text("\n".join(e.to_json() for e in events) + "\n", encoding="utf-8")
+        print(f"[loadtest] Recorded {len(events)} events to {args.record}")
+
+    stats = asyncio.run(run_trace(events, concurrency=args.concurrency, speed=args.speed))
+    summary = summarize(stats)
+    summary["metrics"] = metrics.snapshot()
+    print_report(summary)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    if args.max_p95_ms is not None and summary["latency"]["p95_ms"] > args.max_p95_ms:
+        print(f"[loadtest] FAIL: p95 {summary['latency']['p95_ms']:.2f}ms > {args.max_p95_ms}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,44 +1,199 @@
 ﻿from __future__ import annotations
 
+import argparse
+import asyncio
+import functools
 import sqlite3
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, Optional, Set, Tuple
 import discord
 from discord import app_commands
 from discord.ext import commands
 import traceback
+from contextlib import contextmanager
 
 from cocbot.config import settings
-from cocbot.mechanics.dice import parse_and_roll, d100_check_details
-from cocbot.db.repo_skill_defs import resolve_skill
+from apps.discord_bot.sync import sync_if_changed
+from cocbot.mechanics.dice import parse_and_roll, d100_check, d100_check_details, roll_damage
+from cocbot.mechanics.checks import SuccessLevel
+from cocbot.db.repo_skill_defs import SkillDef, resolve_skill
 from cocbot.mechanics.skill_base import resolve_skill_base
-from cocbot.db.characters import set_active_character_id
+from cocbot.db.characters import (
+    bulk_insert_characters,
+    get_active_character_id,
+    get_character_names,
+    set_active_character_id,
+)
+from cocbot.db.professions import find_template, get_generation_data
+from cocbot.mechanics.chargen import generate
+from cocbot.mechanics.derived import db_for_build
+from cocbot.db import resources as ledger
+from cocbot.db import house_rules
+from cocbot.db.development import run_development_phase, tick_active_skill
+from cocbot.mechanics.development import earns_tick
+from cocbot.mechanics.house_rules import DEFAULT_RULES, CompiledRules, HouseRules
+from cocbot.db.backup import BackupScheduler
+from cocbot.db import combat as combat_db
+from cocbot.mechanics.combat import (
+    Combatant,
+    Response,
+    RoundResult,
+    initiative_order,
+    parse_attacks,
+    resolve_round,
+)
+from cocbot.db.partition import guild_dbs
+from cocbot.runtime.coalesce import SingleFlight
+from cocbot.runtime.metrics import metrics, write_snapshot
+from cocbot.runtime.pending import PendingStore
+from cocbot.runtime.profiler import connection_class, profiler
+from cocbot.runtime.roll_feed import roll_feed
+from cocbot.runtime.roll_history import roll_history, write_dump
+from cocbot.runtime.ratelimit import RateLimiter
 from cocbot.ui.check_embed_old import (
     CheckEmbedInput,
     build_check_embed_old,
 )
 
 
-def get_conn() -> sqlite3.Connection:
-    # adjust if your DB path differs
-    conn = sqlite3.connect("data/coc_bot.sqlite3")
+@contextmanager
+def get_conn(guild_id: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """
+    Connection for one unit of work; commits on success, rolls back on error.
+    With COC_STORAGE_MODE=guild and a guild_id, this is the guild's own DB file
+    (reference tables ATTACHed read-only). Don't await inside the block.
+    """
+    if guild_id is not None and settings.STORAGE_MODE == "guild":
+        with guild_dbs.connection(guild_id) as conn:
+            yield conn
+        return
+
+    conn = sqlite3.connect(settings.DB_PATH, factory=connection_class())
     conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+limiter = RateLimiter(
+    user_burst=settings.RATE_USER_BURST,
+    user_per_sec=settings.RATE_USER_PER_SEC,
+    guild_burst=settings.RATE_GUILD_BURST,
+    guild_per_sec=settings.RATE_GUILD_PER_SEC,
+    max_keys=settings.RATE_MAX_KEYS,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+
+backups = BackupScheduler(
+    settings.DB_PATH,
+    settings.BACKUP_DIR,
+    settings.RUNTIME_DIR / "backup.json",
+    keep=settings.BACKUP_KEEP,
+    pages_per_step=settings.BACKUP_PAGES_PER_STEP,
+    step_pause_s=settings.BACKUP_STEP_PAUSE_MS / 1000,
+    compress=settings.BACKUP_GZIP,
+    guild_dir=settings.GUILD_DB_DIR if settings.STORAGE_MODE == "guild" else None,
+)
+
+@dataclass(frozen=True)
+class PendingCheck:
+    # a failed /check that can still be pushed or bought with Luck
+    guild_id: Optional[str]
+    user_id: int
+    target: int
+    bp: int
+    embed_input: CheckEmbedInput
+    can_push: bool
+    luck_cost: Optional[int]
+    skill_id: Optional[int] = None    # for the development tick on a pushed success
+
+
+pending_checks: PendingStore[PendingCheck] = PendingStore(
+    "check", ttl_s=settings.PENDING_TTL_S, max_items=settings.PENDING_MAX
+)
+
+# Identical concurrent /check lookups (same guild + skill) share one resolution.
+check_flight: SingleFlight[Tuple[Optional[SkillDef], Optional[int], str]] = SingleFlight("check_resolve")
 
 
 class CocBot(commands.Bot):
     def __init__(self) -> None:
         intents = discord.Intents.default()
         super().__init__(command_prefix="!", intents=intents)
+        self.force_sync = settings.FORCE_COMMAND_SYNC
 
     async def setup_hook(self) -> None:
-        # Sync commands (guild for fast dev)
+        t0 = time.perf_counter()
+        # Sync commands (guild for fast dev), but only when the tree actually changed
         if settings.DISCORD_GUILD_ID:
             guild = discord.Object(id=int(settings.DISCORD_GUILD_ID))
             self.tree.copy_global_to(guild=guild)
-            await self.tree.sync(guild=guild)
-            print(f"[discord] Synced commands to guild {settings.DISCORD_GUILD_ID}")
+            await sync_if_changed(
+                self.tree,
+                get_conn,
+                scope=f"{self.application_id}:guild:{settings.DISCORD_GUILD_ID}",
+                guild=guild,
+                force=self.force_sync,
+            )
         else:
-            await self.tree.sync()
-            print("[discord] Synced global commands")
+            await sync_if_changed(
+                self.tree,
+                get_conn,
+                scope=f"{self.application_id}:global",
+                force=self.force_sync,
+            )
+        print(f"[discord] setup_hook finished in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        self.add_dynamic_items(CheckActionButton)
+        self.loop.create_task(_metrics_writer())
+        profiler.start(self.loop)
+        if settings.BACKUP_INTERVAL_MIN > 0:
+            self.loop.create_task(backups.run_forever(settings.BACKUP_INTERVAL_MIN * 60))
+
+
+async def _metrics_writer() -> None:
+    path = settings.RUNTIME_DIR / "metrics.json"
+    while True:
+        await asyncio.sleep(settings.METRICS_INTERVAL_S)
+        try:
+            extra = {"ratelimit": limiter.stats(), "pending": pending_checks.stats()}
+            await asyncio.to_thread(write_snapshot, path, extra)
+            # copy on the loop (appends happen here), write the copy in a thread
+            snap = roll_history.snapshot()
+            if snap is not None:
+                await asyncio.to_thread(write_dump, settings.RUNTIME_DIR / "rolls.bin", snap)
+        except OSError as e:
+            print(f"[metrics] Could not write snapshot: {e}")
+
+
+def guarded(func):
+    """
+    Rate-limit a command callback before it does any work, and time it
+    (and sample it, when COC_PROFILE is on).
+    Must sit below @bot.tree.command so the wrapped signature is what gets registered.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(interaction: discord.Interaction, *args, **kwargs) -> None:
+        retry_after = limiter.check(interaction.user.id, interaction.guild_id, command=name)
+        if retry_after > 0:
+            await interaction.response.send_message(
+                f"❌ Slow down — try again in {retry_after:.1f}s.", ephemeral=True
+            )
+            return
+        metrics.incr(f"command.{name}")
+        t0 = time.perf_counter()
+        try:
+            with profiler.track(name):
+                await func(interaction, *args, **kwargs)
+        finally:
+            metrics.observe(f"command.{name}", time.perf_counter() - t0)
+
+    return wrapper
 
 
 bot = CocBot()
@@ -51,6 +206,7 @@ async def on_ready() -> None:
 
 @bot.tree.command(name="roll", description="Roll dice like d20, 2d6+1, 1d100.")
 @app_commands.describe(expr="Dice expression (e.g., d20, 2d6+1, 1d100)")
+@guarded
 async def roll(interaction: discord.Interaction, expr: str) -> None:
     try:
         result = parse_and_roll(expr)
@@ -62,6 +218,7 @@ async def roll(interaction: discord.Interaction, expr: str) -> None:
 
 @bot.tree.command(name="setchar", description="Set active character id for this server (used for derived skills).")
 @app_commands.describe(character_id="Character ID in the database (matches attributes.character_id)")
+@guarded
 async def setchar(interaction: discord.Interaction, character_id: int) -> None:
     if interaction.guild_id is None:
         await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
@@ -69,18 +226,674 @@ async def setchar(interaction: discord.Interaction, character_id: int) -> None:
 
     guild_id = str(interaction.guild_id)
 
-    with get_conn() as conn:
-        set_active_character_id(conn, guild_id, character_id)
-        conn.commit()
+    def _set() -> None:
+        with get_conn(guild_id) as conn:
+            set_active_character_id(conn, guild_id, character_id)
+            ledger.get_resources(conn, guild_id, character_id)
+
+    await asyncio.to_thread(_set)
+    ledger.cache.set_active(guild_id, character_id)
+    _tick_done.pop(guild_id, None)
 
     await interaction.response.send_message(f"✅ Active character set to `{character_id}`.", ephemeral=True)
 
 
+@bot.tree.command(name="adjust", description="Change Luck / SAN / HP / MP of the active character.")
+@app_commands.describe(
+    resource="Which resource",
+    delta="Amount to add (negative to subtract)",
+    value="Set to this value instead (e.g. to start tracking Luck)",
+)
+@app_commands.choices(resource=[app_commands.Choice(name=r.upper(), value=r) for r in ledger.RESOURCES])
+@guarded
+async def adjust(
+    interaction: discord.Interaction,
+    resource: app_commands.Choice[str],
+    delta: int = 0,
+    value: Optional[int] = None,
+) -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+    if value is not None and not 0 <= value <= (99 if resource.value in ("luck", "san") else 999):
+        await interaction.response.send_message(f"❌ {resource.name} can't be set to {value}.", ephemeral=True)
+        return
+
+    guild_id = str(interaction.guild_id)
+
+    def _apply() -> Tuple[Optional[int], Optional[int]]:
+        with get_conn(guild_id) as conn:
+            cid = get_active_character_id(conn, guild_id)
+            if cid is None:
+                return None, None
+            ledger.ensure_resources(conn, cid)
+            if value is not None:
+                return cid, ledger.set_resource(conn, guild_id, cid, resource.value, value)
+            return cid, ledger.adjust_resource(conn, guild_id, cid, resource.value, delta)
+
+    cid, new_value = await asyncio.to_thread(_apply)
+    if cid is None:
+        await interaction.response.send_message("❌ No active character. Use `/setchar` first.", ephemeral=True)
+        return
+    if new_value is None:
+        await interaction.response.send_message(
+            f"❌ {resource.name} is not tracked for character `{cid}` yet. Set it with `value:`.", ephemeral=True
+        )
+        return
+    change = f"= {value}" if value is not None else f"{delta:+d}"
+    await interaction.response.send_message(f"✅ {resource.name} {change} → **{new_value}**")
+
+
+@bot.tree.command(name="groupsan", description="Keeper: SAN roll for every investigator in this server.")
+@app_commands.describe(
+    success_loss="SAN lost on a success (e.g. 0, 1, 1d3)",
+    fail_loss="SAN lost on a failure (e.g. 1d6, 1d10)",
+)
+@app_commands.default_permissions(manage_guild=True)
+@guarded
+async def groupsan(interaction: discord.Interaction, success_loss: str = "0", fail_loss: str = "1d6") -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+
+    guild_id = str(interaction.guild_id)
+    try:
+        roll_damage(success_loss)
+        roll_damage(fail_loss)
+    except ValueError as e:
+        await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        return
+
+    rules = await guild_rules(guild_id)
+
+    def _run() -> Tuple[list, dict, dict]:
+        with get_conn(guild_id) as conn:
+            ledger.ensure_guild_resources(conn, guild_id)
+            current = ledger.load_guild_resources(conn, guild_id)
+            lines = []
+            deltas = {}
+            for cid, res in current.items():
+                if res.san is None:
+                    continue
+                r = d100_check(res.san, rules=rules)
+                if r.level == SuccessLevel.FUMBLE:
+                    loss = roll_damage(fail_loss, maximize=True)
+                elif r.level == SuccessLevel.FAIL:
+                    loss = roll_damage(fail_loss)
+                else:
+                    loss = roll_damage(success_loss)
+                deltas[cid] = -loss
+                lines.append((cid, r, loss))
+
+            # one UPDATE ... RETURNING for the whole table
+            after = ledger.adjust_many(conn, guild_id, "san", deltas)
+            names = get_character_names(conn, deltas)
+        return lines, after, names
+
+    lines, after, names = await asyncio.to_thread(_run)
+    if not lines:
+        await interaction.response.send_message("❌ No investigators with SAN in this server.", ephemeral=True)
+        return
+
+    out = [f"🧠 **Group SAN check** ({success_loss}/{fail_loss})"]
+    for cid, r, loss in lines:
+        roll_history.append(r.roll, r.target, r.level)
+        _feed_roll(guild_id, str(names.get(cid, cid)), "SAN", r.roll, r.target, r.level, kind="san")
+        out.append(
+            f"{names.get(cid, cid)}: `{r.roll:02d}` vs {r.target} — {r.level.value}, "
+            f"-{loss} → **{after.get(cid, r.target)}**"
+        )
+    await interaction.response.send_message("\n".join(out))
+
+
+def _load_rules(guild_id: str) -> CompiledRules:
+    with get_conn(guild_id) as conn:
+        return house_rules.cache.load(conn, guild_id)
+
+
+async def guild_rules(guild_id: Optional[str]) -> CompiledRules:
+    # compiled once per guild; afterwards a dict lookup with no query
+    rules = house_rules.cache.get(guild_id)
+    if rules is None:
+        rules = await asyncio.to_thread(_load_rules, guild_id)
+    return rules
+
+
+def _feed_roll(
+    guild_id: Optional[str],
+    actor: str,
+    label: str,
+    roll: int,
+    target: int,
+    level: SuccessLevel,
+    bp: int = 0,
+    kind: str = "check",
+) -> None:
+    # live feed for /live on the dashboard (one UDP datagram, never waits); DM rolls stay private
+    if guild_id is None or guild_id == "dm":
+        return
+    roll_feed.publish(
+        {
+            "guild_id": guild_id,
+            "kind": kind,
+            "actor": actor[:64],
+            "label": label[:100],
+            "roll": roll,
+            "target": target,
+            "level": level.value,
+            "bp": bp,
+            "ts": round(time.time(), 3),
+        }
+    )
+
+
+def _describe_rules(r: HouseRules) -> str:
+    crit = "01" if r.crit_max == 1 else f"01–{r.crit_max:02d}"
+    high = "100 fails" if r.fumble_min_high is None else f"fumble {r.fumble_min_high}–100"
+    return (
+        f"Critical: {crit} · Fumble: {r.fumble_min_low}–100 below {r.fumble_split}, {high} otherwise · "
+        f"Push: {'on' if r.allow_push else 'off'} · Luck: {'on' if r.allow_luck else 'off'}"
+    )
+
+
+@bot.tree.command(name="houserules", description="Keeper: show or change critical/fumble/push/luck rules.")
+@app_commands.describe(
+    crit_max="Criticals on 01..N (1 = rules as written)",
+    fumble_low="Fumble range start when the target is below the split (default 96)",
+    fumble_high="Fumble range start at/above the split (0 = none, only 100 fails)",
+    fumble_split="Target where the fumble range changes (default 50)",
+    push="Allow pushed rolls",
+    luck="Allow spending Luck",
+    reset="Back to the default rules",
+)
+@app_commands.default_permissions(manage_guild=True)
+@guarded
+async def houserules(
+    interaction: discord.Interaction,
+    crit_max: Optional[int] = None,
+    fumble_low: Optional[int] = None,
+    fumble_high: Optional[int] = None,
+    fumble_split: Optional[int] = None,
+    push: Optional[bool] = None,
+    luck: Optional[bool] = None,
+    reset: bool = False,
+) -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+
+    guild_id = str(interaction.guild_id)
+    current = (await guild_rules(guild_id)).rules
+    changes = {}
+    if crit_max is not None:
+        changes["crit_max"] = crit_max
+    if fumble_low is not None:
+        changes["fumble_min_low"] = fumble_low
+    if fumble_high is not None:
+        changes["fumble_min_high"] = fumble_high or None
+    if fumble_split is not None:
+        changes["fumble_split"] = fumble_split
+    if push is not None:
+        changes["allow_push"] = push
+    if luck is not None:
+        changes["allow_luck"] = luck
+    if not changes and not reset:
+        await interaction.response.send_message(f"📜 House rules: {_describe_rules(current)}", ephemeral=True)
+        return
+
+    new = replace(DEFAULT_RULES if reset else current, **changes)
+    try:
+        new.validate()
+    except ValueError as e:
+        await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        return
+
+    def _save() -> None:
+        with get_conn(guild_id) as conn:
+            house_rules.save_house_rules(conn, guild_id, new)
+
+    await asyncio.to_thread(_save)
+    house_rules.cache.put(guild_id, new)
+    await interaction.response.send_message(f"✅ House rules updated. {_describe_rules(new)}")
+
+
+@bot.tree.command(name="develop", description="Keeper: development phase — improvement rolls for every ticked skill.")
+@app_commands.default_permissions(manage_guild=True)
+@guarded
+async def develop(interaction: discord.Interaction) -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+
+    guild_id = str(interaction.guild_id)
+    await interaction.response.defer(thinking=True)
+
+    def _run():
+        with get_conn(guild_id) as conn:
+            return run_development_phase(conn, guild_id)
+
+    report = await asyncio.to_thread(_run)
+    _tick_done.pop(guild_id, None)
+    r = report.result
+    if not r.skill_ids.size:
+        await interaction.followup.send("❌ No ticked skills in this server. Successful checks tick skills.")
+        return
+
+    out = [f"📈 **Development phase** — {int(r.improved.sum())}/{r.skill_ids.size} skills improved"]
+    out += report.lines()
+    text = "\n".join(out)
+    if len(text) > 2000:
+        text = text[:1990] + "\n…"
+    await interaction.followup.send(text)
+
+combat = app_commands.Group(
+    name="combat",
+    description="Keeper: combat tracker — attacks vs dodge / fight back, resolved a round at a time.",
+    guild_only=True,
+    default_permissions=discord.Permissions(manage_guild=True),
+)
+
+
+def _format_combatant(c: Combatant) -> str:
+    wound = " · major wound" if c.major_wound else ""
+    down = " · **down**" if not c.active else ""
+    return (
+        f"`#{c.combatant_id}` **{c.name}** — HP {c.hp}/{c.hp_max} · DEX {c.dex} · "
+        f"Fight {c.fight} · Dodge {c.dodge} · {c.damage_expr()}{wound}{down}"
+    )
+
+
+def _format_round(res: RoundResult, combatants: dict) -> str:
+    out = [f"⚔️ **Round {res.round_no}** — order: " + ", ".join(combatants[cid].name for cid in res.order)]
+    for o in res.outcomes:
+        a, d = combatants[o.attack.attacker], combatants[o.attack.defender]
+        ac = o.attacker_check
+        line = f"{a.name} → {d.name}: `{ac.roll:02d}`/{ac.target} {ac.level.value}"
+        if o.defender_check is not None:
+            dc = o.defender_check
+            response = "fights back" if o.attack.response == Response.FIGHT_BACK else "dodges"
+            line += f" · {d.name} {response} `{dc.roll:02d}`/{dc.target} {dc.level.value}"
+        if o.hit_on is not None:
+            victim = combatants[o.hit_on]
+            wound = " (major wound)" if victim.major_wound else ""
+            line += f" — **{o.note}**: {o.damage} damage to {victim.name}, HP → **{o.hp_after}**{wound}"
+        else:
+            line += f" — {o.note}"
+        out.append(line)
+    if res.skipped:
+        out.append(f"Skipped {len(res.skipped)} attack(s): unknown or downed combatants.")
+    text = "\n".join(out)
+    return text if len(text) <= 2000 else text[:1990] + "\n…"
+
+
+@combat.command(name="add", description="Add a combatant, from one of this server's characters or by hand.")
+@app_commands.describe(
+    character_id="Character to add (stats, HP, Brawl, Dodge and damage bonus from the sheet)",
+    name="Name (required without character_id)",
+    hp="Hit points (default 10)",
+    dex="DEX, for initiative (default 50)",
+    fight="Attack / fight-back skill (default 25)",
+    dodge="Dodge skill (default DEX/2)",
+    damage="Weapon damage, e.g. 1d6+1 (default 1d3, unarmed)",
+)
+@guarded
+async def combat_add(
+    interaction: discord.Interaction,
+    character_id: Optional[int] = None,
+    name: Optional[str] = None,
+    hp: Optional[int] = None,
+    dex: int = 50,
+    fight: int = 25,
+    dodge: Optional[int] = None,
+    damage: Optional[str] = None,
+) -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+    if character_id is None and not (name or "").strip():
+        await interaction.response.send_message("❌ Give a `character_id` or a `name`.", ephemeral=True)
+        return
+    try:
+        roll_damage(damage or "0")
+    except ValueError as e:
+        await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        return
+
+    guild_id = str(interaction.guild_id)
+
+    def _add() -> Optional[Combatant]:
+        with get_conn(guild_id) as conn:
+            cbid = combat_db.next_combatant_id(conn, guild_id)
+            if character_id is not None:
+                c = combat_db.combatant_from_character(conn, guild_id, character_id, cbid)
+                if c is None:
+                    return None
+                if damage:
+                    c.damage = damage
+            else:
+                c = Combatant(
+                    combatant_id=cbid,
+                    name=name.strip()[:64],
+                    dex=dex,
+                    hp=hp if hp is not None else 10,
+                    hp_max=hp if hp is not None else 10,
+                    fight=fight,
+                    dodge=dodge if dodge is not None else dex // 2,
+                    damage=damage or "1d3",
+                )
+            combat_db.upsert_combatants(conn, guild_id, [c])
+            return c
+
+    c = await asyncio.to_thread(_add)
+    if c is None:
+        await interaction.response.send_message(f"❌ No character `{character_id}` in this server.", ephemeral=True)
+        return
+    await interaction.response.send_message(f"✅ Added {_format_combatant(c)}")
+
+
+@combat.command(name="round", description="Resolve one round: attacks like `1>2, 2>1 fight, 3>1 none +1`.")
+@app_commands.describe(
+    attacks="attacker>defender [dodge|fight|none] [+N bonus / -N penalty dice], comma-separated (ids from /combat status)"
+)
+@guarded
+async def combat_round(interaction: discord.Interaction, attacks: str) -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+    try:
+        parsed = parse_attacks(attacks)
+    except ValueError as e:
+        await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        return
+
+    guild_id = str(interaction.guild_id)
+    rules = await guild_rules(guild_id)
+
+    def _run() -> Tuple[Optional[RoundResult], dict]:
+        # load once, resolve in memory, write HP/wounds + round counter once
+        with get_conn(guild_id) as conn:
+            combatants = combat_db.load_combatants(conn, guild_id)
+            if not combatants:
+                return None, {}
+            round_no = combat_db.get_round_no(conn, guild_id) + 1
+            res = resolve_round(combatants, parsed, round_no, check=functools.partial(d100_check, rules=rules))
+            combat_db.save_round(conn, guild_id, combatants.values(), round_no)
+        return res, combatants
+
+    res, combatants = await asyncio.to_thread(_run)
+    if res is None:
+        await interaction.response.send_message("❌ No combatants. Add some with `/combat add`.", ephemeral=True)
+        return
+
+    for o in res.outcomes:
+        for who, chk in ((o.attack.attacker, o.attacker_check), (o.attack.defender, o.defender_check)):
+            if chk is None:
+                continue
+            roll_history.append(chk.roll, chk.target, chk.level)
+            _feed_roll(guild_id, combatants[who].name, "Combat", chk.roll, chk.target, chk.level, kind="combat")
+    await interaction.response.send_message(_format_round(res, combatants))
+
+
+@combat.command(name="status", description="Combatants in initiative order, with HP.")
+@guarded
+async def combat_status(interaction: discord.Interaction) -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+    guild_id = str(interaction.guild_id)
+
+    def _load() -> Tuple[dict, int]:
+        with get_conn(guild_id) as conn:
+            return combat_db.load_combatants(conn, guild_id), combat_db.get_round_no(conn, guild_id)
+
+    combatants, round_no = await asyncio.to_thread(_load)
+    if not combatants:
+        await interaction.response.send_message("No combat in progress. Start with `/combat add`.", ephemeral=True)
+        return
+    out = [f"⚔️ **Combat** — {round_no} round(s) fought"]
+    out += [_format_combatant(combatants[cid]) for cid in initiative_order(combatants.values())]
+    await interaction.response.send_message("\n".join(out))
+
+
+@combat.command(name="end", description="End the combat and clear all combatants.")
+@guarded
+async def combat_end(interaction: discord.Interaction) -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+    guild_id = str(interaction.guild_id)
+
+    def _clear() -> None:
+        with get_conn(guild_id) as conn:
+            combat_db.clear_combat(conn, guild_id)
+
+    await asyncio.to_thread(_clear)
+    await interaction.response.send_message("✅ Combat ended.")
+
+
+bot.tree.add_command(combat)
+
+
+@bot.tree.command(name="gen", description="Roll a new investigator (optionally for a profession).")
+@app_commands.describe(profession="Profession (职业), e.g. 会计师. Empty = characteristics only.", name="Character name")
+@guarded
+async def gen(interaction: discord.Interaction, profession: Optional[str] = None, name: Optional[str] = None) -> None:
+    if interaction.guild_id is None:
+        await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+        return
+
+    guild_id = str(interaction.guild_id)
+    char_name = name or interaction.user.display_name
+    user_id = str(interaction.user.id)
+
+    def _generate():
+        # template parsing (first call) and the inserts stay off the event loop
+        with get_conn() as conn:
+            table, templates = get_generation_data(conn)
+        tpl = find_template(templates, profession) if profession else None
+        if profession and tpl is None:
+            return table, None, None, None
+        batch = generate(1, tpl, table)
+        with get_conn(guild_id) as conn:
+            ids = bulk_insert_characters(conn, batch, guild_id=guild_id, user_id=user_id, names=[char_name])
+        return table, tpl, batch, ids[0]
+
+    table, tpl, batch, cid = await asyncio.to_thread(_generate)
+    if batch is None:
+        await interaction.response.send_message(f"❌ Unknown profession: `{profession}`", ephemeral=True)
+        return
+
+    st = {k: int(v[0]) for k, v in batch.stats.items()}
+    lines = [
+        f"🧾 **{char_name}** (id `{cid}`){' — ' + tpl.name if tpl else ''}",
+        " ".join(f"{k} {st[k]}" for k in ("STR", "CON", "SIZ", "DEX", "APP", "INT", "POW", "EDU")),
+        f"HP {int(batch.hp[0])} · MP {int(batch.mp[0])} · SAN {int(batch.san[0])} · LUCK {st['LUCK']} · "
+        f"MOV {int(batch.mov[0])} · DB {db_for_build(batch.build[0])} · Build {int(batch.build[0])}",
+    ]
+    if batch.skill_ids.size:
+        names: dict = {}
+        for nm, sid in table.name_index.items():
+            names.setdefault(sid, nm)     # i18n names come before aliases
+        skills = sorted(
+            zip(batch.skill_ids[0].tolist(), batch.skill_values[0].tolist()), key=lambda p: -p[1]
+        )
+        lines.append("、".join(f"{names.get(sid, sid)} {val}" for sid, val in skills))
+    lines.append(f"Use `/setchar {cid}` to play it.")
+    await interaction.response.send_message("\n".join(lines))
+
+
+def _resolve_check_target(raw: str, guild_id: str) -> Tuple[Optional[SkillDef], Optional[int], str]:
+    # Resolve skill via the shared catalog (language detected from the input)
+    skill = resolve_skill(raw)
+    if not skill:
+        return None, None, ""
+
+    with get_conn(guild_id) as conn:
+        target_opt, base_label = resolve_skill_base(conn, guild_id, skill.skill_id)
+        if guild_id != "dm" and not ledger.cache.knows_active(guild_id):
+            # first skill check in this guild since start: cache the active character's Luck
+            ledger.load_active_resources(conn, guild_id)
+    return skill, target_opt, base_label
+
+
+class CheckActionButton(
+    discord.ui.DynamicItem[discord.ui.Button], template=r"coc:check:(?P<action>push|luck):(?P<key>[0-9a-f]+)"
+):
+    """
+    Push / Spend Luck button on a /check result. The custom_id carries the
+    pending_checks key, so no per-message view is kept by discord.py and a
+    click is one memory lookup.
+    """
+
+    def __init__(
+        self, action: str, key: str, label: str = "", style: discord.ButtonStyle = discord.ButtonStyle.secondary
+    ) -> None:
+        super().__init__(
+            discord.ui.Button(label=label or action.title(), style=style, custom_id=f"coc:check:{action}:{key}")
+        )
+        self.action = action
+        self.key = key
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Button, match
+    ) -> "CheckActionButton":
+        return cls(match["action"], match["key"])
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        await check_action(interaction, self.action, self.key)
+
+
+def _check_actions(
+    interaction: discord.Interaction,
+    target: int,
+    bp: int,
+    inp: CheckEmbedInput,
+    rules: CompiledRules,
+    skill_id: Optional[int],
+) -> Optional[discord.ui.View]:
+    can_push = rules.can_push(inp.rolled, target)
+    # Luck comes from the guild's active character, so only offer it in a server
+    luck_cost = rules.luck_cost(inp.rolled, target) if interaction.guild_id is not None else None
+    if luck_cost is not None and inp.luck_after is not None and inp.luck_after < luck_cost:
+        luck_cost = None    # cached Luck is already too low
+    if not can_push and luck_cost is None:
+        return None
+
+    key = pending_checks.put(
+        PendingCheck(
+            guild_id=None if interaction.guild_id is None else str(interaction.guild_id),
+            user_id=interaction.user.id,
+            target=target,
+            bp=bp,
+            embed_input=inp,
+            can_push=can_push,
+            luck_cost=luck_cost,
+            skill_id=skill_id,
+        )
+    )
+    view = discord.ui.View(timeout=None)
+    if can_push:
+        view.add_item(CheckActionButton("push", key, "Push"))
+    if luck_cost is not None:
+        view.add_item(CheckActionButton("luck", key, f"Spend Luck ({luck_cost})", discord.ButtonStyle.primary))
+    return view
+
+
+# Skills already ticked (or not on the sheet) for each guild's active character.
+# Only /develop and /setchar change that, so repeat successes skip the UPDATE.
+_tick_done: Dict[str, Set[int]] = {}
+
+
+def _needs_tick(guild_id: str, skill_id: int) -> bool:
+    return skill_id not in _tick_done.get(guild_id, ())
+
+
+def _tick_skill(guild_id: str, skill_id: int) -> None:
+    with get_conn(guild_id) as conn:
+        if tick_active_skill(conn, guild_id, skill_id):
+            metrics.incr("development.tick")
+    _tick_done.setdefault(guild_id, set()).add(skill_id)
+
+
+def _spend_luck(guild_id: str, amount: int) -> Tuple[Optional[int], Optional[int]]:
+    # (character_id, luck left); luck left is None when the spend was refused
+    with get_conn(guild_id) as conn:
+        cid = get_active_character_id(conn, guild_id)
+        if cid is None:
+            return None, None
+        return cid, ledger.spend_resource(conn, guild_id, cid, "luck", amount)
+
+
+@guarded
+async def check_action(interaction: discord.Interaction, action: str, key: str) -> None:
+    # Push / Spend Luck clicks: same rate limit, metrics and profiling as a command
+    p = pending_checks.get(key)
+    if p is None:
+        await interaction.response.send_message("❌ This roll can no longer be pushed or changed.", ephemeral=True)
+        return
+    if interaction.user.id != p.user_id:
+        await interaction.response.send_message("❌ Only the player who rolled can do that.", ephemeral=True)
+        return
+    metrics.incr(f"check.{action}")
+
+    if action == "push":
+        if not p.can_push or pending_checks.pop(key) is None:
+            await interaction.response.send_message("❌ This roll can't be pushed.", ephemeral=True)
+            return
+        result, bp_candidates = d100_check_details(p.target, p.bp, rules=await guild_rules(p.guild_id))
+        roll_history.append(result.roll, result.target, result.level, p.bp)
+        _feed_roll(
+            p.guild_id, p.embed_input.actor_name, p.embed_input.skill_name_display,
+            result.roll, result.target, result.level, p.bp, kind="push",
+        )
+        failed = result.level in (SuccessLevel.FAIL, SuccessLevel.FUMBLE)
+        inp = replace(
+            p.embed_input,
+            rolled=result.roll,
+            bp_candidates=bp_candidates,
+            level=result.level,
+            pushed=True,
+            notes="Pushed roll failed — the Keeper chooses a dire consequence." if failed else None,
+        )
+        if (
+            p.guild_id is not None
+            and p.skill_id is not None
+            and earns_tick(result.level, p.bp)
+            and _needs_tick(p.guild_id, p.skill_id)
+        ):
+            await asyncio.to_thread(_tick_skill, p.guild_id, p.skill_id)
+    else:
+        if p.luck_cost is None or p.guild_id is None:
+            await interaction.response.send_message("❌ Luck can't be spent on this roll.", ephemeral=True)
+            return
+        # claim the pending check first so a double click can't spend twice
+        if pending_checks.pop(key) is None:
+            await interaction.response.send_message("❌ This roll can no longer be changed.", ephemeral=True)
+            return
+        cid, luck_after = await asyncio.to_thread(_spend_luck, p.guild_id, p.luck_cost)
+        if cid is None or luck_after is None:
+            pending_checks.put(p, key=key)
+            if cid is None:
+                msg = "❌ No active character. Use `/setchar` first."
+            else:
+                msg = f"❌ Not enough Luck (need {p.luck_cost})."
+            await interaction.response.send_message(msg, ephemeral=True)
+            return
+        inp = replace(p.embed_input, level=SuccessLevel.SUCCESS, luck_spent=p.luck_cost, luck_after=luck_after)
+        _feed_roll(
+            p.guild_id, inp.actor_name, inp.skill_name_display, inp.rolled, p.target, inp.level, p.bp, kind="luck"
+        )
+
+    await interaction.response.edit_message(embed=build_check_embed_old(inp), view=None)
+
+
 @bot.tree.command(name="check", description="CoC 7e check: pass a target number OR a skill name (EN/CN).")
 @app_commands.describe(
     target_or_skill="Number (1–100) or skill name (e.g., listen / 聆听)",
     bonus_penalty="Bonus (+) or penalty (-) dice count (optional)"
 )
+@guarded
 async def check(
     interaction: discord.Interaction,
     target_or_skill: str,
@@ -92,7 +905,10 @@ async def check(
         if not raw:
             await interaction.followup.send("❌ Provide a target or skill name.", ephemeral=True)
             return
+        guild_id = "dm" if interaction.guild_id is None else str(interaction.guild_id)
+        rules = await guild_rules(None if interaction.guild_id is None else guild_id)
 
+        skill: Optional[SkillDef] = None
         # If numeric target: roll directly
         if raw.isdigit():
             target = int(raw)
@@ -101,21 +917,15 @@ async def check(
                 return
             label = f"Target {target}"
         else:
-            # Resolve skill via aliases/i18n
-            lang = "zh" if any("\u4e00" <= ch <= "\u9fff" for ch in raw) else "en"
-            skill = resolve_skill(raw, lang=lang)
+            # Resolve skill + base off the event loop; concurrent identical lookups share one run
+            skill, target_opt, base_label = await check_flight.do(
+                (guild_id, raw.casefold()),
+                lambda: asyncio.to_thread(_resolve_check_target, raw, guild_id),
+            )
             if not skill:
                 await interaction.followup.send(f"❌ Unknown skill: `{raw}`.", ephemeral=True)
                 return
 
-            if interaction.guild_id is None:
-                guild_id = "dm"
-            else:
-                guild_id = str(interaction.guild_id)
-
-            with get_conn() as conn:
-                target_opt, base_label = resolve_skill_base(conn, guild_id, skill.skill_id)
-
             if target_opt is None:
                 await interaction.followup.send(
                     f"**{skill.display_name}**\n{base_label}\n"
@@ -128,35 +938,50 @@ async def check(
             label = f"{skill.display_name} ({base_label})"
 
         # Perform check
-        result, bp_candidates = d100_check_details(target=target, bp=bonus_penalty)
-        embed = build_check_embed_old(
-            CheckEmbedInput(
-                actor_name=interaction.user.display_name,
-                skill_name_display=label,  # already includes skill + base label
-                skill_value=target,
-                rolled=result.roll,
-
-                # bonus / penalty
-                bp_dice=abs(bonus_penalty),
-                bp_mode=(
-                    "bonus" if bonus_penalty > 0
-                    else "penalty" if bonus_penalty < 0
-                    else None
-                ),
-
-                # optional flags (safe defaults)
-                pushed=False,
-                luck_spent=0,
-                luck_after=None,
-                notes=None,
-
-                # you don't currently track these — keep None
-                base_value=None,
-                mod_total=None,
-                bp_candidates=bp_candidates,
-            )
+        result, bp_candidates = d100_check_details(target=target, bp=bonus_penalty, rules=rules)
+        roll_history.append(result.roll, result.target, result.level, bonus_penalty)
+        inp = CheckEmbedInput(
+            actor_name=interaction.user.display_name,
+            skill_name_display=label,  # already includes skill + base label
+            skill_value=target,
+            rolled=result.roll,
+
+            # bonus / penalty
+            bp_dice=abs(bonus_penalty),
+            bp_mode=(
+                "bonus" if bonus_penalty > 0
+                else "penalty" if bonus_penalty < 0
+                else None
+            ),
+
+            # optional flags (safe defaults); Luck Now comes from the ledger cache, no query
+            pushed=False,
+            luck_spent=0,
+            luck_after=None if interaction.guild_id is None else ledger.cache.active_value(guild_id, "luck"),
+            notes=None,
+
+            # you don't currently track these — keep None
+            base_value=None,
+            mod_total=None,
+            bp_candidates=bp_candidates,
+            level=result.level,
         )
-        await interaction.followup.send(embed=embed)
+        _feed_roll(guild_id, inp.actor_name, label, result.roll, target, result.level, bonus_penalty)
+        skill_id = None if skill is None else skill.skill_id
+        view = _check_actions(interaction, target, bonus_penalty, inp, rules, skill_id)
+        if view is None:
+            await interaction.followup.send(embed=build_check_embed_old(inp))
+        else:
+            await interaction.followup.send(embed=build_check_embed_old(inp), view=view)
+
+        # development tick for the active character's own skill (after replying)
+        if (
+            interaction.guild_id is not None
+            and skill_id is not None
+            and earns_tick(result.level, bonus_penalty)
+            and _needs_tick(guild_id, skill_id)
+        ):
+            await asyncio.to_thread(_tick_skill, guild_id, skill_id)
 
     except Exception:
         traceback.print_exc()
@@ -164,6 +989,11 @@ async def check(
 
 
 def main() -> None:
+    ap = argparse.ArgumentParser(description="CoC Dice Bot")
+    ap.add_argument("--force-sync", action="store_true", help="Push slash commands even if unchanged.")
+    args = ap.parse_args()
+    bot.force_sync = bot.force_sync or args.force_sync
+
     if not settings.DISCORD_TOKEN:
         raise RuntimeError("DISCORD_TOKEN is missing.")
     bot.run(settings.DISCORD_TOKEN)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Callable, ContextManager, Optional
+
+import discord
+from discord import app_commands
+
+from cocbot.db.command_sync import get_sync_state, set_sync_state
+
+
+async def tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """
+    Stable hash of the payload tree.sync() would push: each command's to_dict()
+    (translated when the tree has a translator), so permissions, contexts,
+    localizations and every option field are covered.
+    """
+    commands = tree.get_commands(guild=guild)
+    if tree.translator:
+        payload = [await c.get_translated_payload(tree, tree.translator) for c in commands]
+    else:
+        payload = [c.to_dict(tree) for c in commands]
+    payload.sort(key=lambda d: (int(d.get("type", 1)), d["name"]))
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+async def sync_if_changed(
+    tree: app_commands.CommandTree,
+    conn_factory: Callable[[], ContextManager[sqlite3.Connection]],
+    *,
+    scope: str,
+    guild: Optional[discord.abc.Snowflake] = None,
+    force: bool = False,
+) -> None:
+    """
+    Push the command tree only when its hash differs from the last successful sync
+    recorded for `scope`. Prints a one-line timing report either way.
+    """
+    t0 = time.perf_counter()
+    h = await tree_hash(tree, guild=guild)
+    hash_ms = (time.perf_counter() - t0) * 1000
+
+    state = None
+    try:
+        with conn_factory() as conn:
+            state = get_sync_state(conn, scope)
+    except sqlite3.Error as e:
+        # no state table yet (migrations not applied) -> behave like before
+        print(f"[discord] Command sync state unavailable ({e}); syncing")
+
+    if state is not None and state.tree_hash == h and not force:
+        saved = f", saved ~{state.sync_ms:.0f} ms" if state.sync_ms is not None else ""
+        print(
+            f"[discord] Command tree unchanged ({h[:12]}), skipped sync for {scope} "
+            f"(hash {hash_ms:.1f} ms{saved}; last synced {state.synced_at})"
+        )
+        return
+
+    t1 = time.perf_counter()
+    await tree.sync(guild=guild)
+    sync_ms = (time.perf_counter() - t1) * 1000
+
+    try:
+        with conn_factory() as conn:
+            set_sync_state(conn, scope, h, sync_ms)
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"[discord] Could not record command sync state: {e}")
+
+    reason = "forced" if force else ("first sync" if state is None else "tree changed")
+    print(f"[discord] Synced commands for {scope} in {sync_ms:.0f} ms ({reason}, {h[:12]}, hash {hash_ms:.1f} ms)")
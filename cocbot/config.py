@@ -5,6 +5,13 @@ from dataclasses import dataclass
 from pathlib import Path
 
 
+def _env_flag(name: str, default: bool = False) -> bool:
+    v = os.getenv(name)
+    if v is None:
+        return default
+    return v.strip().lower() in ("1", "true", "yes", "on")
+
+
 def repo_root() -> Path:
     # cocbot/config.py -> cocbot -> repo root
     return Path(__file__).resolve().parents[1]
@@ -16,6 +23,13 @@ class Settings:
     ROOT: Path = repo_root()
     DATA_DIR: Path = ROOT / "data"
     DB_PATH: Path = Path(os.getenv("COC_DB_PATH", str(DATA_DIR / "coc_bot.sqlite3")))
+    RUNTIME_DIR: Path = Path(os.getenv("COC_RUNTIME_DIR", str(DATA_DIR / "runtime")))
+    BACKUP_DIR: Path = Path(os.getenv("COC_BACKUP_DIR", str(DATA_DIR / "backups")))
+    GUILD_DB_DIR: Path = Path(os.getenv("COC_GUILD_DB_DIR", str(DATA_DIR / "guilds")))
+
+    # Storage: "single" (one file) or "guild" (one file per guild + shared read-only reference DB)
+    STORAGE_MODE: str = os.getenv("COC_STORAGE_MODE", "single").strip().lower()
+    GUILD_DB_MAX_OPEN: int = int(os.getenv("COC_GUILD_DB_MAX_OPEN", "64"))
 
     # Dashboard
     DASHBOARD_HOST: str = os.getenv("COC_DASH_HOST", "127.0.0.1")
@@ -24,6 +38,44 @@ class Settings:
     # Discord
     DISCORD_TOKEN: str = os.getenv("DISCORD_TOKEN", "")
     DISCORD_GUILD_ID: int | None = int(os.getenv("DISCORD_GUILD_ID", "0")) or None
+    # Push the slash-command tree even if its hash matches the last sync
+    FORCE_COMMAND_SYNC: bool = _env_flag("COC_FORCE_SYNC")
+
+    # Rate limiting (token buckets: burst size + refill per second)
+    RATE_LIMIT_ENABLED: bool = _env_flag("COC_RATE_LIMIT", True)
+    RATE_USER_BURST: float = float(os.getenv("COC_RATE_USER_BURST", "5"))
+    RATE_USER_PER_SEC: float = float(os.getenv("COC_RATE_USER_PER_SEC", "1"))
+    RATE_GUILD_BURST: float = float(os.getenv("COC_RATE_GUILD_BURST", "30"))
+    RATE_GUILD_PER_SEC: float = float(os.getenv("COC_RATE_GUILD_PER_SEC", "10"))
+    RATE_MAX_KEYS: int = int(os.getenv("COC_RATE_MAX_KEYS", "50000"))
+
+    # Push / Spend Luck buttons: pending checks live in memory only
+    PENDING_TTL_S: float = float(os.getenv("COC_PENDING_TTL_S", "900"))
+    PENDING_MAX: int = int(os.getenv("COC_PENDING_MAX", "10000"))
+
+    # Recent d100 rolls kept in memory for the dashboard (≈ 9 bytes each)
+    ROLL_HISTORY_SIZE: int = int(os.getenv("COC_ROLL_HISTORY", "1000000"))
+
+    # Live roll feed: the bot sends each roll over local UDP to the dashboard (0 = off)
+    FEED_HOST: str = os.getenv("COC_FEED_HOST", "127.0.0.1")
+    FEED_PORT: int = int(os.getenv("COC_FEED_PORT", "8765"))
+    FEED_CLIENT_QUEUE: int = int(os.getenv("COC_FEED_CLIENT_QUEUE", "256"))
+    FEED_REPLAY: int = int(os.getenv("COC_FEED_REPLAY", "50"))
+
+    # Metrics snapshot (written by the bot, read by the dashboard)
+    METRICS_INTERVAL_S: float = float(os.getenv("COC_METRICS_INTERVAL_S", "10"))
+
+    # Online DB backups (0 = scheduler off)
+    BACKUP_INTERVAL_MIN: float = float(os.getenv("COC_BACKUP_INTERVAL_MIN", "0"))
+    BACKUP_KEEP: int = int(os.getenv("COC_BACKUP_KEEP", "7"))
+    BACKUP_PAGES_PER_STEP: int = int(os.getenv("COC_BACKUP_PAGES_PER_STEP", "256"))
+    BACKUP_STEP_PAUSE_MS: float = float(os.getenv("COC_BACKUP_STEP_PAUSE_MS", "5"))
+    BACKUP_GZIP: bool = _env_flag("COC_BACKUP_GZIP", True)
+
+    # Sampling profiler for command callbacks (off by default)
+    PROFILE_ENABLED: bool = _env_flag("COC_PROFILE")
+    PROFILE_INTERVAL_MS: float = float(os.getenv("COC_PROFILE_INTERVAL_MS", "5"))
+    PROFILE_TOP_N: int = int(os.getenv("COC_PROFILE_TOP_N", "5"))
 
 
 settings = Settings()
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SNAPSHOT_PREFIX = "coc_bot-"
+
+
+@dataclass(frozen=True)
+class BackupReport:
+    started_at: float
+    file: Optional[str]          # final snapshot (gzip'd when compressed)
+    skipped: bool                # source unchanged since the last snapshot
+    pages: int
+    steps: int
+    duration_ms: float
+    pages_per_s: float
+    size_bytes: int
+    compressed_bytes: Optional[int] = None
+    compress_ms: float = 0.0
+    error: Optional[str] = None
+    guild_id: Optional[str] = None  # set for per-guild files (file is then "guilds/<id>/...")
+
+
+def _signature(db_path: Path) -> List[int]:
+    # size + mtime of the DB and its WAL: cheap "did anything change" check
+    sig: List[int] = []
+    for p in (db_path, db_path.with_name(db_path.name + "-wal")):
+        try:
+            st = p.stat()
+            sig += [st.st_size, st.st_mtime_ns]
+        except FileNotFoundError:
+            sig += [0, 0]
+    return sig
+
+
+def snapshot_path(out_dir: Path, started: float) -> Path:
+    """
+    `coc_bot-YYYYmmdd-HHMMSS-mmm.sqlite3` for `started`, moved on by a
+    millisecond while that name (or its .gz) is taken, so two runs in the
+    same instant never overwrite each other and names still sort by time.
+    """
+    ms = int(started * 1000)
+    while True:
+        sec, frac = divmod(ms, 1000)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(sec))
+        dest = out_dir / f"{SNAPSHOT_PREFIX}{stamp}-{frac:03d}.sqlite3"
+        if not dest.exists() and not dest.with_name(dest.name + ".gz").exists():
+            return dest
+        ms += 1
+
+
+def online_backup(
+    src_path: Path,
+    dest_path: Path,
+    *,
+    pages_per_step: int = 256,
+    step_pause_s: float = 0.005,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Copy a live database with SQLite's online backup API, `pages_per_step`
+    pages at a time. The read lock is only held during a step; sleeping between
+    steps lets the bot's writers in. Blocking — run it in a worker thread.
+    """
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest_path.with_name(dest_path.name + ".partial")
+    if tmp.exists():
+        tmp.unlink()
+
+    steps = 0
+    total = 0
+
+    def _on_step(status: int, remaining: int, pagecount: int) -> None:
+        nonlocal steps, total
+        steps += 1
+        total = pagecount
+        if progress is not None:
+            progress(pagecount - remaining, pagecount)
+        if remaining and step_pause_s > 0:
+            time.sleep(step_pause_s)
+
+    src = sqlite3.connect(Path(src_path).resolve().as_uri() + "?mode=ro", uri=True)
+    dst = sqlite3.connect(str(tmp))
+    try:
+        src.backup(dst, pages=max(1, int(pages_per_step)), progress=_on_step)
+    finally:
+        dst.close()
+        src.close()
+    os.replace(tmp, dest_path)
+    return {"pages": total, "steps": steps}
+
+
+def gzip_file(path: Path, level: int = 6) -> Path:
+    out = path.with_name(path.name + ".gz")
+    tmp = out.with_name(out.name + ".partial")
+    with open(path, "rb") as f_in, gzip.open(tmp, "wb", compresslevel=level) as f_out:
+        shutil.copyfileobj(f_in, f_out, length=1 << 20)
+    os.replace(tmp, out)
+    return out
+
+
+def list_snapshots(backup_dir: Path) -> List[Path]:
+    if not backup_dir.exists():
+        return []
+    return sorted(
+        p for p in backup_dir.iterdir()
+        if p.name.startswith(SNAPSHOT_PREFIX) and (p.suffix == ".sqlite3" or p.name.endswith(".sqlite3.gz"))
+    )
+
+
+def rotate(backup_dir: Path, keep: int) -> List[Path]:
+    """
+    Delete all but the newest `keep` snapshots (names sort by timestamp).
+    """
+    snaps = list_snapshots(backup_dir)
+    doomed = snaps[:-keep] if keep > 0 else []
+    for p in doomed:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+    return doomed
+
+
+class BackupScheduler:
+    """
+    Periodic snapshots of the bot DB without blocking the event loop: each run
+    goes to a worker thread (online backup in page steps, optional gzip), is
+    skipped when the DB hasn't changed since the previous snapshot, and old
+    snapshots are rotated out. Status goes to `status_path` for the dashboard.
+
+    With `guild_dir` (per-guild storage) every `<guild_id>.sqlite3` in it is
+    snapshotted too, into `backup_dir/guilds/<guild_id>/`, with its own change
+    check and rotation.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        backup_dir: Path,
+        status_path: Path,
+        *,
+        keep: int = 7,
+        pages_per_step: int = 256,
+        step_pause_s: float = 0.005,
+        compress: bool = True,
+        guild_dir: Optional[Path] = None,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.guild_dir = Path(guild_dir) if guild_dir is not None else None
+        self.backup_dir = Path(backup_dir)
+        self.status_path = Path(status_path)
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_pause_s = step_pause_s
+        self.compress = compress
+        self._lock = asyncio.Lock()
+        self._progress: Dict[str, Any] = {}
+        self._history: List[Dict[str, Any]] = []
+        self._last_sig: Dict[str, List[int]] = {}
+
+    def _status(self, running: bool) -> Dict[str, Any]:
+        return {
+            "db_path": str(self.db_path),
+            "backup_dir": str(self.backup_dir),
+            "running": running,
+            "progress": dict(self._progress),
+            "last": self._history[-1] if self._history else None,
+            "history": list(reversed(self._history[-20:])),
+            "snapshots": [p.name for p in reversed(list_snapshots(self.backup_dir))],
+            "guilds": {
+                d.name: len(list_snapshots(d)) for d in sorted(self._guild_backup_root().glob("*")) if d.is_dir()
+            },
+        }
+
+    def _guild_backup_root(self) -> Path:
+        return self.backup_dir / "guilds"
+
+    def _sources(self) -> List[Tuple[Optional[str], Path]]:
+        # (guild_id, file): the shared DB first, then every guild file
+        out: List[Tuple[Optional[str], Path]] = [(None, self.db_path)]
+        if self.guild_dir is not None and self.guild_dir.is_dir():
+            out += [(p.stem, p) for p in sorted(self.guild_dir.glob("*.sqlite3"))]
+        return out
+
+    def _write_status(self, running: bool) -> None:
+        data = self._status(running)
+        self.status_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.status_path.with_suffix(self.status_path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.status_path)
+
+    def _backup_one(self, guild_id: Optional[str], src: Path, force: bool) -> BackupReport:
+        started = time.time()
+        sig = _signature(src)
+        key = str(src)
+        if not force and sig == self._last_sig.get(key):
+            return BackupReport(started, None, True, 0, 0, 0.0, 0.0, 0, guild_id=guild_id)
+
+        out_dir = self.backup_dir if guild_id is None else self._guild_backup_root() / guild_id
+        dest = snapshot_path(out_dir, started)
+
+        def _progress(done: int, total: int) -> None:
+            self._progress = {"guild_id": guild_id, "pages_done": done, "pages_total": total}
+
+        t0 = time.perf_counter()
+        info = online_backup(
+            src, dest, pages_per_step=self.pages_per_step,
+            step_pause_s=self.step_pause_s, progress=_progress,
+        )
+        elapsed = time.perf_counter() - t0
+        size = dest.stat().st_size
+        final, compressed = dest, None
+        t1 = time.perf_counter()
+        if self.compress:
+            final = gzip_file(dest)
+            compressed = final.stat().st_size
+            dest.unlink()
+        compress_ms = (time.perf_counter() - t1) * 1000
+        rotate(out_dir, self.keep)
+        self._last_sig[key] = sig
+        return BackupReport(
+            started_at=started,
+            file=final.relative_to(self.backup_dir).as_posix(),
+            skipped=False,
+            pages=info["pages"],
+            steps=info["steps"],
+            duration_ms=round(elapsed * 1000, 1),
+            pages_per_s=round(info["pages"] / elapsed, 1) if elapsed > 0 else 0.0,
+            size_bytes=size,
+            compressed_bytes=compressed,
+            compress_ms=round(compress_ms, 1),
+            guild_id=guild_id,
+        )
+
+    def _run_blocking(self, force: bool) -> List[BackupReport]:
+        reports = []
+        for guild_id, src in self._sources():
+            try:
+                reports.append(self._backup_one(guild_id, src, force))
+            except (sqlite3.Error, OSError) as e:
+                # one bad guild file must not stop the others from being backed up
+                reports.append(
+                    BackupReport(time.time(), None, False, 0, 0, 0.0, 0.0, 0, error=str(e), guild_id=guild_id)
+                )
+        return reports
+
+    async def run_once(self, force: bool = False) -> List[BackupReport]:
+        """
+        Snapshot the shared DB and (in per-guild storage) every guild file.
+        One report per file, the shared DB first.
+        """
+        async with self._lock:
+            await asyncio.to_thread(self._write_status, True)
+            reports = await asyncio.to_thread(self._run_blocking, force)
+            self._progress = {}
+            self._history += [asdict(r) for r in reports if not r.skipped]
+            del self._history[:-100]
+            await asyncio.to_thread(self._write_status, False)
+            return reports
+
+    async def run_forever(self, interval_s: float) -> None:
+        while True:
+            await asyncio.sleep(interval_s)
+            for report in await self.run_once():
+                if report.error:
+                    print(f"[backup] {report.guild_id or 'shared DB'} failed: {report.error}")
+                elif not report.skipped:
+                    print(
+                        f"[backup] {report.file}: {report.pages} pages in {report.duration_ms:.0f} ms "
+                        f"({report.pages_per_s:.0f} pages/s)"
+                    )
+
+
+def read_status(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
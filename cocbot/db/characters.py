@@ -1,8 +1,13 @@
 ﻿from __future__ import annotations
 
-from typing import Optional, Dict
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Dict, Iterable, List, Mapping, Sequence, Tuple
 import sqlite3
 
+if TYPE_CHECKING:
+    from cocbot.importers.character_sheet import ParsedSheet
+    from cocbot.mechanics.chargen import GeneratedBatch
+
 def get_active_character_id(conn: sqlite3.Connection, guild_id: str) -> Optional[int]:
     row = conn.execute(
         "SELECT active_character_id FROM guild_settings WHERE guild_id=?",
@@ -48,3 +53,249 @@ def get_character_stats(conn: sqlite3.Connection, character_id: int) -> Dict[str
         except Exception:
             pass
     return stats
+
+def get_character_names(conn: sqlite3.Connection, character_ids: Iterable[int]) -> Dict[int, str]:
+    ids = [int(i) for i in character_ids]
+    if not ids:
+        return {}
+    rows = conn.execute(
+        f"SELECT character_id, name FROM characters WHERE character_id IN ({','.join('?' * len(ids))})",
+        ids,
+    ).fetchall()
+    return {int(r[0]): str(r[1]) for r in rows}
+
+
+def _next_character_id(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        """
+        SELECT MAX(m) FROM (
+            SELECT MAX(character_id) AS m FROM characters
+            UNION ALL SELECT MAX(character_id) FROM attributes
+            UNION ALL SELECT MAX(character_id) FROM character_resources
+        )
+        """
+    ).fetchone()
+    return int(row[0] or 0) + 1
+
+
+def _shared_db_file(conn: sqlite3.Connection) -> Optional[str]:
+    # per-guild files ATTACH the shared DB as `ref` (cocbot.db.partition)
+    for _, name, file in conn.execute("PRAGMA database_list"):
+        if name == "ref":
+            return str(file)
+    return None
+
+
+def _bump_sequence(conn: sqlite3.Connection, floor: int, n: int) -> int:
+    row = conn.execute("SELECT next_id FROM id_sequences WHERE name='character'").fetchone()
+    start = max(floor, int(row[0]) if row else 1)
+    conn.execute(
+        """
+        INSERT INTO id_sequences (name, next_id) VALUES ('character', ?)
+        ON CONFLICT(name) DO UPDATE SET next_id=excluded.next_id
+        """,
+        (start + n,),
+    )
+    return start
+
+
+def allocate_character_ids(conn: sqlite3.Connection, n: int) -> int:
+    """
+    Reserve `n` contiguous character ids and return the first. Ids come from
+    the shared DB's id_sequences row (data/sql/011_id_sequences.sql), so guild
+    files never reuse each other's ids; on a guild file the shared DB is
+    updated through its own short connection. Call it before BEGIN: a write
+    transaction on a guild file also locks the attached shared DB.
+
+    On the single file the write lock is taken here (BEGIN IMMEDIATE, left
+    open for the caller's inserts), so concurrent callers can't read the same
+    floor. Ids of a rolled-back guild-file insert are not reused.
+    """
+    shared = _shared_db_file(conn)
+    if shared is None:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        floor = _next_character_id(conn)
+        try:
+            return _bump_sequence(conn, floor, n)
+        except sqlite3.OperationalError:
+            # 011 not applied yet: one file, so its own MAX is still unique
+            return floor
+
+    floor = _next_character_id(conn)
+
+    ref = sqlite3.connect(shared, timeout=5)
+    try:
+        ref.execute("BEGIN IMMEDIATE")
+        try:
+            start = _bump_sequence(ref, floor, n)
+        except sqlite3.OperationalError as e:
+            raise RuntimeError("id_sequences missing from the shared DB; run scripts/apply_sql.py") from e
+        ref.commit()
+    finally:
+        ref.close()
+    return start
+
+
+def bulk_insert_characters(
+    conn: sqlite3.Connection,
+    batch: "GeneratedBatch",
+    *,
+    guild_id: Optional[str],
+    user_id: Optional[str] = None,
+    names: Optional[Sequence[str]] = None,
+    name_prefix: str = "NPC",
+) -> range:
+    """
+    Write a generated batch (characters, attributes, resources, skills) with one
+    executemany per table inside a single IMMEDIATE transaction.
+    Character ids are allocated as one contiguous range, which is returned.
+    """
+    n = batch.n
+    st = batch.stats
+    start = allocate_character_ids(conn, n)
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        id_list = list(range(start, start + n))
+        if names is None:
+            names = [f"{name_prefix}-{i}" for i in id_list]
+
+        conn.executemany(
+            "INSERT INTO characters (character_id, guild_id, user_id, name, profession) VALUES (?, ?, ?, ?, ?)",
+            ((cid, guild_id, user_id, nm, batch.profession) for cid, nm in zip(id_list, names)),
+        )
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO attributes (character_id, str, con, siz, dex, app, int, pow, edu)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            zip(id_list, *(st[k].tolist() for k in ("STR", "CON", "SIZ", "DEX", "APP", "INT", "POW", "EDU"))),
+        )
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO character_resources (character_id, luck, san, hp, mp, hp_max, mp_max)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            zip(id_list, st["LUCK"].tolist(), batch.san.tolist(), batch.hp.tolist(),
+                batch.mp.tolist(), batch.hp.tolist(), batch.mp.tolist()),
+        )
+        k = batch.skill_ids.shape[1] if batch.skill_ids.ndim == 2 else 0
+        if k:
+            conn.executemany(
+                "INSERT OR REPLACE INTO character_skills (character_id, skill_id, value) VALUES (?, ?, ?)",
+                zip(
+                    (cid for cid in id_list for _ in range(k)),
+                    batch.skill_ids.ravel().tolist(),
+                    batch.skill_values.ravel().tolist(),
+                ),
+            )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return range(start, start + n)
+
+
+def get_character_skill(conn: sqlite3.Connection, character_id: int, skill_id: int) -> Optional[int]:
+    row = conn.execute(
+        "SELECT value FROM character_skills WHERE character_id=? AND skill_id=?",
+        (int(character_id), int(skill_id)),
+    ).fetchone()
+    return None if row is None else int(row[0])
+
+
+_STAT_KEYS = ("STR", "CON", "SIZ", "DEX", "APP", "INT", "POW", "EDU")
+
+
+def upsert_sheet_characters(
+    conn: sqlite3.Connection,
+    items: Sequence[Tuple["ParsedSheet", Mapping[int, int]]],
+    *,
+    guild_id: str,
+    user_id: Optional[str] = None,
+) -> List[int]:
+    """
+    Upsert imported character sheets (sheet, {skill_id: value}) in one
+    transaction. Characters are matched by (guild_id, name); new ones get a
+    contiguous id range. Skill values are overwritten, `ticked` is kept.
+    Returns the character id of every item, in order.
+
+    One id per distinct name is reserved up front (allocate_character_ids);
+    names that turn out to exist already leave gaps in the id sequence.
+    """
+    names = [sheet.name or Path(sheet.path).stem for sheet, _ in items]
+    uniq = list(dict.fromkeys(names))
+    start = allocate_character_ids(conn, len(uniq)) if uniq else 0
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        by_name: Dict[str, int] = {}
+        for i in range(0, len(uniq), 500):
+            chunk = uniq[i:i + 500]
+            rows = conn.execute(
+                f"""
+                SELECT name, MAX(character_id) FROM characters
+                WHERE guild_id=? AND name IN ({','.join('?' * len(chunk))})
+                GROUP BY name
+                """,
+                (guild_id, *chunk),
+            ).fetchall()
+            by_name.update({str(r[0]): int(r[1]) for r in rows})
+
+        new_names = [nm for nm in uniq if nm not in by_name]
+        by_name.update({nm: start + i for i, nm in enumerate(new_names)})
+        ids = [by_name[nm] for nm in names]
+        new_ids = set(range(start, start + len(new_names)))
+
+        # last sheet wins when a batch has the same name twice
+        latest: Dict[int, Tuple["ParsedSheet", Mapping[int, int]]] = dict(zip(ids, items))
+
+        conn.executemany(
+            "INSERT INTO characters (character_id, guild_id, user_id, name, profession) VALUES (?, ?, ?, ?, ?)",
+            ((cid, guild_id, user_id, nm, latest[cid][0].profession)
+             for nm, cid in by_name.items() if cid in new_ids),
+        )
+        conn.executemany(
+            "UPDATE characters SET profession=COALESCE(?, profession), user_id=COALESCE(?, user_id) WHERE character_id=?",
+            ((sheet.profession, user_id, cid) for cid, (sheet, _) in latest.items() if cid not in new_ids),
+        )
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO attributes (character_id, str, con, siz, dex, app, int, pow, edu)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            ((cid, *(sheet.stats.get(k) for k in _STAT_KEYS)) for cid, (sheet, _) in latest.items()),
+        )
+
+        def _resources(cid: int, sheet: "ParsedSheet") -> tuple:
+            st = sheet.stats
+            hp_max = (st["CON"] + st["SIZ"]) // 10 if "CON" in st and "SIZ" in st else None
+            mp_max = st["POW"] // 5 if "POW" in st else None
+            san = sheet.san if sheet.san is not None else st.get("POW")
+            hp = sheet.hp if sheet.hp is not None else hp_max
+            mp = sheet.mp if sheet.mp is not None else mp_max
+            return cid, sheet.luck, san, hp, mp, hp_max, mp_max
+
+        conn.executemany(
+            """
+            INSERT INTO character_resources (character_id, luck, san, hp, mp, hp_max, mp_max)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(character_id) DO UPDATE SET
+                luck=excluded.luck, san=excluded.san, hp=excluded.hp, mp=excluded.mp,
+                hp_max=excluded.hp_max, mp_max=excluded.mp_max, updated_at=datetime('now')
+            """,
+            (_resources(cid, sheet) for cid, (sheet, _) in latest.items()),
+        )
+        conn.executemany(
+            """
+            INSERT INTO character_skills (character_id, skill_id, value) VALUES (?, ?, ?)
+            ON CONFLICT(character_id, skill_id) DO UPDATE SET value=excluded.value
+            """,
+            ((cid, int(sid), int(v)) for cid, (_, skills) in latest.items() for sid, v in skills.items()),
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return ids
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, Optional
+
+from cocbot.mechanics.combat import Combatant
+from cocbot.mechanics.derived import damage_bonus_and_build
+
+
+def load_combatants(conn: sqlite3.Connection, guild_id: str) -> Dict[int, Combatant]:
+    """
+    One query for the whole encounter.
+    """
+    rows = conn.execute(
+        """
+        SELECT combatant_id, name, dex, hp, hp_max, fight, dodge, damage, db, major_wound
+        FROM combatants
+        WHERE guild_id=?
+        """,
+        (guild_id,),
+    ).fetchall()
+    return {
+        int(r[0]): Combatant(
+            combatant_id=int(r[0]),
+            name=str(r[1]),
+            dex=int(r[2]),
+            hp=int(r[3]),
+            hp_max=int(r[4]),
+            fight=int(r[5]),
+            dodge=int(r[6]),
+            damage=str(r[7]),
+            db=str(r[8]),
+            major_wound=bool(r[9]),
+        )
+        for r in rows
+    }
+
+
+def next_combatant_id(conn: sqlite3.Connection, guild_id: str) -> int:
+    row = conn.execute("SELECT MAX(combatant_id) FROM combatants WHERE guild_id=?", (guild_id,)).fetchone()
+    return int(row[0] or 0) + 1
+
+
+def combatant_from_character(
+    conn: sqlite3.Connection, guild_id: str, character_id: int, combatant_id: int
+) -> Optional[Combatant]:
+    """
+    Combat record for one of the guild's characters, in one query: DEX and
+    damage bonus from attributes, HP from the resource ledger, Brawl / Dodge
+    from their sheet (skill base / DEX/2 when not on it).
+    """
+    row = conn.execute(
+        """
+        SELECT c.name, a.str, a.siz, a.dex, a.con, r.hp, r.hp_max,
+               (SELECT COALESCE(cs.value, sd.base) FROM skill_defs sd
+                LEFT JOIN character_skills cs ON cs.skill_id = sd.skill_id AND cs.character_id = c.character_id
+                WHERE sd.key = 'brawl'),
+               (SELECT cs.value FROM skill_defs sd
+                JOIN character_skills cs ON cs.skill_id = sd.skill_id AND cs.character_id = c.character_id
+                WHERE sd.key = 'dodge')
+        FROM characters c
+        LEFT JOIN attributes a ON a.character_id = c.character_id
+        LEFT JOIN character_resources r ON r.character_id = c.character_id
+        WHERE c.character_id = ? AND c.guild_id = ?
+        """,
+        (int(character_id), guild_id),
+    ).fetchone()
+    if row is None:
+        return None
+    name, str_, siz, dex, con, hp, hp_max, brawl, dodge = row
+    dex = int(dex) if dex is not None else 50
+    if hp_max is None:
+        hp_max = (int(con) + int(siz)) // 10 if con is not None and siz is not None else 10
+    db = damage_bonus_and_build(str_, siz)[0] if str_ is not None and siz is not None else "0"
+    return Combatant(
+        combatant_id=int(combatant_id),
+        name=str(name),
+        dex=dex,
+        hp=int(hp if hp is not None else hp_max),
+        hp_max=int(hp_max),
+        fight=int(brawl if brawl is not None else 25),
+        dodge=int(dodge if dodge is not None else dex // 2),
+        db=db,
+    )
+
+
+def upsert_combatants(conn: sqlite3.Connection, guild_id: str, combatants: Iterable[Combatant]) -> None:
+    conn.executemany(
+        """
+        INSERT INTO combatants (guild_id, combatant_id, name, dex, hp, hp_max, fight, dodge, damage, db, major_wound)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(guild_id, combatant_id) DO UPDATE SET
+            name=excluded.name, dex=excluded.dex, hp=excluded.hp, hp_max=excluded.hp_max,
+            fight=excluded.fight, dodge=excluded.dodge, damage=excluded.damage, db=excluded.db,
+            major_wound=excluded.major_wound
+        """,
+        [
+            (guild_id, c.combatant_id, c.name, c.dex, c.hp, c.hp_max, c.fight, c.dodge, c.damage, c.db, int(c.major_wound))
+            for c in combatants
+        ],
+    )
+
+
+def get_round_no(conn: sqlite3.Connection, guild_id: str) -> int:
+    row = conn.execute("SELECT round_no FROM combat_state WHERE guild_id=?", (guild_id,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def save_round(conn: sqlite3.Connection, guild_id: str, combatants: Iterable[Combatant], round_no: int) -> None:
+    """
+    Persist a resolved round in a single transaction: HP/wounds for every
+    combatant (one executemany) plus the round counter.
+    """
+    with conn:
+        conn.executemany(
+            "UPDATE combatants SET hp=?, major_wound=? WHERE guild_id=? AND combatant_id=?",
+            [(c.hp, int(c.major_wound), guild_id, c.combatant_id) for c in combatants],
+        )
+        conn.execute(
+            """
+            INSERT INTO combat_state (guild_id, round_no, updated_at)
+            VALUES (?, ?, datetime('now'))
+            ON CONFLICT(guild_id) DO UPDATE SET round_no=excluded.round_no, updated_at=excluded.updated_at
+            """,
+            (guild_id, int(round_no)),
+        )
+
+
+def clear_combat(conn: sqlite3.Connection, guild_id: str) -> None:
+    with conn:
+        conn.execute("DELETE FROM combatants WHERE guild_id=?", (guild_id,))
+        conn.execute("DELETE FROM combat_state WHERE guild_id=?", (guild_id,))
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class SyncState:
+    scope: str
+    tree_hash: str
+    synced_at: str
+    sync_ms: Optional[float]
+
+
+def get_sync_state(conn: sqlite3.Connection, scope: str) -> Optional[SyncState]:
+    row = conn.execute(
+        "SELECT scope, tree_hash, synced_at, sync_ms FROM command_sync_state WHERE scope=?",
+        (scope,),
+    ).fetchone()
+    if not row:
+        return None
+    return SyncState(
+        scope=str(row[0]),
+        tree_hash=str(row[1]),
+        synced_at=str(row[2]),
+        sync_ms=None if row[3] is None else float(row[3]),
+    )
+
+
+def set_sync_state(conn: sqlite3.Connection, scope: str, tree_hash: str, sync_ms: float) -> None:
+    conn.execute(
+        """
+        INSERT INTO command_sync_state (scope, tree_hash, synced_at, sync_ms)
+        VALUES (?, ?, datetime('now'), ?)
+        ON CONFLICT(scope) DO UPDATE SET
+            tree_hash=excluded.tree_hash,
+            synced_at=excluded.synced_at,
+            sync_ms=excluded.sync_ms
+        """,
+        (scope, tree_hash, float(sync_ms)),
+    )
@@ -5,11 +5,12 @@ from contextlib import contextmanager
 from typing import Iterator
 
 from cocbot.config import settings
+from cocbot.runtime.profiler import connection_class
 
 
 def connect() -> sqlite3.Connection:
     settings.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(settings.DB_PATH)
+    conn = sqlite3.connect(settings.DB_PATH, factory=connection_class())
     conn.row_factory = sqlite3.Row
     return conn
 
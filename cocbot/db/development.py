@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from cocbot.db import resources as ledger
+from cocbot.mechanics.development import NO_IMPROVEMENT, DevelopmentResult, roll_development
+
+_EXCLUDED = ",".join(f"'{k}'" for k in NO_IMPROVEMENT)
+
+
+def tick_active_skill(conn: sqlite3.Connection, guild_id: str, skill_id: int) -> bool:
+    """
+    Mark a successful check of the active character's own skill. No-op (False)
+    when the skill isn't on their sheet, is already ticked, or can't improve.
+    """
+    cur = conn.execute(
+        f"""
+        UPDATE character_skills SET ticked = 1
+        WHERE ticked = 0 AND skill_id = :sid
+          AND character_id = (SELECT active_character_id FROM guild_settings WHERE guild_id = :gid)
+          AND skill_id NOT IN (SELECT skill_id FROM skill_defs WHERE key IN ({_EXCLUDED}))
+        """,
+        {"sid": int(skill_id), "gid": str(guild_id)},
+    )
+    return cur.rowcount > 0
+
+
+@dataclass(frozen=True)
+class DevelopmentReport:
+    result: DevelopmentResult
+    character_names: Dict[int, str]
+    skill_names: Dict[int, str]
+    san_after: Dict[int, int]
+
+    def lines(self) -> List[str]:
+        r = self.result
+        out: List[str] = []
+        order = np.argsort(r.character_ids, kind="stable")
+        cur = None
+        parts: List[str] = []
+
+        def _flush() -> None:
+            if cur is None:
+                return
+            line = f"**{self.character_names.get(cur, cur)}**: " + ", ".join(parts)
+            if cur in self.san_after:
+                line += f" · SAN → {self.san_after[cur]}"
+            out.append(line)
+
+        for i in order:
+            cid = int(r.character_ids[i])
+            if cid != cur:
+                _flush()
+                cur, parts = cid, []
+            name = self.skill_names.get(int(r.skill_ids[i]), str(int(r.skill_ids[i])))
+            if r.gains[i]:
+                bonus = f" (+{int(r.san_bonus[i])} SAN)" if r.san_bonus[i] else ""
+                parts.append(f"{name} {int(r.old[i])}→**{int(r.old[i] + r.gains[i])}**{bonus}")
+            else:
+                parts.append(f"{name} {int(r.old[i])}")
+        _flush()
+        return out
+
+
+def run_development_phase(
+    conn: sqlite3.Connection, guild_id: str, lang: str = "en", rng: np.random.Generator | None = None
+) -> DevelopmentReport:
+    """
+    Improvement rolls for every ticked skill of every character in the guild:
+    one read of the ticked skills, one vectorized resolution, one executemany
+    writing new values and clearing the ticks (plus one UPDATE for SAN bonuses).
+    """
+    rows = conn.execute(
+        f"""
+        SELECT cs.character_id, cs.skill_id, cs.value, c.name, COALESCE(i.name, sd.key)
+        FROM character_skills cs
+        JOIN characters c ON c.character_id = cs.character_id
+        JOIN skill_defs sd ON sd.skill_id = cs.skill_id
+        LEFT JOIN skill_def_i18n i ON i.skill_id = cs.skill_id AND i.lang = ?
+        WHERE c.guild_id = ? AND cs.ticked = 1 AND sd.key NOT IN ({_EXCLUDED})
+        """,
+        (lang, str(guild_id)),
+    ).fetchall()
+
+    cids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    sids = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+    vals = np.fromiter((r[2] for r in rows), dtype=np.int32, count=len(rows))
+    result = roll_development(cids, sids, vals, rng)
+
+    conn.executemany(
+        "UPDATE character_skills SET value = ?, ticked = 0 WHERE character_id = ? AND skill_id = ?",
+        zip(result.new.tolist(), cids.tolist(), sids.tolist()),
+    )
+    san = result.san_by_character()
+    san_after = ledger.adjust_many(conn, guild_id, "san", san) if san else {}
+
+    return DevelopmentReport(
+        result=result,
+        character_names={int(r[0]): str(r[3]) for r in rows},
+        skill_names={int(r[1]): str(r[4]) for r in rows},
+        san_after=san_after,
+    )
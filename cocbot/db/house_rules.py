@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import astuple
+from typing import Dict, Optional
+
+from cocbot.mechanics.house_rules import DEFAULT_RULES, CompiledRules, HouseRules, compile_rules
+from cocbot.runtime.metrics import metrics
+
+_COLUMNS = "crit_max, fumble_min_low, fumble_min_high, fumble_split, allow_push, allow_luck"
+
+
+def load_house_rules(conn: sqlite3.Connection, guild_id: str) -> HouseRules:
+    try:
+        row = conn.execute(f"SELECT {_COLUMNS} FROM guild_rules WHERE guild_id=?", (str(guild_id),)).fetchone()
+    except sqlite3.OperationalError:
+        # 010_guild_rules.sql not applied yet
+        return DEFAULT_RULES
+    if not row:
+        return DEFAULT_RULES
+    return HouseRules(
+        crit_max=int(row[0]),
+        fumble_min_low=int(row[1]),
+        fumble_min_high=None if row[2] is None else int(row[2]),
+        fumble_split=int(row[3]),
+        allow_push=bool(row[4]),
+        allow_luck=bool(row[5]),
+    )
+
+
+def save_house_rules(conn: sqlite3.Connection, guild_id: str, rules: HouseRules) -> None:
+    rules.validate()
+    conn.execute(
+        f"""
+        INSERT INTO guild_rules (guild_id, {_COLUMNS}, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(guild_id) DO UPDATE SET
+          crit_max=excluded.crit_max,
+          fumble_min_low=excluded.fumble_min_low,
+          fumble_min_high=excluded.fumble_min_high,
+          fumble_split=excluded.fumble_split,
+          allow_push=excluded.allow_push,
+          allow_luck=excluded.allow_luck,
+          updated_at=excluded.updated_at
+        """,
+        (str(guild_id), *(int(v) if isinstance(v, bool) else v for v in astuple(rules))),
+    )
+
+
+class RulesCache:
+    """
+    Compiled rules per guild. The first check in a guild loads its row once;
+    after that a check is a dict lookup plus a table index. Saving rules
+    through /houserules replaces the entry, so nothing has to be re-read.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, CompiledRules] = {}
+
+    def get(self, guild_id: Optional[str]) -> Optional[CompiledRules]:
+        if guild_id is None:
+            return compile_rules()
+        return self._data.get(str(guild_id))
+
+    def load(self, conn: sqlite3.Connection, guild_id: str) -> CompiledRules:
+        compiled = compile_rules(load_house_rules(conn, guild_id))
+        metrics.incr("house_rules.load")
+        with self._lock:
+            self._data[str(guild_id)] = compiled
+        return compiled
+
+    def put(self, guild_id: str, rules: HouseRules) -> CompiledRules:
+        compiled = compile_rules(rules)
+        with self._lock:
+            self._data[str(guild_id)] = compiled
+        return compiled
+
+    def invalidate(self, guild_id: str) -> None:
+        with self._lock:
+            self._data.pop(str(guild_id), None)
+
+
+cache = RulesCache()
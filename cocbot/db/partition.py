@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cocbot.runtime.metrics import metrics
+from cocbot.runtime.profiler import connection_class
+
+# Tables holding a guild's mutable data. In per-guild storage they live in
+# data/guilds/<guild_id>.sqlite3; everything else (skill defs, i18n, aliases,
+# professions, ...) is read from the shared DB, ATTACHed read-only as `ref`.
+# Unqualified table names resolve to the guild file first, so existing queries
+# (e.g. skill_defs JOIN character_skills) work unchanged.
+GUILD_TABLES = (
+    "guild_settings",
+    "guild_rules",
+    "characters",
+    "attributes",
+    "character_resources",
+    "character_skills",
+    "combatants",
+    "combat_state",
+)
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def guild_db_path(guild_dir: Path, guild_id: str) -> Path:
+    gid = str(guild_id)
+    if not _SAFE_ID.match(gid):
+        raise ValueError(f"Invalid guild id: {gid!r}")
+    return Path(guild_dir) / f"{gid}.sqlite3"
+
+
+def load_guild_schema(ref: sqlite3.Connection, schema: str = "main") -> List[Tuple[str, str, str]]:
+    """
+    (type, name, sql) of the guild tables and their indexes, taken from the
+    reference DB so migrations only have to be written once.
+    """
+    marks = ",".join("?" * len(GUILD_TABLES))
+    rows = ref.execute(
+        f"""
+        SELECT type, name, sql FROM {schema}.sqlite_master
+        WHERE tbl_name IN ({marks}) AND sql IS NOT NULL AND type IN ('table', 'index')
+        ORDER BY type = 'index', name
+        """,
+        GUILD_TABLES,
+    ).fetchall()
+    return [(str(t), str(n), str(s)) for t, n, s in rows]
+
+
+def ensure_guild_schema(conn: sqlite3.Connection, ddl: List[Tuple[str, str, str]]) -> int:
+    """
+    Create guild tables/indexes missing from the guild file. Returns how many were created.
+    """
+    # write lock first, so two connections opening a new file can't both create a table
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        have = {str(r[0]) for r in conn.execute("SELECT name FROM main.sqlite_master")}
+        created = 0
+        for _, name, sql in ddl:
+            if name in have:
+                continue
+            # DDL is stored without a schema qualifier; it lands in main (the guild file)
+            conn.execute(sql)
+            created += 1
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return created
+
+
+@dataclass
+class _Handle:
+    conn: sqlite3.Connection
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    users: int = 0
+
+
+class GuildDBPool:
+    """
+    Bounded LRU of per-guild SQLite handles.
+
+    Each guild file is opened (and created, with the guild tables) the first
+    time the guild is used; the shared reference DB is ATTACHed read-only.
+    Separate files mean separate writer locks, so busy guilds don't serialize
+    each other. At most `max_open` handles stay open; the least recently used
+    idle one is closed when the pool is full.
+
+    A handle is used by one caller at a time (per-guild lock), so never hold
+    `connection()` across an await.
+    """
+
+    def __init__(self, ref_path: Path, guild_dir: Path, max_open: int = 64) -> None:
+        self.ref_path = Path(ref_path)
+        self.guild_dir = Path(guild_dir)
+        self.max_open = max(1, int(max_open))
+        self._lock = threading.Lock()
+        self._handles: "OrderedDict[str, _Handle]" = OrderedDict()
+        self._ddl: Optional[List[Tuple[str, str, str]]] = None
+
+    # ---------- open / evict ----------
+
+    def _open(self, guild_id: str) -> sqlite3.Connection:
+        path = guild_db_path(self.guild_dir, guild_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            path.resolve().as_uri(), uri=True, check_same_thread=False, factory=connection_class()
+        )
+        try:
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA busy_timeout = 5000;")
+            conn.execute("PRAGMA foreign_keys = ON;")
+            conn.execute("ATTACH DATABASE ? AS ref", (self.ref_path.resolve().as_uri() + "?mode=ro",))
+            if self._ddl is None:
+                self._ddl = load_guild_schema(conn, "ref")
+            ensure_guild_schema(conn, self._ddl)
+        except BaseException:
+            conn.close()
+            raise
+        metrics.incr("guilddb.open")
+        return conn
+
+    def _evict(self) -> None:
+        # called with self._lock held
+        for gid in list(self._handles):
+            if len(self._handles) <= self.max_open:
+                return
+            h = self._handles[gid]
+            if h.users or not h.lock.acquire(blocking=False):
+                continue
+            try:
+                h.conn.close()
+            finally:
+                h.lock.release()
+            del self._handles[gid]
+            metrics.incr("guilddb.evict")
+
+    def _checkout(self, guild_id: str) -> _Handle:
+        gid = str(guild_id)
+        with self._lock:
+            h = self._handles.get(gid)
+            if h is not None:
+                self._handles.move_to_end(gid)
+                h.users += 1
+                metrics.incr("guilddb.hit")
+                return h
+
+        # open (connect, ATTACH, DDL) without the pool lock, so other guilds'
+        # checkouts don't wait on this file
+        conn = self._open(gid)
+        with self._lock:
+            h = self._handles.get(gid)
+            raced = h is not None
+            if h is None:
+                h = _Handle(conn)
+                self._handles[gid] = h
+            else:
+                self._handles.move_to_end(gid)
+            h.users += 1
+            self._evict()
+        if raced:
+            # another thread opened this guild first; use its handle
+            conn.close()
+            metrics.incr("guilddb.open_race")
+        return h
+
+    # ---------- public ----------
+
+    @contextmanager
+    def connection(self, guild_id: str) -> Iterator[sqlite3.Connection]:
+        """
+        Exclusive use of the guild's handle. Commits on success, rolls back on error.
+        """
+        h = self._checkout(guild_id)
+        try:
+            with h.lock:
+                try:
+                    yield h.conn
+                    h.conn.commit()
+                except BaseException:
+                    h.conn.rollback()
+                    raise
+        finally:
+            with self._lock:
+                h.users -= 1
+
+    def open_guilds(self) -> List[str]:
+        with self._lock:
+            return list(self._handles)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"open": len(self._handles), "max_open": self.max_open}
+
+    def close_all(self) -> None:
+        with self._lock:
+            for h in self._handles.values():
+                with h.lock:
+                    h.conn.close()
+            self._handles.clear()
+
+
+def _make_default() -> GuildDBPool:
+    from cocbot.config import settings
+
+    return GuildDBPool(settings.DB_PATH, settings.GUILD_DB_DIR, settings.GUILD_DB_MAX_OPEN)
+
+
+guild_dbs = _make_default()
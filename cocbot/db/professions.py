@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from cocbot.db.repo_skill_defs import load_skill_name_index
+from cocbot.mechanics.chargen import ResolvedTemplate, SkillTable, resolve_template
+from cocbot.mechanics.professions import parse_profession
+
+# Skills never picked at random for an occupation
+_NOT_RANDOM = ("cthulhu_mythos", "credit_rating")
+
+_lock = threading.Lock()
+_cached: Optional[Tuple[SkillTable, Dict[str, ResolvedTemplate]]] = None
+
+
+def load_skill_table(conn: sqlite3.Connection) -> SkillTable:
+    rows = conn.execute("SELECT skill_id, key, base FROM skill_defs").fetchall()
+    max_id = max((int(r[0]) for r in rows), default=0)
+    base_by_id = np.zeros(max_id + 1, dtype=np.int16)
+    key_to_id: Dict[str, int] = {}
+    for sid, key, base in rows:
+        base_by_id[int(sid)] = int(base or 0)
+        key_to_id[str(key)] = int(sid)
+
+    pool = np.asarray(
+        sorted(sid for key, sid in key_to_id.items() if key not in _NOT_RANDOM),
+        dtype=np.int32,
+    )
+    return SkillTable(
+        base_by_id=base_by_id,
+        pool=pool,
+        name_index=load_skill_name_index(conn, "zh"),
+        dodge_id=key_to_id.get("dodge"),
+        language_own_id=key_to_id.get("language_own"),
+        credit_id=key_to_id.get("credit_rating"),
+    )
+
+
+def load_profession_templates(conn: sqlite3.Connection, table: SkillTable) -> Dict[str, ResolvedTemplate]:
+    """
+    Parse professions.attrs_formula / skills_raw into templates (once per load).
+    The professions table is filled by scripts/import_master_from_excel.py.
+    """
+    try:
+        rows = conn.execute(
+            "SELECT name_zh, credit_min, credit_max, attrs_formula, skills_raw FROM professions"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+
+    out: Dict[str, ResolvedTemplate] = {}
+    for name, cmin, cmax, formula, skills_raw in rows:
+        if not name or name == "自定义职业":
+            continue
+        t = parse_profession(str(name), cmin, cmax, formula, skills_raw)
+        out[t.name] = resolve_template(t, table)
+    return out
+
+
+def get_generation_data(conn: sqlite3.Connection, reload: bool = False) -> Tuple[SkillTable, Dict[str, ResolvedTemplate]]:
+    """
+    Cached (skill table, templates). Pass reload=True after re-importing professions.
+    """
+    global _cached
+    with _lock:
+        if _cached is None or reload:
+            table = load_skill_table(conn)
+            _cached = (table, load_profession_templates(conn, table))
+        return _cached
+
+
+def find_template(templates: Dict[str, ResolvedTemplate], query: str) -> Optional[ResolvedTemplate]:
+    q = (query or "").strip()
+    if not q:
+        return None
+    if q in templates:
+        return templates[q]
+    for name, t in templates.items():
+        if q in name:
+            return t
+    return None
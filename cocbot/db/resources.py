@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+
+# Column -> upper bound expression. Values are clamped to [0, bound] on every change.
+_BOUNDS = {
+    "luck": "99",
+    "san": "99",
+    "hp": "COALESCE(hp_max, hp + :delta)",
+    "mp": "COALESCE(mp_max, mp + :delta)",
+}
+RESOURCES = tuple(_BOUNDS)
+
+# Every UPDATE returns the whole ledger row, so the cache gets a complete entry
+# even for a row it has never seen.
+_ROW = "character_id, luck, san, hp, mp, hp_max, mp_max"
+
+
+@dataclass(frozen=True)
+class Resources:
+    character_id: int
+    luck: Optional[int]
+    san: Optional[int]
+    hp: Optional[int]
+    mp: Optional[int]
+    hp_max: Optional[int]
+    mp_max: Optional[int]
+
+
+class ResourceCache:
+    """
+    Last known resource values per (guild, character), refreshed from every
+    UPDATE ... RETURNING, plus each guild's active character, so /check can
+    show "Luck Now" without a query. Keys include the guild because with
+    COC_STORAGE_MODE=guild every guild file is its own id space.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[Tuple[str, int], Resources] = {}
+        self._active: Dict[str, Optional[int]] = {}
+
+    def get(self, guild_id: str, character_id: int) -> Optional[Resources]:
+        return self._data.get((str(guild_id), int(character_id)))
+
+    def value(self, guild_id: str, character_id: int, resource: str) -> Optional[int]:
+        r = self._data.get((str(guild_id), int(character_id)))
+        return None if r is None else getattr(r, resource)
+
+    def put(self, guild_id: str, res: Resources) -> None:
+        with self._lock:
+            self._data[(str(guild_id), res.character_id)] = res
+
+    def invalidate(self, guild_id: str, character_id: int) -> None:
+        with self._lock:
+            self._data.pop((str(guild_id), int(character_id)), None)
+
+    def knows_active(self, guild_id: str) -> bool:
+        return str(guild_id) in self._active
+
+    def set_active(self, guild_id: str, character_id: Optional[int]) -> None:
+        with self._lock:
+            self._active[str(guild_id)] = None if character_id is None else int(character_id)
+
+    def active_value(self, guild_id: str, resource: str) -> Optional[int]:
+        """
+        `resource` of the guild's active character, if both are cached.
+        """
+        cid = self._active.get(str(guild_id))
+        return None if cid is None else self.value(guild_id, cid, resource)
+
+
+cache = ResourceCache()
+
+
+def _check(resource: str) -> str:
+    if resource not in _BOUNDS:
+        raise ValueError(f"Unknown resource: {resource} (expected one of {', '.join(RESOURCES)})")
+    return resource
+
+
+def _row_to_resources(row) -> Resources:
+    return Resources(
+        character_id=int(row[0]),
+        luck=row[1], san=row[2], hp=row[3], mp=row[4], hp_max=row[5], mp_max=row[6],
+    )
+
+
+def ensure_resources(conn: sqlite3.Connection, character_id: int) -> None:
+    """
+    Seed a ledger row from attributes if there is none yet:
+    SAN = POW, MP = POW/5, HP = (CON+SIZ)/10. Luck isn't an attribute, so it
+    stays NULL until set (set_resource, `/adjust value:`).
+    """
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO character_resources (character_id, luck, san, hp, mp, hp_max, mp_max)
+        SELECT ?, NULL, a.pow, (a.con + a.siz) / 10, a.pow / 5, (a.con + a.siz) / 10, a.pow / 5
+        FROM (SELECT 1) AS one
+        LEFT JOIN attributes a ON a.character_id = ?
+        """,
+        (int(character_id), int(character_id)),
+    )
+
+
+def ensure_guild_resources(conn: sqlite3.Connection, guild_id: str) -> None:
+    """
+    ensure_resources() for every character of a guild, as one statement.
+    """
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO character_resources (character_id, luck, san, hp, mp, hp_max, mp_max)
+        SELECT c.character_id, NULL, a.pow, (a.con + a.siz) / 10, a.pow / 5, (a.con + a.siz) / 10, a.pow / 5
+        FROM characters c
+        LEFT JOIN attributes a ON a.character_id = c.character_id
+        WHERE c.guild_id = ?
+        """,
+        (guild_id,),
+    )
+
+
+def get_resources(conn: sqlite3.Connection, guild_id: str, character_id: int) -> Optional[Resources]:
+    row = conn.execute(
+        f"SELECT {_ROW} FROM character_resources WHERE character_id=?",
+        (int(character_id),),
+    ).fetchone()
+    if not row:
+        return None
+    res = _row_to_resources(row)
+    cache.put(guild_id, res)
+    return res
+
+
+def load_active_resources(conn: sqlite3.Connection, guild_id: str) -> Optional[Resources]:
+    """
+    The guild's active character and its ledger row in one query; both are
+    cached (also when there is no active character, so it isn't asked again).
+    """
+    row = conn.execute(
+        """
+        SELECT gs.active_character_id, r.luck, r.san, r.hp, r.mp, r.hp_max, r.mp_max, r.character_id
+        FROM guild_settings gs
+        LEFT JOIN character_resources r ON r.character_id = gs.active_character_id
+        WHERE gs.guild_id = ?
+        """,
+        (str(guild_id),),
+    ).fetchone()
+    cid = None if row is None or row[0] is None else int(row[0])
+    cache.set_active(guild_id, cid)
+    if cid is None or row[7] is None:
+        return None
+    res = _row_to_resources(row)
+    cache.put(guild_id, res)
+    return res
+
+
+def set_resource(
+    conn: sqlite3.Connection, guild_id: str, character_id: int, resource: str, value: Optional[int]
+) -> Optional[int]:
+    """
+    Overwrite one resource (also a NULL, untracked one). Returns the stored
+    value, or None if the character has no ledger row.
+    """
+    col = _check(resource)
+    row = conn.execute(
+        f"UPDATE character_resources SET {col}=?, updated_at=datetime('now') WHERE character_id=? RETURNING {_ROW}",
+        (value, int(character_id)),
+    ).fetchone()
+    if row is None:
+        return None
+    res = _row_to_resources(row)
+    cache.put(guild_id, res)
+    return getattr(res, col)
+
+
+def adjust_resource(
+    conn: sqlite3.Connection, guild_id: str, character_id: int, resource: str, delta: int
+) -> Optional[int]:
+    """
+    value := clamp(value + delta) in one statement. Returns the new value,
+    or None if the character has no ledger row or the resource is untracked (NULL).
+    """
+    col = _check(resource)
+    row = conn.execute(
+        f"""
+        UPDATE character_resources
+        SET {col} = MAX(0, MIN({_BOUNDS[col]}, {col} + :delta)), updated_at = datetime('now')
+        WHERE character_id = :cid AND {col} IS NOT NULL
+        RETURNING {_ROW}
+        """,
+        {"delta": int(delta), "cid": int(character_id)},
+    ).fetchone()
+    if row is None:
+        return None
+    res = _row_to_resources(row)
+    cache.put(guild_id, res)
+    return int(getattr(res, col))
+
+
+def spend_resource(
+    conn: sqlite3.Connection, guild_id: str, character_id: int, resource: str, amount: int
+) -> Optional[int]:
+    """
+    Atomically take `amount` if (and only if) enough is left. Returns the
+    remaining value, or None when the spend was refused.
+    """
+    col = _check(resource)
+    amount = int(amount)
+    row = conn.execute(
+        f"""
+        UPDATE character_resources
+        SET {col} = {col} - ?, updated_at = datetime('now')
+        WHERE character_id = ? AND {col} >= ?
+        RETURNING {_ROW}
+        """,
+        (amount, int(character_id), amount),
+    ).fetchone()
+    if row is None:
+        return None
+    res = _row_to_resources(row)
+    cache.put(guild_id, res)
+    return int(getattr(res, col))
+
+
+def adjust_many(
+    conn: sqlite3.Connection, guild_id: str, resource: str, deltas: Mapping[int, int]
+) -> Dict[int, int]:
+    """
+    Apply per-character deltas (e.g. a group SAN loss) in ONE statement.
+    Returns {character_id: new_value} for the rows that were updated.
+    """
+    col = _check(resource)
+    if not deltas:
+        return {}
+    bound = _BOUNDS[col].replace(":delta", "d.delta")
+    values_sql = ", ".join("(?, ?)" for _ in deltas)
+    params: list = []
+    for cid, d in deltas.items():
+        params.extend((int(cid), int(d)))
+
+    rows = conn.execute(
+        f"""
+        WITH d(cid, delta) AS (VALUES {values_sql})
+        UPDATE character_resources
+        SET {col} = (
+                SELECT MAX(0, MIN({bound}, {col} + d.delta))
+                FROM d WHERE d.cid = character_resources.character_id
+            ),
+            updated_at = datetime('now')
+        WHERE character_id IN (SELECT cid FROM d) AND {col} IS NOT NULL
+        RETURNING {_ROW}
+        """,
+        params,
+    ).fetchall()
+
+    out: Dict[int, int] = {}
+    for row in rows:
+        res = _row_to_resources(row)
+        cache.put(guild_id, res)
+        out[res.character_id] = int(getattr(res, col))
+    return out
+
+
+def load_guild_resources(conn: sqlite3.Connection, guild_id: str) -> Dict[int, Resources]:
+    """
+    Ledger rows for every player character in a guild, in one query (warms the cache).
+    """
+    rows = conn.execute(
+        """
+        SELECT r.character_id, r.luck, r.san, r.hp, r.mp, r.hp_max, r.mp_max
+        FROM character_resources r
+        JOIN characters c ON c.character_id = r.character_id
+        WHERE c.guild_id = ? AND c.user_id IS NOT NULL
+        """,
+        (guild_id,),
+    ).fetchall()
+    out: Dict[int, Resources] = {}
+    for row in rows:
+        res = _row_to_resources(row)
+        cache.put(guild_id, res)
+        out[res.character_id] = res
+    return out
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from cocbot.db.connection import get_conn
+from cocbot.runtime.metrics import metrics
+
+
+@dataclass(frozen=True, slots=True)
+class SkillDef:
+    skill_id: int
+    key: str
+    base: int
+    category_key: str | None
+    is_derived: int
+    derived_formula: str | None
+    display_name: str
+
+
+@dataclass(frozen=True)
+class SkillMaster:
+    key: str          # canonical EN key in DB
+    zh: str           # Chinese display name in DB
+    base: int         # base %
+
+
+# Lowercased input split into CJK runs and other word runs; spaces,
+# punctuation and underscores only separate tokens.
+_TOKEN_RE = re.compile(r"[\u4e00-\u9fff]+|[^\W_\u4e00-\u9fff]+")
+
+# Priority of a name within one language: aliases win over i18n names,
+# which win over skills_master names and finally the canonical keys.
+_ALIAS, _NAME, _MASTER, _KEY = range(4)
+
+
+def normalize(text: str) -> Tuple[str, str]:
+    """
+    (catalog key, detected language) in one regex pass: "Rifle/Shotgun",
+    "rifle_shotgun" and "rifle shotgun" share a key, and any CJK run makes
+    the query "zh".
+    """
+    tokens = _TOKEN_RE.findall(text.casefold())
+    lang = "zh" if any("\u4e00" <= t[0] <= "\u9fff" for t in tokens) else "en"
+    return "".join(tokens), lang
+
+
+class SkillCatalog:
+    """
+    One index over every skill name the DB knows: skill_defs keys,
+    skill_def_i18n names, skill_def_aliases and (when the Excel importer has
+    run) skills_master. Names are normalized once at load; a lookup is one
+    normalize() call and two dict reads, and falls back to another language
+    when the query only matches there. SkillDef objects are prebuilt per
+    language and shared between lookups.
+    """
+
+    def __init__(self) -> None:
+        self.langs: Tuple[str, ...] = ()
+        self._index: Dict[str, Dict[str, int]] = {}             # key -> lang -> skill_id ("" = best in any lang)
+        self._defs: Dict[Tuple[int, str], SkillDef] = {}        # (skill_id, lang) -> def ("" = default name)
+        self._names: Dict[str, Dict[str, int]] = {}             # lang -> exact name/alias -> skill_id
+        self._master: Dict[int, SkillMaster] = {}
+        self._loose: Dict[str, SkillMaster] = {}              # key -> skills_master row with no skill_defs entry
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "SkillCatalog":
+        defs = conn.execute(
+            "SELECT skill_id, key, base, category_key, is_derived, derived_formula FROM skill_defs"
+        ).fetchall()
+        i18n = conn.execute("SELECT skill_id, lang, name FROM skill_def_i18n").fetchall()
+        aliases = conn.execute("SELECT skill_id, lang, alias FROM skill_def_aliases").fetchall()
+        try:
+            master = conn.execute("SELECT key, zh, base FROM skills_master").fetchall()
+        except sqlite3.OperationalError:
+            # scripts/import_master_from_excel.py not run
+            master = []
+
+        cat = cls()
+        ranked: Dict[str, Dict[str, Tuple[int, int]]] = {}
+
+        def _add(name: Optional[str], lang: str, sid: int, prio: int) -> None:
+            key = normalize(name or "")[0]
+            if not key:
+                return
+            hits = ranked.setdefault(key, {})
+            for slot in (lang, ""):
+                if slot not in hits or prio < hits[slot][0]:
+                    hits[slot] = (prio, sid)
+
+        display: Dict[Tuple[int, str], str] = {}
+        for sid, lang, name in i18n:
+            display[(int(sid), str(lang))] = str(name)
+            cat._names.setdefault(str(lang), {})[str(name)] = int(sid)
+            _add(name, str(lang), int(sid), _NAME)
+        for sid, lang, alias in aliases:
+            cat._names.setdefault(str(lang), {})[str(alias)] = int(sid)
+            _add(alias, str(lang), int(sid), _ALIAS)
+
+        by_key: Dict[str, int] = {}
+        for sid, key, *_ in defs:
+            by_key[normalize(str(key))[0]] = int(sid)
+            _add(str(key), "en", int(sid), _KEY)
+
+        # skills_master keys are spelled differently ("rifle/shotgun" vs rifle_shotgun);
+        # attach each row to its skill_defs entry by key, else by Chinese name
+        for key, zh, base in master:
+            k = str(key or "").strip()
+            z = str(zh or "").strip()
+            sid = by_key.get(normalize(k)[0])
+            if sid is None:
+                hits = ranked.get(normalize(z)[0], {})
+                sid = hits["zh"][1] if "zh" in hits else None
+            if sid is None:
+                # house skills etc. only in the sheet: still findable by their own key/zh
+                row = SkillMaster(key=k, zh=z, base=int(base or 0))
+                for name in (k, z):
+                    nk = normalize(name)[0]
+                    if nk:
+                        cat._loose.setdefault(nk, row)
+                continue
+            cat._master.setdefault(sid, SkillMaster(key=k, zh=z, base=int(base or 0)))
+            _add(k, "en", sid, _MASTER)
+            _add(z, "zh", sid, _MASTER)
+
+        cat._index = {key: {lang: sid for lang, (_, sid) in hits.items()} for key, hits in ranked.items()}
+        cat.langs = tuple(sorted({lang for _, lang in display} | set(cat._names)))
+        for sid, key, base, category_key, is_derived, formula in defs:
+            sid = int(sid)
+            for lang in ("", *cat.langs):
+                name = display.get((sid, lang)) or display.get((sid, "en")) or str(key)
+                cat._defs[(sid, lang)] = SkillDef(
+                    skill_id=sid,
+                    key=str(key),
+                    base=int(base or 0),
+                    category_key=category_key,
+                    is_derived=int(is_derived or 0),
+                    derived_formula=formula,
+                    display_name=name,
+                )
+        metrics.incr("skill_catalog.load")
+        return cat
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def resolve(self, query: str, lang: Optional[str] = None) -> Optional[SkillDef]:
+        """
+        Skill for a user-typed name or alias in any language, with the display
+        name in `lang` (detected from the query when omitted). Matches in that
+        language win; otherwise the best match in any language is used.
+        """
+        key, detected = normalize(query)
+        hits = self._index.get(key)
+        if not hits:
+            return None
+        lang = lang or detected
+        sid = hits.get(lang, hits[""])
+        return self._defs.get((sid, lang)) or self._defs.get((sid, ""))
+
+    def master(self, query: str) -> Optional[SkillMaster]:
+        """
+        skills_master row for a name/alias; rows that map to no skill_defs
+        entry are matched on their own key or zh name.
+        """
+        sd = self.resolve(query)
+        row = None if sd is None else self._master.get(sd.skill_id)
+        return row or self._loose.get(normalize(query)[0])
+
+    def name_index(self, lang: str) -> Dict[str, int]:
+        """
+        Exact name/alias -> skill_id for one language (aliases win over i18n names).
+        """
+        return dict(self._names.get(lang, {}))
+
+
+_lock = threading.Lock()
+_cached: Optional[SkillCatalog] = None
+
+
+def get_catalog(conn: Optional[sqlite3.Connection] = None, reload: bool = False) -> SkillCatalog:
+    """
+    The process-wide catalog, loaded on first use (from `conn`, or the shared
+    DB). Pass reload=True after re-importing skills.
+    """
+    global _cached
+    cat = _cached
+    if cat is not None and not reload:
+        return cat
+    with _lock:
+        if _cached is None or reload:
+            if conn is not None:
+                _cached = SkillCatalog.load(conn)
+            else:
+                with get_conn() as c:
+                    _cached = SkillCatalog.load(c)
+        return _cached
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from cocbot.mechanics.professions import ZH_SKILL_SYNONYMS
+
+# Layout of the 人物卡 sheet in COC七版人物卡v1.35.xlsx (1-based rows/cols).
+SHEET = "人物卡"
+PROFESSION_SHEET = "职业列表"
+
+_NAME, _PLAYER, _OCCUPATION = (3, 3), (4, 3), (5, 3)          # C3, C4, C5
+_STATS = {
+    "STR": (3, 10), "DEX": (3, 13), "POW": (3, 16),             # J3, M3, P3
+    "CON": (5, 10), "APP": (5, 13), "EDU": (5, 16),             # J5, M5, P5
+    "SIZ": (7, 10), "INT": (7, 13),                             # J7, M7
+}
+_HP, _SAN, _LUCK, _MP = (10, 4), (10, 8), (10, 12), (10, 16)   # D10, H10, L10, P10
+_PROFESSION_NO = (12, 4)                                        # D12
+
+SKILL_ROWS = (15, 46)
+# (name col, subskill col, first point col, total col): B/C/E..H/I and L/M/O..R/S
+_SKILL_BLOCKS = ((2, 3, 5, 9), (12, 13, 15, 19))
+_MAX_COL = 19
+
+# Group headings that mean nothing without a specialization (技艺 → 摄影, 格斗 → 斗殴 ...)
+_GROUPS = {"技艺", "格斗", "射击", "科学", "罕见", "外语"}
+
+
+@dataclass(frozen=True)
+class SheetSkill:
+    name: str                    # as written on the sheet
+    sub: Optional[str]           # specialization, e.g. 斗殴 under 格斗
+    value: int
+
+
+@dataclass(frozen=True)
+class ParsedSheet:
+    """
+    One workbook, parsed in a worker process (plain data, so it pickles cheaply).
+    """
+    path: str
+    name: Optional[str] = None
+    player: Optional[str] = None
+    profession: Optional[str] = None
+    stats: Dict[str, int] = field(default_factory=dict)
+    hp: Optional[int] = None
+    san: Optional[int] = None
+    luck: Optional[int] = None
+    mp: Optional[int] = None
+    skills: Tuple[SheetSkill, ...] = ()
+    parse_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _int(x: Any) -> Optional[int]:
+    if x is None or isinstance(x, bool):
+        return None
+    if isinstance(x, (int, float)):
+        return int(x)
+    s = str(x).strip().lstrip("/")
+    try:
+        return int(float(s))
+    except ValueError:
+        return None
+
+
+def _text(x: Any) -> Optional[str]:
+    if x is None:
+        return None
+    s = str(x).strip()
+    return s or None
+
+
+def _cell(grid: Sequence[Sequence[Any]], pos: Tuple[int, int]) -> Any:
+    r, c = pos
+    if r - 1 >= len(grid):
+        return None
+    row = grid[r - 1]
+    return row[c - 1] if c - 1 < len(row) else None
+
+
+def _read_skills(grid: Sequence[Sequence[Any]]) -> Tuple[SheetSkill, ...]:
+    out: List[SheetSkill] = []
+    for name_col, sub_col, first_pts, total_col in _SKILL_BLOCKS:
+        group: Optional[str] = None
+        for r in range(SKILL_ROWS[0], SKILL_ROWS[1] + 1):
+            name = _text(_cell(grid, (r, name_col)))
+            sub = _text(_cell(grid, (r, sub_col)))
+            if name:
+                group = name
+            elif sub and group:
+                name = group          # continuation row of a grouped skill
+            else:
+                continue
+            if sub is None and name in _GROUPS:
+                continue
+
+            total = _int(_cell(grid, (r, total_col)))
+            if total is None:
+                # formulas without cached values (sheet saved by a non-Excel tool)
+                parts = [_int(_cell(grid, (r, c))) for c in range(first_pts, total_col)]
+                total = sum(p for p in parts if p is not None)
+            out.append(SheetSkill(name=name, sub=sub, value=total))
+    return tuple(out)
+
+
+def _profession_by_number(wb: Any, number: Optional[int]) -> Optional[str]:
+    if number is None or number <= 1 or PROFESSION_SHEET not in wb.sheetnames:
+        return None          # 0 = no template, 1 = 自定义职业
+    for row in wb[PROFESSION_SHEET].iter_rows(min_row=2, max_col=2, values_only=True):
+        if _int(row[0]) == number:
+            return _text(row[1])
+    return None
+
+
+def parse_sheet(path: str) -> ParsedSheet:
+    """
+    Read one 人物卡 workbook. Never raises: failures come back in `.error`
+    so one bad file doesn't stop a batch.
+    """
+    t0 = time.perf_counter()
+    try:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            if SHEET not in wb.sheetnames:
+                raise ValueError(f"sheet '{SHEET}' not found")
+            grid = [
+                tuple(row)
+                for row in wb[SHEET].iter_rows(min_row=1, max_row=SKILL_ROWS[1], max_col=_MAX_COL, values_only=True)
+            ]
+            stats = {k: v for k, pos in _STATS.items() if (v := _int(_cell(grid, pos)))}
+            if not stats:
+                raise ValueError("no characteristics filled in")
+
+            profession = _text(_cell(grid, _OCCUPATION)) or _profession_by_number(wb, _int(_cell(grid, _PROFESSION_NO)))
+            sheet = ParsedSheet(
+                path=path,
+                name=_text(_cell(grid, _NAME)),
+                player=_text(_cell(grid, _PLAYER)),
+                profession=profession,
+                stats=stats,
+                hp=_int(_cell(grid, _HP)),
+                san=_int(_cell(grid, _SAN)),
+                luck=_int(_cell(grid, _LUCK)),
+                mp=_int(_cell(grid, _MP)),
+                skills=_read_skills(grid),
+            )
+        finally:
+            wb.close()
+    except Exception as e:
+        return ParsedSheet(path=path, parse_ms=(time.perf_counter() - t0) * 1000, error=f"{type(e).__name__}: {e}")
+
+    return replace(sheet, parse_ms=(time.perf_counter() - t0) * 1000)
+
+
+def resolve_sheet_skills(
+    skills: Sequence[SheetSkill],
+    index: Dict[str, int],
+) -> Tuple[Dict[int, int], List[str]]:
+    """
+    Map sheet skill names to skill ids with a preloaded name index
+    (see load_skill_name_index). Specializations are tried before their group.
+    Returns ({skill_id: value}, unresolved names).
+    """
+    resolved: Dict[int, int] = {}
+    unresolved: List[str] = []
+    for s in skills:
+        candidates = [s.sub, f"{s.name}({s.sub})", f"{s.name}（{s.sub}）"] if s.sub else []
+        candidates.append(s.name)
+        sid = None
+        for c in candidates:
+            if not c:
+                continue
+            sid = index.get(c)
+            if sid is None:
+                sid = index.get(ZH_SKILL_SYNONYMS.get(c, c))
+            if sid is not None:
+                break
+        if sid is None:
+            unresolved.append(f"{s.name}/{s.sub}" if s.sub else s.name)
+            continue
+        resolved[sid] = max(resolved.get(sid, 0), s.value)
+    return resolved, unresolved
+
+
+def find_workbooks(root: Path) -> List[Path]:
+    if root.is_file():
+        return [root]
+    return sorted(p for p in root.rglob("*.xlsx") if not p.name.startswith("~$"))
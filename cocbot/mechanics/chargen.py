@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cocbot.mechanics.derived import DB_EDGES
+from cocbot.mechanics.professions import PointTerm, ProfessionTemplate
+
+# Vectorized investigator generation: every step works on whole columns, so
+# one investigator and 100k NPCs go through the same code path.
+
+STATS_3D6 = ("STR", "CON", "DEX", "APP", "POW", "LUCK")    # 3d6 × 5
+STATS_2D6_6 = ("SIZ", "INT", "EDU")                         # (2d6+6) × 5
+SKILL_CAP = 90
+
+# same breakpoints as derived.build_for(), as an array for searchsorted
+_DB_EDGES = np.array(DB_EDGES)
+
+
+@dataclass(frozen=True)
+class SkillTable:
+    """
+    Skill data the generator needs, loaded once from skill_defs.
+    """
+    base_by_id: np.ndarray            # int16, indexed by skill_id
+    pool: np.ndarray                  # int32 skill ids eligible for free picks
+    name_index: Dict[str, int]        # zh name/alias -> skill_id
+    dodge_id: Optional[int] = None
+    language_own_id: Optional[int] = None
+    credit_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ResolvedTemplate:
+    name: str
+    credit_min: int
+    credit_max: int
+    point_terms: Tuple[PointTerm, ...]
+    fixed_ids: Tuple[int, ...]
+    choices: Tuple[Tuple[int, Tuple[int, ...]], ...]
+    free_picks: int
+    unresolved: Tuple[str, ...] = ()
+
+    @property
+    def slots(self) -> int:
+        return len(self.fixed_ids) + sum(n for n, _ in self.choices) + self.free_picks
+
+
+def resolve_template(t: ProfessionTemplate, table: SkillTable) -> ResolvedTemplate:
+    """
+    Map skill names to ids once. Names we can't resolve become free picks,
+    so every template still spends the same number of slots.
+    """
+    skip = {table.credit_id}
+    fixed: List[int] = []
+    unresolved: List[str] = []
+    free = t.free_picks
+    for name in t.skills:
+        sid = table.name_index.get(name)
+        if sid is None:
+            unresolved.append(name)
+            free += 1
+        elif sid not in fixed and sid not in skip:
+            fixed.append(sid)
+
+    choices: List[Tuple[int, Tuple[int, ...]]] = []
+    for n, names in t.choices:
+        ids = tuple(dict.fromkeys(
+            table.name_index[x] for x in names
+            if x in table.name_index and table.name_index[x] not in fixed and table.name_index[x] not in skip
+        ))
+        k = min(n, len(ids))
+        if k:
+            choices.append((k, ids))
+        free += n - k
+        unresolved.extend(x for x in names if x not in table.name_index)
+
+    return ResolvedTemplate(
+        name=t.name,
+        credit_min=t.credit_min,
+        credit_max=t.credit_max,
+        point_terms=t.point_terms,
+        fixed_ids=tuple(fixed),
+        choices=tuple(choices),
+        free_picks=free,
+        unresolved=tuple(unresolved),
+    )
+
+
+@dataclass
+class GeneratedBatch:
+    n: int
+    stats: Dict[str, np.ndarray]               # STR..EDU + LUCK, int16
+    hp: np.ndarray
+    mp: np.ndarray
+    san: np.ndarray
+    mov: np.ndarray
+    build: np.ndarray
+    profession: Optional[str] = None
+    skill_ids: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.int32))
+    skill_values: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.int16))
+
+
+def roll_characteristics(n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    d3 = rng.integers(1, 7, size=(len(STATS_3D6), n, 3), dtype=np.int16).sum(axis=2) * 5
+    d2 = (rng.integers(1, 7, size=(len(STATS_2D6_6), n, 2), dtype=np.int16).sum(axis=2) + 6) * 5
+    out = {k: d3[i] for i, k in enumerate(STATS_3D6)}
+    out.update({k: d2[i] for i, k in enumerate(STATS_2D6_6)})
+    return out
+
+
+def derived_stats(stats: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+    """
+    (hp, mp, san, mov, build) as columns.
+    """
+    STR, CON, SIZ, DEX, POW = (stats[k] for k in ("STR", "CON", "SIZ", "DEX", "POW"))
+    hp = (CON + SIZ) // 10
+    mp = POW // 5
+    san = POW.copy()
+    mov = np.where((DEX < SIZ) & (STR < SIZ), 7, np.where((DEX > SIZ) & (STR > SIZ), 9, 8)).astype(np.int16)
+
+    total = (STR + SIZ).astype(np.int32)
+    build = (np.searchsorted(_DB_EDGES, total, side="right") - 2).astype(np.int16)
+    high = total >= DB_EDGES[-1]
+    build[high] = (3 + (total[high] - DB_EDGES[-1]) // 80).astype(np.int16)
+    return hp, mp, san, mov, build
+
+
+def occupation_points(terms: Sequence[PointTerm], stats: Dict[str, np.ndarray]) -> np.ndarray:
+    pts = np.zeros_like(stats["EDU"], dtype=np.int32)
+    for term in terms:
+        best = np.max(np.stack([stats[s] for s in term.stats]), axis=0)
+        pts += best.astype(np.int32) * term.mult
+    return pts
+
+
+def _pick_without_replacement(rng: np.random.Generator, options: np.ndarray, n: int, k: int) -> np.ndarray:
+    # argpartition over random keys = an independent k-subset per row
+    keys = rng.random((n, len(options)), dtype=np.float32)
+    idx = np.argpartition(keys, k - 1, axis=1)[:, :k] if k < len(options) else np.argsort(keys, axis=1)
+    return options[idx]
+
+
+def allocate_skills(
+    tpl: ResolvedTemplate,
+    table: SkillTable,
+    stats: Dict[str, np.ndarray],
+    rng: np.random.Generator,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pick the occupation skills for every row and spread occupation points over
+    them (random Dirichlet split, capped at SKILL_CAP). Credit Rating is rolled
+    inside the profession's range and paid for first.
+    """
+    n = len(stats["EDU"])
+    cols: List[np.ndarray] = []
+    if tpl.fixed_ids:
+        cols.append(np.broadcast_to(np.asarray(tpl.fixed_ids, dtype=np.int32), (n, len(tpl.fixed_ids))))
+    for k, ids in tpl.choices:
+        cols.append(_pick_without_replacement(rng, np.asarray(ids, dtype=np.int32), n, k))
+    if tpl.free_picks:
+        taken = set(tpl.fixed_ids) | {i for _, ids in tpl.choices for i in ids}
+        pool = np.asarray([i for i in table.pool.tolist() if i not in taken], dtype=np.int32)
+        k = min(tpl.free_picks, len(pool))
+        if k:
+            cols.append(_pick_without_replacement(rng, pool, n, k))
+
+    skill_ids = np.concatenate(cols, axis=1) if cols else np.zeros((n, 0), dtype=np.int32)
+    base = table.base_by_id[skill_ids].astype(np.int32)
+    if table.dodge_id is not None:
+        base = np.where(skill_ids == table.dodge_id, (stats["DEX"] // 2)[:, None], base)
+    if table.language_own_id is not None:
+        base = np.where(skill_ids == table.language_own_id, stats["EDU"][:, None], base)
+
+    points = occupation_points(tpl.point_terms, stats)
+
+    if table.credit_id is not None:
+        credit = rng.integers(tpl.credit_min, tpl.credit_max + 1, size=n, dtype=np.int32)
+        points = np.maximum(0, points - credit)
+        skill_ids = np.concatenate([skill_ids, np.full((n, 1), table.credit_id, dtype=np.int32)], axis=1)
+        base = np.concatenate([base, credit[:, None]], axis=1)
+        k = skill_ids.shape[1] - 1
+    else:
+        k = skill_ids.shape[1]
+
+    values = base.copy()
+    if k:
+        weights = rng.dirichlet(np.ones(k), size=n)
+        values[:, :k] = np.minimum(SKILL_CAP, base[:, :k] + np.floor(weights * points[:, None]).astype(np.int32))
+    return skill_ids, values.astype(np.int16)
+
+
+def generate(
+    n: int,
+    template: Optional[ResolvedTemplate] = None,
+    table: Optional[SkillTable] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> GeneratedBatch:
+    """
+    Roll `n` investigators in one batch. Skills are only allocated when both a
+    template and a skill table are given.
+    """
+    rng = rng or np.random.default_rng()
+    stats = roll_characteristics(int(n), rng)
+    hp, mp, san, mov, build = derived_stats(stats)
+    batch = GeneratedBatch(
+        n=int(n), stats=stats, hp=hp, mp=mp, san=san, mov=mov, build=build,
+        profession=template.name if template else None,
+    )
+    if template is not None and table is not None:
+        batch.skill_ids, batch.skill_values = allocate_skills(template, table, stats, rng)
+    return batch
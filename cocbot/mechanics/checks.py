@@ -13,7 +13,7 @@ class SuccessLevel(str, Enum):
     CRITICAL = "Critical"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CheckResult:
     roll: int
     target: int
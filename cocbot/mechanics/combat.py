@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from cocbot.mechanics.checks import CheckResult, SuccessLevel
+from cocbot.mechanics.dice import d100_check, roll_damage
+
+
+# Success tiers ranked for opposed comparisons (fumble lowest).
+TIER_RANK: Dict[SuccessLevel, int] = {
+    SuccessLevel.FUMBLE: 0,
+    SuccessLevel.FAIL: 1,
+    SuccessLevel.SUCCESS: 2,
+    SuccessLevel.HARD: 3,
+    SuccessLevel.EXTREME: 4,
+    SuccessLevel.CRITICAL: 5,
+}
+
+
+def is_success(level: SuccessLevel) -> bool:
+    return TIER_RANK[level] >= TIER_RANK[SuccessLevel.SUCCESS]
+
+
+class Response(str, Enum):
+    DODGE = "dodge"
+    FIGHT_BACK = "fight_back"
+    NONE = "none"          # surprised / no defense possible
+
+
+@dataclass(slots=True)
+class Combatant:
+    """
+    Compact in-memory combat record. Mutated in place while a round resolves.
+    """
+    combatant_id: int
+    name: str
+    dex: int
+    hp: int
+    hp_max: int
+    fight: int                   # attack / fight-back skill
+    dodge: int
+    damage: str = "1d3"          # weapon damage (unarmed by default)
+    db: str = "0"                # damage bonus expression, e.g. "+1d4" or "-1"
+    major_wound: bool = False
+    defenses_this_round: int = 0
+
+    @property
+    def active(self) -> bool:
+        return self.hp > 0
+
+    def damage_expr(self) -> str:
+        db = (self.db or "0").strip()
+        if db in ("0", "+0", "-0", ""):
+            return self.damage
+        if db[0] not in "+-":
+            db = "+" + db
+        return f"{self.damage}{db}"
+
+
+@dataclass(frozen=True, slots=True)
+class Attack:
+    attacker: int
+    defender: int
+    response: Response = Response.DODGE
+    bp: int = 0                  # extra bonus(+)/penalty(-) dice for the attacker
+
+
+@dataclass(frozen=True, slots=True)
+class OpposedResult:
+    a: CheckResult
+    b: CheckResult
+    winner: Optional[str]        # "a" | "b" | None (nobody succeeded)
+
+
+@dataclass(frozen=True, slots=True)
+class ActionOutcome:
+    attack: Attack
+    attacker_check: CheckResult
+    defender_check: Optional[CheckResult]
+    hit_on: Optional[int]        # combatant_id that took damage (attacker on a won fight-back)
+    damage: int
+    hp_after: Optional[int]
+    note: str
+
+
+@dataclass
+class RoundResult:
+    round_no: int
+    order: List[int]
+    outcomes: List[ActionOutcome] = field(default_factory=list)
+    skipped: List[Attack] = field(default_factory=list)
+
+
+_ATTACK_RE = re.compile(r"^\s*(\d+)\s*>\s*(\d+)\s*(dodge|fight|none)?\s*([+-]\s*\d+)?\s*$", re.IGNORECASE)
+_RESPONSES = {"dodge": Response.DODGE, "fight": Response.FIGHT_BACK, "none": Response.NONE}
+MAX_ATTACKS = 50
+
+
+def parse_attacks(spec: str) -> List[Attack]:
+    """
+    "1>2, 3>1 fight, 2>3 none +1" -> attacks as
+    attacker>defender [dodge|fight|none] [bonus(+)/penalty(-) dice], dodge by default.
+    """
+    items = [p.strip() for p in re.split(r"[,;\n]", spec or "") if p.strip()]
+    if not items:
+        raise ValueError("No attacks given. Use e.g. `1>2, 2>1 fight`.")
+    if len(items) > MAX_ATTACKS:
+        raise ValueError(f"At most {MAX_ATTACKS} attacks per round.")
+    out: List[Attack] = []
+    for item in items:
+        m = _ATTACK_RE.match(item)
+        if not m:
+            raise ValueError(f"Invalid attack `{item}`. Use attacker>defender [dodge|fight|none] [+1/-1].")
+        bp = int(m.group(4).replace(" ", "")) if m.group(4) else 0
+        if abs(bp) > 2:
+            raise ValueError("At most 2 bonus or penalty dice per attack.")
+        response = _RESPONSES[(m.group(3) or "dodge").lower()]
+        out.append(Attack(attacker=int(m.group(1)), defender=int(m.group(2)), response=response, bp=bp))
+    return out
+
+
+def compare_opposed(a: CheckResult, b: CheckResult, tie: str) -> Optional[str]:
+    """
+    Higher success tier wins; at least one side must succeed.
+    `tie` says who wins equal tiers: "a", "b" or "skill" (higher target wins, else nobody).
+    """
+    a_ok, b_ok = is_success(a.level), is_success(b.level)
+    if not a_ok and not b_ok:
+        return None
+    ra, rb = TIER_RANK[a.level], TIER_RANK[b.level]
+    if ra != rb:
+        return "a" if ra > rb else "b"
+    if tie == "skill":
+        if a.target == b.target:
+            return None
+        return "a" if a.target > b.target else "b"
+    return tie
+
+
+def opposed_roll(
+    a_target: int,
+    b_target: int,
+    a_bp: int = 0,
+    b_bp: int = 0,
+    tie: str = "skill",
+    check: Callable[[int, int], CheckResult] = d100_check,
+) -> OpposedResult:
+    a = check(int(a_target), int(a_bp))
+    b = check(int(b_target), int(b_bp))
+    return OpposedResult(a=a, b=b, winner=compare_opposed(a, b, tie))
+
+
+def initiative_order(combatants: Iterable[Combatant]) -> List[int]:
+    """
+    DEX descending; ties go to the higher combat skill, then lower id (stable).
+    """
+    return [
+        c.combatant_id
+        for c in sorted(combatants, key=lambda c: (-c.dex, -c.fight, c.combatant_id))
+    ]
+
+
+def _apply_damage(target: Combatant, amount: int) -> None:
+    if amount <= 0:
+        return
+    if amount >= max(1, target.hp_max // 2):
+        target.major_wound = True
+    target.hp = max(0, target.hp - amount)
+
+
+def _damage_roll(c: Combatant, level: SuccessLevel) -> int:
+    # Extreme (or critical) attacks deal maximum damage (non-impaling weapons).
+    maximize = TIER_RANK[level] >= TIER_RANK[SuccessLevel.EXTREME]
+    return roll_damage(c.damage_expr(), maximize=maximize)
+
+
+def resolve_round(
+    combatants: Dict[int, Combatant],
+    attacks: Sequence[Attack],
+    round_no: int = 1,
+    check: Callable[[int, int], CheckResult] = d100_check,
+) -> RoundResult:
+    """
+    Resolve one combat round in memory.
+
+    Attacks are taken in initiative order of their attacker (DEX), keeping the
+    submitted order for a combatant's multiple attacks. Combatants at 0 HP do
+    not act and cannot be targeted. A defender who already defended this
+    round is outnumbered: the attacker gets one bonus die.
+
+    `combatants` is mutated in place; persist it once afterwards.
+    """
+    for c in combatants.values():
+        c.defenses_this_round = 0
+
+    order = initiative_order(combatants.values())
+    rank = {cid: i for i, cid in enumerate(order)}
+    queue = sorted(
+        (a for a in attacks if a.attacker in combatants and a.defender in combatants),
+        key=lambda a: rank[a.attacker],
+    )
+
+    res = RoundResult(round_no=round_no, order=order)
+    res.skipped.extend(a for a in attacks if a.attacker not in combatants or a.defender not in combatants)
+
+    for atk in queue:
+        attacker = combatants[atk.attacker]
+        defender = combatants[atk.defender]
+        if not attacker.active or not defender.active:
+            res.skipped.append(atk)
+            continue
+
+        bp = atk.bp + (1 if defender.defenses_this_round > 0 and atk.response != Response.NONE else 0)
+        a_chk = check(attacker.fight, bp)
+
+        if atk.response == Response.NONE:
+            if is_success(a_chk.level):
+                dmg = _damage_roll(attacker, a_chk.level)
+                _apply_damage(defender, dmg)
+                res.outcomes.append(ActionOutcome(atk, a_chk, None, defender.combatant_id, dmg, defender.hp, "hit"))
+            else:
+                res.outcomes.append(ActionOutcome(atk, a_chk, None, None, 0, None, "miss"))
+            continue
+
+        defender.defenses_this_round += 1
+        if atk.response == Response.DODGE:
+            d_chk = check(defender.dodge, 0)
+            # ties go to the dodger
+            winner = compare_opposed(a_chk, d_chk, tie="b")
+            if winner == "a":
+                dmg = _damage_roll(attacker, a_chk.level)
+                _apply_damage(defender, dmg)
+                res.outcomes.append(ActionOutcome(atk, a_chk, d_chk, defender.combatant_id, dmg, defender.hp, "hit"))
+            else:
+                note = "dodged" if winner == "b" else "miss"
+                res.outcomes.append(ActionOutcome(atk, a_chk, d_chk, None, 0, None, note))
+        else:
+            d_chk = check(defender.fight, 0)
+            # ties go to the attacker when fighting back
+            winner = compare_opposed(a_chk, d_chk, tie="a")
+            if winner == "a":
+                dmg = _damage_roll(attacker, a_chk.level)
+                _apply_damage(defender, dmg)
+                res.outcomes.append(ActionOutcome(atk, a_chk, d_chk, defender.combatant_id, dmg, defender.hp, "hit"))
+            elif winner == "b":
+                dmg = _damage_roll(defender, d_chk.level)
+                _apply_damage(attacker, dmg)
+                res.outcomes.append(ActionOutcome(atk, a_chk, d_chk, attacker.combatant_id, dmg, attacker.hp, "countered"))
+            else:
+                res.outcomes.append(ActionOutcome(atk, a_chk, d_chk, None, 0, None, "miss"))
+
+    return res
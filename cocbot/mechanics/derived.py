@@ -1,4 +1,5 @@
 ﻿import re
+from bisect import bisect_right
 from typing import Optional, Tuple, Dict
 
 STAT_KEYS = {"STR", "CON", "SIZ", "DEX", "APP", "INT", "POW", "EDU"}
@@ -30,3 +31,36 @@ def eval_derived_formula(formula: str, stats: Dict[str, int]) -> Tuple[Optional[
         return int(v // div), f"{stat}={v} → {stat}/{div}={v//div}"
 
     return None, f"unsupported: {formula}"
+
+
+# STR+SIZ breakpoints -> build -2..2; from the last one, every 80 points adds one more build
+DB_EDGES = (65, 85, 125, 165, 205)
+
+
+def build_for(str_siz: int) -> int:
+    total = int(str_siz)
+    if total >= DB_EDGES[-1]:
+        return 3 + (total - DB_EDGES[-1]) // 80
+    return bisect_right(DB_EDGES, total) - 2
+
+
+def db_for_build(build: int) -> str:
+    build = int(build)
+    if build <= -1:
+        return str(build)
+    if build == 0:
+        return "0"
+    if build == 1:
+        return "+1d4"
+    if build == 2:
+        return "+1d6"
+    return f"+{build - 1}d6"
+
+
+def damage_bonus_and_build(str_: int, siz: int) -> Tuple[str, int]:
+    """
+    CoC 7e Damage Bonus / Build from STR+SIZ.
+    Returns (db_expr, build), e.g. ("+1d4", 1), ("0", 0), ("-1", -1).
+    """
+    build = build_for(int(str_) + int(siz))
+    return db_for_build(build), build
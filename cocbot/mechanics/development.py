@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from cocbot.mechanics.checks import SuccessLevel
+
+# Development phase (CoC 7e): for every ticked skill roll d100; above the
+# current value (or 96+) the skill gains 1d10. A skill reaching 90+ this way
+# also gives 2d6 SAN. Whole guilds are resolved column-wise, like chargen.
+
+NO_IMPROVEMENT = ("cthulhu_mythos", "credit_rating")   # never ticked / improved
+SAN_BONUS_AT = 90
+ALWAYS_IMPROVES_ABOVE = 95
+
+_TICK_LEVELS = frozenset({SuccessLevel.SUCCESS, SuccessLevel.HARD, SuccessLevel.EXTREME, SuccessLevel.CRITICAL})
+
+
+def earns_tick(level: SuccessLevel, bp: int = 0, luck_spent: int = 0) -> bool:
+    # successes made with a bonus die or bought with Luck don't earn a tick
+    return level in _TICK_LEVELS and bp <= 0 and luck_spent == 0
+
+
+@dataclass(frozen=True)
+class DevelopmentResult:
+    character_ids: np.ndarray     # int64, one entry per ticked skill
+    skill_ids: np.ndarray         # int64
+    old: np.ndarray               # int32 skill value before
+    rolls: np.ndarray             # int32 d100 improvement roll
+    gains: np.ndarray             # int32 1d10, 0 when the roll didn't improve the skill
+    san_bonus: np.ndarray         # int32 2d6 where the skill crossed SAN_BONUS_AT, else 0
+
+    @property
+    def new(self) -> np.ndarray:
+        return self.old + self.gains
+
+    @property
+    def improved(self) -> np.ndarray:
+        return self.gains > 0
+
+    def san_by_character(self) -> Dict[int, int]:
+        mask = self.san_bonus > 0
+        if not mask.any():
+            return {}
+        ids, inverse = np.unique(self.character_ids[mask], return_inverse=True)
+        totals = np.bincount(inverse, weights=self.san_bonus[mask]).astype(np.int64)
+        return {int(c): int(t) for c, t in zip(ids, totals)}
+
+
+def roll_development(
+    character_ids: np.ndarray,
+    skill_ids: np.ndarray,
+    values: np.ndarray,
+    rng: Optional[np.random.Generator] = None,
+) -> DevelopmentResult:
+    """
+    Resolve every improvement roll in one vectorized pass.
+    """
+    rng = rng or np.random.default_rng()
+    old = np.asarray(values, dtype=np.int32)
+    n = old.size
+    rolls = rng.integers(1, 101, size=n, dtype=np.int32)
+    improves = (rolls > old) | (rolls > ALWAYS_IMPROVES_ABOVE)
+    gains = np.where(improves, rng.integers(1, 11, size=n, dtype=np.int32), 0).astype(np.int32)
+    crossed = (old < SAN_BONUS_AT) & (old + gains >= SAN_BONUS_AT)
+    san = np.where(crossed, rng.integers(1, 7, size=(n, 2), dtype=np.int32).sum(axis=1), 0).astype(np.int32)
+    return DevelopmentResult(
+        character_ids=np.asarray(character_ids, dtype=np.int64),
+        skill_ids=np.asarray(skill_ids, dtype=np.int64),
+        old=old,
+        rolls=rolls,
+        gains=gains,
+        san_bonus=san,
+    )
@@ -3,12 +3,15 @@ from __future__ import annotations
 import random
 import re
 from dataclasses import dataclass
-from typing import Optional, List, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
 from cocbot.mechanics.checks import CheckResult, success_level
 
+if TYPE_CHECKING:
+    from cocbot.mechanics.house_rules import CompiledRules
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class D100Roll:
     value: int
     tens: int
@@ -16,12 +19,12 @@ class D100Roll:
 
 
 # NEW: carries bonus/penalty candidate info
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class D100BPCandidates:
     chosen: int
-    candidates: List[int]          # all candidate d100 outcomes
+    candidates: Tuple[int, ...]          # all candidate d100 outcomes
     ones: int
-    tens_candidates: List[int]     # raw tens digits rolled (0-9)
+    tens_candidates: Tuple[int, ...]     # raw tens digits rolled (0-9)
 
 
 def roll_d10() -> int:
@@ -49,14 +52,14 @@ def roll_d100_bonus_penalty_candidates(bp: int = 0) -> D100BPCandidates:
     """
     bp = int(bp)
     ones = roll_d10()
-    tens_candidates = [roll_d10() for _ in range(abs(bp) + 1)]
-
-    candidates: List[int] = []
-    for tens in tens_candidates:
-        v = tens * 10 + ones
-        if v == 0:
-            v = 100
-        candidates.append(v)
+    # tuples, no generator frames: the bp=0 path allocates only the result
+    if bp == 0:
+        tens = roll_d10()
+        tens_candidates: Tuple[int, ...] = (tens,)
+        candidates: Tuple[int, ...] = (tens * 10 + ones or 100,)     # 00 is 100
+    else:
+        tens_candidates = tuple([roll_d10() for _ in range(abs(bp) + 1)])
+        candidates = tuple([tens * 10 + ones or 100 for tens in tens_candidates])
 
     if bp > 0:
         chosen = min(candidates)
@@ -80,12 +83,24 @@ def roll_d100_bonus_penalty(bp: int = 0) -> int:
     return roll_d100_bonus_penalty_candidates(bp=bp).chosen
 
 
+# Upper bounds for user-supplied expressions (total dice per expression, sides per die)
+MAX_DICE = 100
+MAX_SIDES = 1000
+
+
+def _check_dice(n: int, sides: int) -> None:
+    if n <= 0 or sides <= 0:
+        raise ValueError("Dice count and sides must be positive.")
+    if n > MAX_DICE or sides > MAX_SIDES:
+        raise ValueError(f"At most {MAX_DICE} dice with up to {MAX_SIDES} sides.")
+
+
 _DICE_RE = re.compile(r"^\s*(\d*)d(\d+)\s*([+-]\s*\d+)?\s*$", re.IGNORECASE)
 
 
-def parse_and_roll(expr: str) -> int:
+def parse_dice(expr: str) -> Tuple[int, int, int]:
     """
-    Supports NdM+K (e.g., 2d6+1, d20, 1d100-10).
+    Parse NdM+K into (n, sides, mod) without rolling.
     """
     m = _DICE_RE.match(expr)
     if not m:
@@ -96,23 +111,72 @@ def parse_and_roll(expr: str) -> int:
     sides = int(sides_str)
     mod = int(mod_str.replace(" ", "")) if mod_str else 0
 
-    if n <= 0 or sides <= 0:
-        raise ValueError("Dice count and sides must be positive.")
+    _check_dice(n, sides)
+    return n, sides, mod
+
 
+def parse_and_roll(expr: str) -> int:
+    """
+    Supports NdM+K (e.g., 2d6+1, d20, 1d100-10).
+    """
+    n, sides, mod = parse_dice(expr)
     total = sum(random.randint(1, sides) for _ in range(n)) + mod
     return total
 
 
-def d100_check(target: int, bp: int = 0) -> CheckResult:
+_TERM_RE = re.compile(r"\s*([+-])?\s*(?:(\d*)d(\d+)|(\d+))", re.IGNORECASE)
+
+
+def roll_damage(expr: str, maximize: bool = False) -> int:
+    """
+    Sum of dice/constant terms, e.g. "1d6+1d4", "1d3-1", "+2d6", "0".
+    maximize=True returns the highest possible total (extreme-success damage):
+    added dice roll their maximum, subtracted dice their minimum.
+    At most MAX_DICE dice in total. Never returns less than 0.
+    """
+    s = (expr or "").strip()
+    if not s:
+        return 0
+
+    total = 0
+    dice = 0
+    pos = 0
+    while pos < len(s):
+        m = _TERM_RE.match(s, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Invalid damage expression: {expr}")
+        sign = -1 if m.group(1) == "-" else 1
+        if m.group(3) is not None:
+            n = int(m.group(2)) if m.group(2) else 1
+            sides = int(m.group(3))
+            _check_dice(n, sides)
+            dice += n
+            if dice > MAX_DICE:
+                raise ValueError(f"At most {MAX_DICE} dice per expression.")
+            if maximize:
+                v = n * sides if sign > 0 else n
+            else:
+                v = sum(random.randint(1, sides) for _ in range(n))
+        else:
+            v = int(m.group(4))
+        total += sign * v
+        pos = m.end()
+    return max(0, total)
+
+
+def d100_check(target: int, bp: int = 0, rules: Optional[CompiledRules] = None) -> CheckResult:
     roll = roll_d100_bonus_penalty(bp=bp)
-    lvl = success_level(roll, int(target))
+    lvl = success_level(roll, int(target)) if rules is None else rules.level(roll, int(target))
     return CheckResult(roll=roll, target=int(target), level=lvl)
 
 
 # NEW: use this for /check embed so you can show candidates
-def d100_check_details(target: int, bp: int = 0) -> Tuple[CheckResult, Optional[List[int]]]:
+def d100_check_details(
+    target: int, bp: int = 0, rules: Optional[CompiledRules] = None
+) -> Tuple[CheckResult, Optional[Tuple[int, ...]]]:
     r = roll_d100_bonus_penalty_candidates(bp=bp)
-    lvl = success_level(r.chosen, int(target))
+    # rules = the guild's compiled house rules (a table lookup); None = default table
+    lvl = success_level(r.chosen, int(target)) if rules is None else rules.level(r.chosen, int(target))
     # Only show candidates when bp != 0
     bp_candidates = r.candidates if int(bp) != 0 else None
     return CheckResult(roll=r.chosen, target=int(target), level=lvl), bp_candidates
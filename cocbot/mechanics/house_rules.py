@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from cocbot.mechanics.checks import SuccessLevel
+
+MAX_TARGET = 200        # targets above this resolve like MAX_TARGET
+
+# Cell layout: low 3 bits = index into LEVELS, then flag bits.
+LEVELS = (
+    SuccessLevel.FUMBLE,
+    SuccessLevel.FAIL,
+    SuccessLevel.SUCCESS,
+    SuccessLevel.HARD,
+    SuccessLevel.EXTREME,
+    SuccessLevel.CRITICAL,
+)
+_LEVEL_INDEX = {lvl: i for i, lvl in enumerate(LEVELS)}
+LEVEL_MASK = 0b0000_0111
+CAN_PUSH = 0b0000_1000
+CAN_LUCK = 0b0001_0000
+
+
+@dataclass(frozen=True)
+class HouseRules:
+    """
+    Keeper-configurable check rules. The defaults are exactly success_level().
+    """
+    crit_max: int = 1
+    fumble_min_low: int = 96
+    fumble_min_high: Optional[int] = None
+    fumble_split: int = 50
+    allow_push: bool = True
+    allow_luck: bool = True
+
+    def validate(self) -> None:
+        if not 1 <= self.crit_max <= 20:
+            raise ValueError("Critical range must be 01–20.")
+        for v in (self.fumble_min_low, self.fumble_min_high):
+            if v is not None and not 80 <= v <= 100:
+                raise ValueError("Fumble ranges must start between 80 and 100.")
+        if not 1 <= self.fumble_split <= 100:
+            raise ValueError("Fumble split must be 1–100.")
+
+
+DEFAULT_RULES = HouseRules()
+
+
+def _cell(roll: int, target: int, rules: HouseRules) -> int:
+    # the branchy rules, evaluated once per cell at compile time
+    fumble_min = rules.fumble_min_low if target < rules.fumble_split else rules.fumble_min_high
+    if roll == 1 or (roll <= rules.crit_max and roll <= target):
+        level = SuccessLevel.CRITICAL
+    elif fumble_min is not None and roll >= fumble_min:
+        level = SuccessLevel.FUMBLE
+    elif roll == 100 or roll > target:
+        level = SuccessLevel.FAIL
+    elif roll <= max(1, target // 5):
+        level = SuccessLevel.EXTREME
+    elif roll <= max(1, target // 2):
+        level = SuccessLevel.HARD
+    else:
+        level = SuccessLevel.SUCCESS
+
+    cell = _LEVEL_INDEX[level]
+    if level == SuccessLevel.FAIL:
+        # a fumble can be neither pushed nor bought off; 100 can't be bought down
+        if rules.allow_push:
+            cell |= CAN_PUSH
+        if rules.allow_luck and roll != 100:
+            cell |= CAN_LUCK
+    return cell
+
+
+def _row(target: int) -> int:
+    return (target if 0 <= target <= MAX_TARGET else min(max(target, 0), MAX_TARGET)) * 101
+
+
+class CompiledRules:
+    """
+    HouseRules flattened into a (MAX_TARGET + 1) x 101 table, so resolving a
+    check is one index with no branching on the rules. `table` holds the cell
+    bytes (level + push/luck flags); `levels` the SuccessLevel per cell.
+    Compiled tables are shared between guilds with identical rules.
+    """
+
+    __slots__ = ("rules", "table", "levels")
+
+    def __init__(self, rules: HouseRules) -> None:
+        self.rules = rules
+        self.table = bytes(
+            _cell(roll, target, rules) if roll else 0
+            for target in range(MAX_TARGET + 1)
+            for roll in range(101)
+        )
+        self.levels = tuple(LEVELS[c & LEVEL_MASK] for c in self.table)
+
+    def level(self, roll: int, target: int) -> SuccessLevel:
+        return self.levels[_row(target) + roll]
+
+    def can_push(self, roll: int, target: int) -> bool:
+        return bool(self.table[_row(target) + roll] & CAN_PUSH)
+
+    def luck_cost(self, roll: int, target: int) -> Optional[int]:
+        """
+        Luck points needed to turn this roll into a regular success, or None.
+        """
+        return roll - target if self.table[_row(target) + roll] & CAN_LUCK else None
+
+
+@lru_cache(maxsize=64)
+def compile_rules(rules: HouseRules = DEFAULT_RULES) -> CompiledRules:
+    rules.validate()
+    return CompiledRules(rules)
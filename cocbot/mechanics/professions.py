@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Parsers for the professions table (职业列表 sheet): `attrs_formula` and `skills_raw`
+# are free text, e.g.
+#   attrs_formula: "教育×2＋力量或敏捷×2"
+#   skills_raw:    "会计，法律，图书馆，一项社交技能（魅惑、话术、恐吓、说服），任意两项其他个人或时代特长。"
+
+ZH_STATS = {
+    "力量": "STR",
+    "体质": "CON",
+    "体型": "SIZ",
+    "敏捷": "DEX",
+    "外貌": "APP",
+    "外表": "APP",
+    "智力": "INT",
+    "意志": "POW",
+    "教育": "EDU",
+    "幸运": "LUCK",
+}
+
+# Profession text uses generic/short names; map them onto the i18n skill names.
+ZH_SKILL_SYNONYMS = {
+    "图书馆": "图书馆使用",
+    "图书馆利用": "图书馆使用",
+    "侦察": "侦查",
+    "电气维修": "电器维修",
+    "自然": "自然学",
+    "格斗": "斗殴",
+    "射击": "手枪",
+    "技艺": "表演",
+    "骑乘": "骑术",
+    "计算机使用": "电脑使用",
+    "计算机": "电脑使用",
+    "电工维修": "电器维修",
+    "导航": "领航",
+    "考古": "考古学",
+    "外语": "外语",
+    "母语": "母语",
+}
+
+_NUM = {"一": 1, "两": 2, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6}
+
+
+@dataclass(frozen=True)
+class PointTerm:
+    stats: Tuple[str, ...]       # best of these stats ...
+    mult: int                    # ... times this
+
+
+@dataclass(frozen=True)
+class ProfessionTemplate:
+    name: str
+    credit_min: int
+    credit_max: int
+    point_terms: Tuple[PointTerm, ...]
+    skills: Tuple[str, ...]                          # fixed occupation skills (names)
+    choices: Tuple[Tuple[int, Tuple[str, ...]], ...]  # pick N of these names
+    free_picks: int                                   # "任意N项..." -> any skills
+
+
+def _split_top_level(text: str, seps: str) -> List[str]:
+    out: List[str] = []
+    depth = 0
+    buf: List[str] = []
+    for ch in text:
+        if ch in "（(":
+            depth += 1
+        elif ch in "）)":
+            depth = max(0, depth - 1)
+        if ch in seps and depth == 0:
+            out.append("".join(buf))
+            buf = []
+        else:
+            buf.append(ch)
+    out.append("".join(buf))
+    return [s.strip() for s in out if s.strip()]
+
+
+def parse_attrs_formula(text: Optional[str]) -> Tuple[PointTerm, ...]:
+    """
+    "教育×2＋力量或敏捷×2" -> (EDU×2, max(STR, DEX)×2). Empty/unknown -> EDU×4.
+    """
+    t = (text or "").strip()
+    terms: List[PointTerm] = []
+    for part in re.split(r"[+＋]", t):
+        part = part.strip().strip("（）()")
+        m = re.fullmatch(r"[（(]?(.+?)[）)]?\s*[×xX*]\s*(\d+)", part)
+        if not m:
+            continue
+        names = re.split(r"或|/|、", m.group(1).strip("（）() "))
+        stats = tuple(ZH_STATS[n.strip()] for n in names if n.strip() in ZH_STATS)
+        if stats:
+            terms.append(PointTerm(stats=stats, mult=int(m.group(2))))
+    return tuple(terms) or (PointTerm(stats=("EDU",), mult=4),)
+
+
+def _syn(name: str) -> str:
+    name = name.strip().strip("（）() ")
+    return ZH_SKILL_SYNONYMS.get(name, name)
+
+
+def _count(text: str) -> int:
+    for ch in text:
+        if ch in _NUM:
+            return _NUM[ch]
+        if ch.isdigit():
+            return int(ch)
+    return 1
+
+
+def parse_skills_raw(text: Optional[str]) -> Tuple[Tuple[str, ...], Tuple[Tuple[int, Tuple[str, ...]], ...], int]:
+    """
+    Returns (fixed_skill_names, choices, free_picks).
+    """
+    t = (text or "").strip().rstrip("。.")
+    fixed: List[str] = []
+    choices: List[Tuple[int, Tuple[str, ...]]] = []
+    free = 0
+
+    for item in _split_top_level(t, "，,；;、"):
+        m = re.match(r"^(.*?)[（(](.*?)[）)]?$", item)
+        head, inner = (m.group(1).strip(), m.group(2)) if m else (item, "")
+        options = tuple(
+            _syn(o.strip().lstrip("如"))
+            for o in re.split(r"[、，,或]", inner)
+            if o.strip().lstrip("如")
+        )
+
+        if head.startswith("任") or "项" in head:
+            # "任意两项其他个人或时代特长" / "一项社交技能（魅惑、话术、恐吓、说服）" / "任一：如化学"
+            n = _count(head)
+            if options and "项" in head:
+                choices.append((n, options))
+            else:
+                free += n
+            continue
+
+        if options and all(o.startswith("任") for o in options):
+            # "技艺（任一）"
+            free += sum(_count(o) for o in options)
+        elif options:
+            # "格斗（斗殴）" -> 斗殴 ; "科学（生物学，化学）" -> 生物学, 化学
+            fixed.extend(options)
+        elif "或" in head:
+            # "聆听或侦查" -> one of them
+            choices.append((1, tuple(_syn(o) for o in head.split("或") if o.strip())))
+        else:
+            fixed.append(_syn(head))
+
+    return tuple(dict.fromkeys(fixed)), tuple(choices), free
+
+
+def parse_profession(
+    name: str,
+    credit_min: Optional[int],
+    credit_max: Optional[int],
+    attrs_formula: Optional[str],
+    skills_raw: Optional[str],
+) -> ProfessionTemplate:
+    skills, choices, free = parse_skills_raw(skills_raw)
+    cmin = int(credit_min) if credit_min is not None else 0
+    cmax = int(credit_max) if credit_max is not None else max(cmin, 99)
+    return ProfessionTemplate(
+        name=name,
+        credit_min=cmin,
+        credit_max=max(cmin, cmax),
+        point_terms=parse_attrs_formula(attrs_formula),
+        skills=skills,
+        choices=choices,
+        free_picks=free,
+    )
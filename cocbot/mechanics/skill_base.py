@@ -14,6 +14,9 @@ def resolve_skill_base(
     """
     Returns (target_or_None, label_for_display)
 
+    Active character has the skill on their sheet (character_skills):
+      -> (value, "Skill X")
+
     Normal skill:
       -> (base, "Base X")
 
@@ -22,14 +25,25 @@ def resolve_skill_base(
       - if missing stat: (None, "Base DEX/2 (DEX missing)")
       - if computable: (val, "Base val (DEX=.. → DEX/2=..)")
     """
+    # one round trip: skill def + the active character's own value, if any
     row = conn.execute(
-        "SELECT base, is_derived, derived_formula FROM skill_defs WHERE skill_id=?",
-        (int(skill_id),),
+        """
+        SELECT sd.base, sd.is_derived, sd.derived_formula, cs.value
+        FROM skill_defs sd
+        LEFT JOIN guild_settings gs ON gs.guild_id = ?
+        LEFT JOIN character_skills cs
+               ON cs.character_id = gs.active_character_id AND cs.skill_id = sd.skill_id
+        WHERE sd.skill_id = ?
+        """,
+        (guild_id, int(skill_id)),
     ).fetchone()
     if not row:
         return None, "Base ?"
 
-    base, is_derived, formula = row[0], int(row[1] or 0), row[2]
+    base, is_derived, formula, own = row[0], int(row[1] or 0), row[2], row[3]
+
+    if own is not None:
+        return int(own), f"Skill {int(own)}"
 
     if not is_derived:
         b = int(base or 0)
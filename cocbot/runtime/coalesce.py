@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+from cocbot.runtime.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce identical concurrent work: while a call for `key` is in flight,
+    other callers with the same key await its result instead of repeating it.
+    Nothing is cached after the call finishes.
+
+    The work runs in its own task and every caller (the first one too) awaits
+    it through asyncio.shield, so a caller that is cancelled (e.g. its
+    interaction timed out) only stops waiting; the others still get the result.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: Dict[Hashable, "asyncio.Future[T]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.incr(f"coalesce.{self.name}.shared")
+        else:
+            metrics.incr(f"coalesce.{self.name}.leader")
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: "asyncio.Future[T]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller gave up
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
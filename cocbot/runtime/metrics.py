@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+
+class Metrics:
+    """
+    Tiny in-process metrics registry: counters plus timing summaries.
+    The bot writes snapshots to disk; the dashboard reads them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, list] = {}  # name -> [count, total_s, max_s]
+        self._started = time.time()
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            t = self._timings.get(name)
+            if t is None:
+                self._timings[name] = [1, seconds, seconds]
+            else:
+                t[0] += 1
+                t[1] += seconds
+                if seconds > t[2]:
+                    t[2] = seconds
+
+    def counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {
+                k: {"count": c, "mean_ms": (tot / c) * 1000 if c else 0.0, "max_ms": mx * 1000}
+                for k, (c, tot, mx) in self._timings.items()
+            }
+        return {
+            "started_at": self._started,
+            "taken_at": time.time(),
+            "counters": dict(sorted(counters.items())),
+            "timings": dict(sorted(timings.items())),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+metrics = Metrics()
+
+
+def write_snapshot(path: Path, extra: Dict[str, Any] | None = None) -> None:
+    """
+    Atomically replace `path` with the current snapshot (plus any `extra` sections).
+    """
+    data = metrics.snapshot()
+    if extra:
+        data.update(extra)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
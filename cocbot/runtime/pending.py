@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import itertools
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Optional, Tuple, TypeVar
+
+from cocbot.runtime.metrics import metrics
+
+T = TypeVar("T")
+
+
+class PendingStore(Generic[T]):
+    """
+    Bounded in-memory map with TTL expiry, for short-lived state behind
+    message buttons (e.g. a failed check that may still be pushed).
+
+    Nothing is written to the database: entries expire after `ttl_s`, and
+    when more than `max_items` are held the oldest are dropped. Keys carry a
+    per-process prefix, so buttons from before a restart can't hit new entries.
+    """
+
+    def __init__(self, name: str, ttl_s: float = 900.0, max_items: int = 10_000) -> None:
+        self.name = name
+        self.ttl_s = float(ttl_s)
+        self.max_items = max(1, int(max_items))
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+        self._prefix = secrets.token_hex(3)
+        self._seq = itertools.count(1)
+
+    def _sweep(self, now: float) -> None:
+        # called with the lock held; TTL is fixed, so insertion order == expiry order
+        while self._items:
+            key, (expires, _) = next(iter(self._items.items()))
+            if expires > now:
+                break
+            del self._items[key]
+            metrics.incr(f"pending.{self.name}.expired")
+
+    def put(self, value: T, key: Optional[str] = None) -> str:
+        """
+        Store `value` and return its key. Passing the key of a popped entry
+        puts it back (with a fresh TTL).
+        """
+        key = key or f"{self._prefix}{next(self._seq):x}"
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            self._items[key] = (now + self.ttl_s, value)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                metrics.incr(f"pending.{self.name}.evicted")
+        return key
+
+    def get(self, key: str) -> Optional[T]:
+        entry = self._items.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def pop(self, key: str) -> Optional[T]:
+        with self._lock:
+            entry = self._items.pop(key, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def stats(self) -> Dict[str, int]:
+        return {"items": len(self._items), "max_items": self.max_items}
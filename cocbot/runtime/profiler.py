@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAX_QUERIES = 200      # per invocation
+MAX_DEPTH = 128        # frames per sample
+
+_current: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("coc_profile", default=None)
+
+
+@dataclass
+class Profile:
+    """
+    One command invocation: stack samples from the event-loop thread while its
+    task was running, plus the SQL it executed (including in to_thread workers).
+    """
+    profile_id: str
+    command: str
+    started_at: float
+    duration_ms: float = 0.0
+    samples: Counter = field(default_factory=Counter)
+    queries: List[Tuple[str, float]] = field(default_factory=list)
+    queries_dropped: int = 0
+
+    def record_query(self, sql: str, ms: float) -> None:
+        if len(self.queries) < MAX_QUERIES:
+            self.queries.append((" ".join(sql.split())[:300], ms))
+        else:
+            self.queries_dropped += 1
+
+    def collapsed(self) -> str:
+        # Brendan Gregg's collapsed-stack format: "root;child;leaf count"
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.profile_id,
+            "command": self.command,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": sum(self.samples.values()),
+            "db_ms": round(sum(ms for _, ms in self.queries), 2),
+            "queries": [{"sql": q, "ms": round(ms, 3)} for q, ms in self.queries],
+            "queries_dropped": self.queries_dropped,
+        }
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection factory that times execute/executemany/executescript
+    and attaches them to the invocation being profiled (if any).
+    """
+
+    def execute(self, sql, *args, **kwargs):  # type: ignore[override]
+        prof = _current.get()
+        if prof is None:
+            return super().execute(sql, *args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, *args, **kwargs)
+        finally:
+            prof.record_query(sql, (time.perf_counter() - t0) * 1000)
+
+    def executemany(self, sql, *args, **kwargs):  # type: ignore[override]
+        prof = _current.get()
+        if prof is None:
+            return super().executemany(sql, *args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, *args, **kwargs)
+        finally:
+            prof.record_query(sql, (time.perf_counter() - t0) * 1000)
+
+    def executescript(self, sql, *args, **kwargs):  # type: ignore[override]
+        prof = _current.get()
+        if prof is None:
+            return super().executescript(sql, *args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return super().executescript(sql, *args, **kwargs)
+        finally:
+            prof.record_query(sql, (time.perf_counter() - t0) * 1000)
+
+
+class SamplingProfiler:
+    """
+    Opt-in sampling profiler for command callbacks.
+
+    A daemon thread wakes every `interval_s` while at least one command is in
+    flight, grabs the event-loop thread's stack via sys._current_frames() and
+    credits it to whichever tracked task the loop is running. Nothing touches
+    the loop itself, and the thread sleeps when no command is running.
+
+    Only the `top_n` slowest invocations per command are kept; they are written
+    to `out_dir` as <id>.folded files plus an index.json with the DB timings.
+    """
+
+    def __init__(self, out_dir: Path, interval_s: float = 0.005, top_n: int = 5, enabled: bool = False) -> None:
+        self.out_dir = Path(out_dir)
+        self.interval_s = max(0.0005, float(interval_s))
+        self.top_n = max(1, int(top_n))
+        self.enabled = enabled
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._active: Dict[asyncio.Task, Profile] = {}
+        self._wake = threading.Event()
+        self._finished: "queue.SimpleQueue[Profile]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._seq = itertools.count(1)
+        self._labels: Dict[CodeType, str] = {}
+
+        # command -> min-heap of (duration_ms, profile_id); kept profiles by id
+        self._top: Dict[str, List[Tuple[float, str]]] = {}
+        self._kept: Dict[str, Dict[str, Any]] = {}
+
+    # ---------- lifecycle ----------
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Call from the event-loop thread (e.g. setup_hook).
+        """
+        if not self.enabled or self._thread is not None:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+        self._thread = threading.Thread(target=self._run, name="coc-profiler", daemon=True)
+        self._thread.start()
+        print(f"[profiler] sampling every {self.interval_s * 1000:.1f} ms, keeping top {self.top_n} per command")
+
+    def flush(self, timeout: float = 2.0) -> None:
+        # Wait until finished profiles have been ranked/written (tests, shutdown).
+        deadline = time.monotonic() + timeout
+        while not self._finished.empty() and time.monotonic() < deadline:
+            self._wake.set()
+            time.sleep(self.interval_s)
+        time.sleep(self.interval_s)
+
+    # ---------- hot path (event loop) ----------
+
+    @contextmanager
+    def track(self, command: str) -> Iterator[Optional[Profile]]:
+        if self._thread is None:
+            yield None
+            return
+        task = asyncio.current_task()
+        prof = Profile(profile_id=f"{command}-{int(time.time() * 1000)}-{next(self._seq)}", command=command,
+                       started_at=time.time())
+        token = _current.set(prof)
+        if task is not None:
+            self._active[task] = prof
+            self._wake.set()
+        t0 = time.perf_counter()
+        try:
+            yield prof
+        finally:
+            prof.duration_ms = (time.perf_counter() - t0) * 1000
+            _current.reset(token)
+            if task is not None:
+                self._active.pop(task, None)
+            self._finished.put(prof)
+
+    # ---------- sampler thread ----------
+
+    def _label(self, code: CodeType) -> str:
+        lbl = self._labels.get(code)
+        if lbl is None:
+            fname = code.co_filename.replace("\\", "/")
+            short = "/".join(fname.rsplit("/", 2)[-2:])
+            name = getattr(code, "co_qualname", code.co_name)
+            lbl = self._labels[code] = f"{name} ({short}:{code.co_firstlineno})".replace(";", ":")
+        return lbl
+
+    def _stack(self, frame: Optional[FrameType]) -> str:
+        labels: List[str] = []
+        while frame is not None and len(labels) < MAX_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+    def _sample(self) -> None:
+        if self._loop is None or self._loop_thread is None:
+            return
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return
+        prof = self._active.get(task) if task is not None else None
+        if prof is None:
+            return
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is not None:
+            prof.samples[self._stack(frame)] += 1
+
+    def _run(self) -> None:
+        while True:
+            if not self._active:
+                self._drain()
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            self._sample()
+            self._drain()
+            time.sleep(self.interval_s)
+
+    # ---------- retention / export ----------
+
+    def _drain(self) -> None:
+        changed = False
+        while True:
+            try:
+                prof = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            changed |= self._offer(prof)
+        if changed:
+            self._write_index()
+
+    def _offer(self, prof: Profile) -> bool:
+        heap = self._top.setdefault(prof.command, [])
+        entry = (prof.duration_ms, prof.profile_id)
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            _, evicted = heapq.heapreplace(heap, entry)
+            self._kept.pop(evicted, None)
+            try:
+                (self.out_dir / f"{evicted}.folded").unlink()
+            except OSError:
+                pass
+        else:
+            return False
+        self._kept[prof.profile_id] = prof.summary()
+        try:
+            (self.out_dir / f"{prof.profile_id}.folded").write_text(prof.collapsed(), encoding="utf-8")
+        except OSError as e:
+            print(f"[profiler] Could not write profile: {e}")
+        return True
+
+    def _write_index(self) -> None:
+        items = sorted(self._kept.values(), key=lambda p: (p["command"], -p["duration_ms"]))
+        tmp = self.out_dir / "index.json.tmp"
+        try:
+            tmp.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp, self.out_dir / "index.json")
+        except OSError as e:
+            print(f"[profiler] Could not write index: {e}")
+
+    def _load_index(self) -> None:
+        # keep ranking across restarts so old slow profiles aren't silently replaced
+        for p in read_index(self.out_dir):
+            if "id" not in p or not (self.out_dir / f"{p['id']}.folded").exists():
+                continue
+            heap = self._top.setdefault(p["command"], [])
+            heapq.heappush(heap, (float(p["duration_ms"]), p["id"]))
+            self._kept[p["id"]] = p
+        for cmd, heap in self._top.items():
+            while len(heap) > self.top_n:
+                _, pid = heapq.heappop(heap)
+                self._kept.pop(pid, None)
+
+
+def read_index(out_dir: Path) -> List[Dict[str, Any]]:
+    try:
+        return json.loads((Path(out_dir) / "index.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def connection_class() -> type:
+    """
+    Connection factory for sqlite3.connect(): timed only while profiling is on.
+    """
+    return ProfiledConnection if profiler.enabled else sqlite3.Connection
+
+
+def _make_default() -> SamplingProfiler:
+    from cocbot.config import settings
+
+    return SamplingProfiler(
+        out_dir=settings.RUNTIME_DIR / "profiles",
+        interval_s=settings.PROFILE_INTERVAL_MS / 1000,
+        top_n=settings.PROFILE_TOP_N,
+        enabled=settings.PROFILE_ENABLED,
+    )
+
+
+profiler = _make_default()
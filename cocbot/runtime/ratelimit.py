@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from cocbot.runtime.metrics import metrics
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, rate: float, now: float) -> None:
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, cost: float) -> float:
+        """
+        Seconds until `cost` tokens are available (0 if available now). Call refill() first.
+        """
+        if self.tokens >= cost:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    In-memory token buckets keyed by user and by guild.
+
+    A request is admitted only if BOTH its user bucket and its guild bucket
+    have enough tokens; tokens are then taken from both. The number of
+    tracked keys is bounded (least recently used buckets are dropped, which
+    just resets them to full).
+    """
+
+    def __init__(
+        self,
+        *,
+        user_burst: float,
+        user_per_sec: float,
+        guild_burst: float,
+        guild_per_sec: float,
+        max_keys: int = 50_000,
+        enabled: bool = True,
+    ) -> None:
+        self.user_burst = user_burst
+        self.user_per_sec = user_per_sec
+        self.guild_burst = guild_burst
+        self.guild_per_sec = guild_per_sec
+        self.max_keys = max(1, int(max_keys))
+        self.enabled = enabled
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+
+    def _bucket(self, key: Hashable, capacity: float, rate: float, now: float) -> TokenBucket:
+        b = self._buckets.get(key)
+        if b is None:
+            b = TokenBucket(capacity, rate, now)
+            self._buckets[key] = b
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            b.refill(now)
+        return b
+
+    def check(self, user_id: int, guild_id: Optional[int], cost: float = 1.0, command: str = "") -> float:
+        """
+        Try to admit one request. Returns 0.0 if admitted, otherwise the number
+        of seconds the caller should wait before retrying.
+        """
+        if not self.enabled:
+            return 0.0
+
+        now = time.monotonic()
+        ub = self._bucket(("u", user_id), self.user_burst, self.user_per_sec, now)
+        gb = self._bucket(("g", guild_id), self.guild_burst, self.guild_per_sec, now) if guild_id else None
+
+        wait = ub.wait_time(cost)
+        scope = "user"
+        if gb is not None:
+            gw = gb.wait_time(cost)
+            if gw > wait:
+                wait, scope = gw, "guild"
+
+        if wait > 0:
+            metrics.incr(f"ratelimit.limited.{scope}")
+            if command:
+                metrics.incr(f"ratelimit.limited.cmd.{command}")
+            return wait
+
+        ub.tokens -= cost
+        if gb is not None:
+            gb.tokens -= cost
+        metrics.incr("ratelimit.allowed")
+        return 0.0
+
+    def stats(self) -> Dict[str, int]:
+        return {"tracked_keys": len(self._buckets), "max_keys": self.max_keys}
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from cocbot.runtime.metrics import metrics
+
+# The bot and the dashboard are separate processes, so the bus is a local UDP
+# socket: the bot fires one datagram per roll at the dashboard and forgets it.
+# A missing or busy dashboard costs the bot a failed sendto(), never a wait.
+
+_MAX_DATAGRAM = 1200
+
+
+class RollFeedPublisher:
+    """
+    Bot side of the live roll feed: JSON-encodes an event and sends it
+    (non-blocking) to the dashboard's feed port. Errors only bump a counter.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.addr = (host, int(port))
+        self.enabled = port > 0
+        self._sock: Optional[socket.socket] = None
+
+    def _socket(self) -> socket.socket:
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+        return self._sock
+
+    def publish(self, event: Dict[str, Any]) -> bool:
+        if not self.enabled:
+            return False
+        data = json.dumps(event, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(data) > _MAX_DATAGRAM:
+            metrics.incr("feed.too_large")
+            return False
+        try:
+            self._socket().sendto(data, self.addr)
+        except OSError:
+            # receive buffer full / nobody listening: the feed is best effort
+            metrics.incr("feed.dropped")
+            return False
+        metrics.incr("feed.sent")
+        return True
+
+
+class _Client:
+    __slots__ = ("guild_id", "queue", "dropped")
+
+    def __init__(self, guild_id: Optional[str], size: int) -> None:
+        self.guild_id = guild_id
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=size)
+        self.dropped = 0
+
+
+class RollFeedHub(asyncio.DatagramProtocol):
+    """
+    Dashboard side: receives the bot's datagrams and fans each event out to
+    every connected viewer as a server-sent-events frame.
+
+    Each event is encoded into its SSE frame once and the same bytes object is
+    queued for every viewer. Viewer queues are bounded: a viewer that falls
+    behind loses its oldest frames (and sees a gap in the event ids) instead
+    of holding anything up. The last `replay` frames are kept so a new or
+    reconnecting viewer (Last-Event-ID) starts with recent rolls.
+
+    Ids start from the clock (milliseconds) rather than 1, so they keep
+    growing across dashboard restarts and a browser reconnecting with an id
+    from the previous process isn't mistaken for one that has seen
+    everything.
+    """
+
+    def __init__(self, client_queue: int = 256, replay: int = 50) -> None:
+        self.client_queue = max(1, int(client_queue))
+        self._clients: Set[_Client] = set()
+        self._recent: Deque[Tuple[int, Optional[str], bytes]] = deque(maxlen=max(0, int(replay)))
+        self._seq = time.time_ns() // 1_000_000
+        self.received = 0
+        self.invalid = 0
+        self.dropped = 0
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    # asyncio.DatagramProtocol
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        if b"\n" in data:
+            # compact JSON never contains a raw newline; it would split the SSE frame
+            self.invalid += 1
+            return
+        try:
+            event = json.loads(data)
+            guild_id = event.get("guild_id")
+        except (ValueError, AttributeError):
+            self.invalid += 1
+            return
+        self.publish(data, None if guild_id is None else str(guild_id))
+
+    def publish(self, payload: bytes, guild_id: Optional[str] = None) -> int:
+        """
+        Queue one JSON payload for every viewer watching `guild_id` (or all
+        guilds). Returns the event id.
+        """
+        self._seq += 1
+        self.received += 1
+        frame = b"id: %d\nevent: roll\ndata: %s\n\n" % (self._seq, payload)
+        self._recent.append((self._seq, guild_id, frame))
+        for c in self._clients:
+            if c.guild_id is not None and c.guild_id != guild_id:
+                continue
+            q = c.queue
+            if q.full():
+                q.get_nowait()
+                c.dropped += 1
+                self.dropped += 1
+            q.put_nowait(frame)
+        return self._seq
+
+    def subscribe(self, guild_id: Optional[str] = None, last_event_id: Optional[int] = None) -> _Client:
+        c = _Client(guild_id, self.client_queue)
+        if last_event_id is not None and last_event_id > self._seq:
+            # an id this process never issued (clock stepped back): replay everything
+            last_event_id = None
+        for seq, gid, frame in self._recent:
+            if last_event_id is not None and seq <= last_event_id:
+                continue
+            if guild_id is None or gid == guild_id:
+                if c.queue.full():
+                    c.queue.get_nowait()
+                c.queue.put_nowait(frame)
+        self._clients.add(c)
+        return c
+
+    def unsubscribe(self, client: _Client) -> None:
+        self._clients.discard(client)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listening": self.transport is not None,
+            "clients": len(self._clients),
+            "received": self.received,
+            "invalid": self.invalid,
+            "dropped": self.dropped,
+            "last_id": self._seq,
+            "taken_at": time.time(),
+        }
+
+    async def start(self, host: str, port: int) -> bool:
+        """
+        Bind the feed port. False (feed off) when it can't be bound, e.g. a
+        second dashboard process is already listening.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.create_datagram_endpoint(lambda: self, local_addr=(host, int(port)))
+        except OSError as e:
+            print(f"[feed] Could not listen on {host}:{port}: {e}")
+            return False
+        print(f"[feed] Listening for rolls on udp://{host}:{port}")
+        return True
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+
+def _make_default() -> RollFeedPublisher:
+    from cocbot.config import settings
+
+    return RollFeedPublisher(settings.FEED_HOST, settings.FEED_PORT)
+
+
+roll_feed = _make_default()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import struct
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from cocbot.mechanics.checks import SuccessLevel
+from cocbot.mechanics.house_rules import LEVELS
+
+# Column name -> array typecode. 9 bytes per roll: 1M rolls ≈ 9 MB.
+COLUMNS = {
+    "roll": "B",        # 1..100
+    "target": "H",      # 0..65535
+    "tier": "B",        # index into house_rules.LEVELS
+    "bp": "b",          # bonus (+) / penalty (-) dice
+    "ts": "I",          # unix seconds
+}
+_TIER = {lvl: i for i, lvl in enumerate(LEVELS)}
+_now = time.time
+_SUCCESS_MIN = _TIER[SuccessLevel.SUCCESS]     # LEVELS is ordered fumble..critical
+
+# dump file: header, then the filled part (`rows`) of each column in COLUMNS order
+_MAGIC = b"CRB1"
+_HEADER = struct.Struct("<4sQQQQ")             # magic, capacity, count, head, rows
+
+
+@dataclass(frozen=True)
+class RollSnapshot:
+    # copy of the filled part of every column plus the ring position, taken together
+    capacity: int
+    count: int
+    head: int
+    rows: int
+    columns: Dict[str, bytes]
+
+
+class RollBuffer:
+    """
+    Fixed-size columnar ring of recent d100 rolls for history and analytics.
+
+    Each column is a preallocated array.array, so appending is five item
+    assignments and nothing is allocated per roll. Columns are exported as
+    memoryviews (no copy); with NumPy they become ndarray views for the
+    vectorized summaries. Once full, the oldest rolls are overwritten.
+    Append from the event loop only.
+    """
+
+    def __init__(self, capacity: int = 1_000_000) -> None:
+        self.capacity = max(1, int(capacity))
+        self.cols: Dict[str, array] = {
+            name: array(code, bytes(array(code).itemsize * self.capacity)) for name, code in COLUMNS.items()
+        }
+        self._roll, self._target, self._tier, self._bp, self._ts = self.cols.values()
+        self.count = 0          # rolls appended in total
+        self.head = 0           # next slot to write
+        self._dumped = -1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, roll: int, target: int, level: SuccessLevel, bp: int = 0, ts: Optional[float] = None) -> None:
+        i = self.head
+        self._roll[i] = roll
+        self._target[i] = target if 0 <= target <= 0xFFFF else min(max(target, 0), 0xFFFF)
+        self._tier[i] = _TIER[level]
+        self._bp[i] = bp if -9 <= bp <= 9 else max(-9, min(9, bp))
+        self._ts[i] = int(_now() if ts is None else ts)
+        i += 1
+        self.head = 0 if i == self.capacity else i
+        self.count += 1
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in self.cols.values())
+
+    def export(self) -> Dict[str, memoryview]:
+        """
+        Zero-copy views of the filled part of every column, in ring order
+        (the oldest row is at `head` once the ring has wrapped).
+        """
+        n = len(self)
+        return {name: memoryview(a)[:n] for name, a in self.cols.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        return summarize(self.export(), capacity=self.capacity, total=self.count)
+
+    def snapshot(self) -> Optional[RollSnapshot]:
+        """
+        Consistent copy of the buffered rows for write_dump(). Take it on the
+        event loop (like append) so count/head and the columns match; the
+        copy (~9 MB for 1M rolls) can then be written from a worker thread.
+        None when nothing was appended since the last snapshot.
+        """
+        count = self.count
+        if count == self._dumped:
+            return None
+        views = self.export()
+        snap = RollSnapshot(
+            capacity=self.capacity,
+            count=count,
+            head=self.head,
+            rows=len(views["roll"]),
+            columns={name: v.tobytes() for name, v in views.items()},
+        )
+        self._dumped = count
+        return snap
+
+    def dump(self, path: Path) -> bool:
+        """
+        snapshot() + write_dump() in the calling thread. False when skipped.
+        """
+        snap = self.snapshot()
+        if snap is None:
+            return False
+        write_dump(path, snap)
+        return True
+
+
+def write_dump(path: Path, snap: RollSnapshot) -> None:
+    """
+    Write a snapshot to `path` for the dashboard (header + raw columns); see
+    load_dump(). Blocking, safe to run in a worker thread.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, snap.capacity, snap.count, snap.head, snap.rows))
+        for name in COLUMNS:
+            f.write(snap.columns[name])
+    os.replace(tmp, path)
+
+
+def load_dump(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Memory-map a dump as NumPy column views (no copy). None if missing or invalid.
+    """
+    try:
+        with open(path, "rb") as f:
+            magic, capacity, count, head, rows = _HEADER.unpack(f.read(_HEADER.size))
+    except (FileNotFoundError, struct.error):
+        return None
+    if magic != _MAGIC:
+        return None
+    cols: Dict[str, Any] = {}
+    offset = _HEADER.size
+    for name, code in COLUMNS.items():
+        dt = np.dtype(code)
+        cols[name] = np.memmap(path, dtype=dt, mode="r", offset=offset, shape=(rows,)) if rows else np.zeros(0, dt)
+        offset += dt.itemsize * rows
+    return {"capacity": capacity, "count": count, "head": head, "columns": cols}
+
+
+def _as_array(name: str, c: Union[memoryview, np.ndarray]) -> np.ndarray:
+    return np.frombuffer(c, dtype=np.dtype(COLUMNS[name])) if isinstance(c, memoryview) else c
+
+
+def summarize(columns: Dict[str, Any], *, capacity: int, total: int) -> Dict[str, Any]:
+    """
+    Vectorized summary of the buffered rolls (tier counts, success rate per
+    bonus/penalty, roll histogram by decade, rolls per minute). Columns may be
+    memoryviews (RollBuffer.export) or arrays (load_dump).
+    """
+    roll, tier, bp, ts = (_as_array(name, columns[name]) for name in ("roll", "tier", "bp", "ts"))
+    n = int(roll.size)
+    out: Dict[str, Any] = {"buffered": n, "capacity": capacity, "total": total}
+    if not n:
+        return out
+
+    tiers = np.bincount(tier, minlength=len(LEVELS))
+    ok = tier >= _SUCCESS_MIN
+    out["tiers"] = {lvl.value: int(c) for lvl, c in zip(LEVELS, tiers)}
+    out["success_rate"] = round(float(ok.mean()), 4)
+    out["mean_roll"] = round(float(roll.mean()), 2)
+    out["decades"] = np.bincount((roll.astype(np.int16) - 1) // 10, minlength=10).tolist()
+
+    bps, inverse = np.unique(bp, return_inverse=True)
+    per_bp = np.bincount(inverse)
+    succ_bp = np.bincount(inverse, weights=ok)
+    out["by_bp"] = {
+        f"{int(b):+d}": {"n": int(c), "success_rate": round(float(s / c), 4)} for b, c, s in zip(bps, per_bp, succ_bp)
+    }
+
+    t0, t1 = int(ts.min()), int(ts.max())
+    out["first_ts"], out["last_ts"] = t0, t1
+    out["per_min"] = round(n * 60 / max(1, t1 - t0), 2)
+    return out
+
+
+def _make_default() -> RollBuffer:
+    from cocbot.config import settings
+
+    return RollBuffer(settings.ROLL_HISTORY_SIZE)
+
+
+roll_history = _make_default()
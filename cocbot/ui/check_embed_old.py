@@ -5,6 +5,8 @@ from typing import Optional, Sequence, Tuple
 
 import discord
 
+from cocbot.mechanics.checks import SuccessLevel
+
 
 # --- CoC result labeling helpers ---
 
@@ -32,6 +34,16 @@ def _success_band(roll: int, target: int) -> str:
     return "FAILURE"
 
 
+_BAND_FOR_LEVEL = {
+    SuccessLevel.CRITICAL: "CRITICAL SUCCESS",
+    SuccessLevel.EXTREME: "EXTREME SUCCESS",
+    SuccessLevel.HARD: "HARD SUCCESS",
+    SuccessLevel.SUCCESS: "SUCCESS",
+    SuccessLevel.FAIL: "FAILURE",
+    SuccessLevel.FUMBLE: "FUMBLE",
+}
+
+
 def _emoji_for_band(band: str) -> str:
     return {
         "CRITICAL SUCCESS": "✨",
@@ -85,9 +97,12 @@ class CheckEmbedInput:
     base_value: Optional[int] = None     # pre-mod skill
     mod_total: Optional[int] = None      # total modifier applied to base to get skill_value
 
+    # Resolved level (guild house rules); when None the common table is used
+    level: Optional[SuccessLevel] = None
+
 
 def build_check_embed_old(inp: CheckEmbedInput) -> discord.Embed:
-    band = _success_band(inp.rolled, inp.skill_value)
+    band = _success_band(inp.rolled, inp.skill_value) if inp.level is None else _BAND_FOR_LEVEL[inp.level]
     emoji = _emoji_for_band(band)
     color = _color_for_band(band)
 
@@ -136,6 +151,8 @@ def build_check_embed_old(inp: CheckEmbedInput) -> discord.Embed:
             flags.append(f"**Luck Spent:** `{inp.luck_spent}`")
         else:
             flags.append(f"**Luck Spent:** `{inp.luck_spent}` → **Luck Now:** `{inp.luck_after}`")
+    elif inp.luck_after is not None:
+        flags.append(f"**Luck Now:** `{inp.luck_after}`")
     if flags:
         desc_lines.append(" • ".join(flags))
 
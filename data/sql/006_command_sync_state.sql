@@ -0,0 +1,10 @@
+PRAGMA foreign_keys = ON;
+-- Last slash-command tree pushed to Discord, per scope ("<app_id>:global" / "<app_id>:guild:<id>").
+-- Lets the bot skip tree.sync() on restart when nothing changed.
+
+CREATE TABLE IF NOT EXISTS command_sync_state (
+  scope TEXT PRIMARY KEY,
+  tree_hash TEXT NOT NULL,
+  synced_at TEXT NOT NULL DEFAULT (datetime('now')),
+  sync_ms REAL
+);
@@ -0,0 +1,24 @@
+PRAGMA foreign_keys = ON;
+-- Combat tracker: one row per combatant per guild, plus the guild's current round.
+-- Rounds are resolved in memory and written back once per round.
+
+CREATE TABLE IF NOT EXISTS combatants (
+  guild_id TEXT NOT NULL,
+  combatant_id INTEGER NOT NULL,
+  name TEXT NOT NULL,
+  dex INTEGER NOT NULL DEFAULT 50,
+  hp INTEGER NOT NULL,
+  hp_max INTEGER NOT NULL,
+  fight INTEGER NOT NULL DEFAULT 25,
+  dodge INTEGER NOT NULL DEFAULT 25,
+  damage TEXT NOT NULL DEFAULT '1d3',
+  db TEXT NOT NULL DEFAULT '0',
+  major_wound INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (guild_id, combatant_id)
+);
+
+CREATE TABLE IF NOT EXISTS combat_state (
+  guild_id TEXT PRIMARY KEY,
+  round_no INTEGER NOT NULL DEFAULT 0,
+  updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
@@ -0,0 +1,38 @@
+PRAGMA foreign_keys = ON;
+-- Characters and their mutable resources.
+-- attributes / guild_settings match the columns the bot already reads; IF NOT EXISTS keeps older DBs intact.
+
+CREATE TABLE IF NOT EXISTS characters (
+  character_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  guild_id TEXT,
+  user_id TEXT,                      -- NULL for NPCs
+  name TEXT NOT NULL,
+  profession TEXT,
+  created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_characters_guild
+ON characters(guild_id, user_id);
+
+CREATE TABLE IF NOT EXISTS attributes (
+  character_id INTEGER PRIMARY KEY,
+  str INTEGER, con INTEGER, siz INTEGER, dex INTEGER,
+  app INTEGER, int INTEGER, pow INTEGER, edu INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS guild_settings (
+  guild_id TEXT PRIMARY KEY,
+  active_character_id INTEGER
+);
+
+-- Luck / SAN / HP / MP ledger. Every change is a single UPDATE ... RETURNING.
+CREATE TABLE IF NOT EXISTS character_resources (
+  character_id INTEGER PRIMARY KEY,
+  luck INTEGER,
+  san INTEGER,
+  hp INTEGER,
+  mp INTEGER,
+  hp_max INTEGER,
+  mp_max INTEGER,
+  updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
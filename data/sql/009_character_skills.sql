@@ -0,0 +1,14 @@
+PRAGMA foreign_keys = ON;
+-- Per-character skill values (occupation/interest points already added to base).
+-- `ticked` marks a success during play, for the development phase.
+
+CREATE TABLE IF NOT EXISTS character_skills (
+  character_id INTEGER NOT NULL,
+  skill_id INTEGER NOT NULL,
+  value INTEGER NOT NULL,
+  ticked INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (character_id, skill_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_character_skills_ticked
+ON character_skills(ticked, character_id);
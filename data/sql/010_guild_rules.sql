@@ -0,0 +1,15 @@
+PRAGMA foreign_keys = ON;
+-- Keeper house rules per guild. A guild without a row plays the default table
+-- (01 critical; 96–100 fumble below 50; 100 fails otherwise).
+-- fumble_min_high NULL = no fumble range at/above fumble_split (only 100 fails).
+
+CREATE TABLE IF NOT EXISTS guild_rules (
+  guild_id TEXT PRIMARY KEY,
+  crit_max INTEGER NOT NULL DEFAULT 1,          -- rolls 01..crit_max are criticals (if also <= target; 01 always)
+  fumble_min_low INTEGER NOT NULL DEFAULT 96,   -- fumble range when target < fumble_split
+  fumble_min_high INTEGER,                      -- fumble range when target >= fumble_split
+  fumble_split INTEGER NOT NULL DEFAULT 50,
+  allow_push INTEGER NOT NULL DEFAULT 1,
+  allow_luck INTEGER NOT NULL DEFAULT 1,
+  updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
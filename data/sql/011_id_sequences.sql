@@ -0,0 +1,16 @@
+PRAGMA foreign_keys = ON;
+-- Id allocator shared by every storage file. With COC_STORAGE_MODE=guild each guild has
+-- its own characters table, so MAX(character_id) + 1 per file would hand out the same
+-- id in two guilds; new character ids are reserved from this row in the shared DB instead.
+
+CREATE TABLE IF NOT EXISTS id_sequences (
+  name TEXT PRIMARY KEY,
+  next_id INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO id_sequences (name, next_id)
+SELECT 'character', COALESCE(MAX(m), 0) + 1 FROM (
+  SELECT MAX(character_id) AS m FROM characters
+  UNION ALL SELECT MAX(character_id) FROM attributes
+  UNION ALL SELECT MAX(character_id) FROM character_resources
+);
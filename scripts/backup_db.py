@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from cocbot.config import settings  # noqa: E402
+from cocbot.db.backup import BackupScheduler, gzip_file, online_backup  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Online backup of the bot DB (safe while the bot is running).")
+    ap.add_argument("--db", type=Path, default=settings.DB_PATH)
+    ap.add_argument("--out", type=Path, help="Export to this file instead of a rotated snapshot.")
+    ap.add_argument("--no-gzip", action="store_true")
+    ap.add_argument("--keep", type=int, default=settings.BACKUP_KEEP, help="Snapshots to keep when rotating.")
+    ap.add_argument("--pages-per-step", type=int, default=settings.BACKUP_PAGES_PER_STEP)
+    ap.add_argument("--pause-ms", type=float, default=settings.BACKUP_STEP_PAUSE_MS)
+    ap.add_argument(
+        "--guild-dir",
+        type=Path,
+        default=settings.GUILD_DB_DIR if settings.STORAGE_MODE == "guild" else None,
+        help="Also snapshot every guild file in this directory (default in COC_STORAGE_MODE=guild).",
+    )
+    ap.add_argument("--no-guilds", action="store_true", help="Only snapshot the shared DB.")
+    args = ap.parse_args()
+
+    if not args.db.exists():
+        raise FileNotFoundError(f"DB not found: {args.db}")
+
+    if args.out:
+        t0 = time.perf_counter()
+        out = args.out.with_suffix("") if args.out.suffix == ".gz" else args.out
+        info = online_backup(args.db, out, pages_per_step=args.pages_per_step, step_pause_s=args.pause_ms / 1000)
+        if not args.no_gzip:
+            gz = gzip_file(out)
+            out.unlink()
+            out = gz
+        dt = time.perf_counter() - t0
+        print(f"[OK] {out} — {info['pages']} pages in {dt * 1000:.0f} ms ({info['pages'] / max(dt, 1e-9):.0f} pages/s)")
+        return
+
+    scheduler = BackupScheduler(
+        args.db,
+        settings.BACKUP_DIR,
+        settings.RUNTIME_DIR / "backup.json",
+        keep=args.keep,
+        pages_per_step=args.pages_per_step,
+        step_pause_s=args.pause_ms / 1000,
+        compress=not args.no_gzip,
+        guild_dir=None if args.no_guilds else args.guild_dir,
+    )
+    failed = 0
+    for r in asyncio.run(scheduler.run_once(force=True)):
+        if r.error:
+            failed += 1
+            print(f"[FAIL] {r.guild_id or args.db}: {r.error}")
+            continue
+        size = f"{r.size_bytes / 1024:.0f} KiB"
+        if r.compressed_bytes is not None:
+            size += f" → {r.compressed_bytes / 1024:.0f} KiB gz"
+        print(
+            f"[OK] {settings.BACKUP_DIR / r.file} — {r.pages} pages in {r.duration_ms:.0f} ms "
+            f"({r.pages_per_s:.0f} pages/s, {size})"
+        )
+    if failed:
+        raise SystemExit(f"[FAIL] {failed} file(s) not backed up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from cocbot.mechanics import dice  # noqa: E402
+from cocbot.mechanics.checks import success_level  # noqa: E402
+from cocbot.mechanics.derived import eval_derived_formula  # noqa: E402
+from cocbot.mechanics.house_rules import compile_rules  # noqa: E402
+from cocbot.runtime.roll_history import RollBuffer  # noqa: E402
+from cocbot.mechanics.dice import parse_and_roll, roll_d100_bonus_penalty_candidates  # noqa: E402
+
+BASELINE = ROOT / "data" / "bench" / "mechanics.json"
+
+# Benchmarks compare ops/sec *relative to a reference loop* measured in the same run,
+# so a baseline recorded on one machine stays meaningful on another.
+DEFAULT_TOLERANCE = 0.30
+CHI2_ALPHA = 1e-4
+
+
+# ---------- Benchmarks ----------
+
+@dataclass(frozen=True)
+class BenchResult:
+    name: str
+    ops_per_sec: float
+    relative: float                  # ops_per_sec / reference ops_per_sec
+    alloc_bytes_per_call: float      # tracemalloc peak above the pre-call level
+    retained_blocks_per_call: float  # blocks still alive afterwards (leak check)
+
+
+def _reference() -> int:
+    x = 0
+    for i in range(16):
+        x += i
+    return x
+
+
+def _time_per_call(fn: Callable[[], object], min_time: float) -> float:
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt >= min_time:
+            return dt / n
+        n *= 2 if dt < min_time / 4 else 4
+
+
+def _ops_per_sec(fn: Callable[[], object], min_time: float, repeat: int) -> float:
+    gc.collect()
+    best = min(_time_per_call(fn, min_time) for _ in range(repeat))
+    return 1.0 / best
+
+
+def _allocations(fn: Callable[[], object], calls: int = 200) -> Tuple[float, float]:
+    fn()  # warm caches (regex, enum lookups) before measuring
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        peak_total = 0
+        for _ in range(calls):
+            cur, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - cur
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+    return peak_total / calls, retained / calls
+
+
+def _embed_case() -> Optional[Callable[[], object]]:
+    try:
+        from cocbot.ui.check_embed_old import CheckEmbedInput, build_check_embed_old
+    except ImportError:
+        return None
+    inp = CheckEmbedInput(
+        actor_name="Jason",
+        skill_name_display="Spot Hidden",
+        skill_value=60,
+        rolled=23,
+        bp_dice=2,
+        bp_mode="bonus",
+        bp_candidates=[23, 53, 83],
+        base_value=25,
+        mod_total=35,
+    )
+    return lambda: build_check_embed_old(inp)
+
+
+def bench_cases() -> Dict[str, Callable[[], object]]:
+    stats = {"STR": 50, "CON": 60, "SIZ": 65, "DEX": 70, "APP": 45, "INT": 80, "POW": 55, "EDU": 75}
+    rules = compile_rules()
+    history, level = RollBuffer(4096), rules.level(55, 60)
+    pairs = itertools.cycle([(r, t) for r in (1, 5, 17, 33, 50, 71, 96, 100) for t in (15, 40, 65, 90)])
+    cases: Dict[str, Callable[[], object]] = {
+        "roll_d100_bp0": lambda: roll_d100_bonus_penalty_candidates(0),
+        "roll_d100_bonus2": lambda: roll_d100_bonus_penalty_candidates(2),
+        "roll_d100_penalty2": lambda: roll_d100_bonus_penalty_candidates(-2),
+        "success_level": lambda: success_level(*next(pairs)),
+        "house_rules_level": lambda: rules.level(*next(pairs)),
+        "roll_history_append": lambda: history.append(55, 60, level, -1, 0),
+        "parse_and_roll": lambda: parse_and_roll("2d6+1"),
+        "eval_derived_stat": lambda: eval_derived_formula("EDU", stats),
+        "eval_derived_div": lambda: eval_derived_formula("DEX/2", stats),
+    }
+    embed = _embed_case()
+    if embed is not None:
+        cases["build_check_embed_old"] = embed
+    return cases
+
+
+def run_benchmarks(min_time: float, repeat: int, only: Sequence[str] = ()) -> Tuple[float, List[BenchResult]]:
+    ref = _ops_per_sec(_reference, min_time, repeat)
+    out: List[BenchResult] = []
+    for name, fn in bench_cases().items():
+        if only and name not in only:
+            continue
+        ops = _ops_per_sec(fn, min_time, repeat)
+        alloc, retained = _allocations(fn)
+        out.append(BenchResult(name, ops, ops / ref, alloc, retained))
+    return ref, out
+
+
+# ---------- Statistical conformance ----------
+
+@dataclass(frozen=True)
+class ChiSquareResult:
+    name: str
+    samples: int
+    chi2: float
+    dof: int
+    p_value: float
+
+    @property
+    def ok(self) -> bool:
+        return self.p_value >= CHI2_ALPHA
+
+
+def _d100(tens: int, ones: int) -> int:
+    v = tens * 10 + ones
+    return 100 if v == 0 else v
+
+
+def expected_bp_distribution(bp: int) -> Dict[int, float]:
+    """
+    Exact P(chosen = v) for v in 1..100, by enumerating every ones/tens combination
+    straight from the rules (not from dice.py).
+    """
+    n_tens = abs(bp) + 1
+    pick = min if bp > 0 else max
+    counts: Counter = Counter()
+    for ones in range(10):
+        for tens in itertools.product(range(10), repeat=n_tens):
+            counts[pick(_d100(t, ones) for t in tens)] += 1
+    total = 10 ** (n_tens + 1)
+    return {v: counts[v] / total for v in range(1, 101)}
+
+
+def chi2_sf(x: float, k: int) -> float:
+    """
+    Upper tail of the chi-square distribution (Wilson–Hilferty; plenty for k >= 9).
+    """
+    if x <= 0:
+        return 1.0
+    z = ((x / k) ** (1 / 3) - (1 - 2 / (9 * k))) / math.sqrt(2 / (9 * k))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def chi_square(name: str, observed: Counter, expected: Dict[int, float], samples: int) -> ChiSquareResult:
+    chi2 = 0.0
+    bins = 0
+    for v, p in expected.items():
+        if p <= 0:
+            if observed.get(v):
+                return ChiSquareResult(name, samples, math.inf, 0, 0.0)
+            continue
+        e = p * samples
+        chi2 += (observed.get(v, 0) - e) ** 2 / e
+        bins += 1
+    dof = bins - 1
+    return ChiSquareResult(name, samples, chi2, dof, chi2_sf(chi2, dof))
+
+
+def _digit_stream(samples: int, per_roll: int, seed: int):
+    # Pre-drawn digits: the conformance run measures the combine/select logic of
+    # roll_d100_bonus_penalty_candidates without paying for random.randint per die.
+    try:
+        import numpy as np
+    except ImportError:
+        rng = random.Random(seed)
+        return iter(rng.choices(range(10), k=samples * per_roll)).__next__
+    return iter(np.random.default_rng(seed).integers(0, 10, size=samples * per_roll).tolist()).__next__
+
+
+def conformance(samples: int, seed: int, bps: Sequence[int] = (-2, -1, 0, 1, 2)) -> List[ChiSquareResult]:
+    results: List[ChiSquareResult] = []
+
+    # the real d10 source
+    rng_state = random.getstate()
+    random.seed(seed)
+    try:
+        d10 = Counter(dice.roll_d10() for _ in range(max(samples, 1_000_000)))
+    finally:
+        random.setstate(rng_state)
+    n = sum(d10.values())
+    results.append(chi_square("roll_d10", d10, {d: 0.1 for d in range(10)}, n))
+
+    original = dice.roll_d10
+    try:
+        for bp in bps:
+            dice.roll_d10 = _digit_stream(samples, abs(bp) + 2, seed + bp)
+            f = roll_d100_bonus_penalty_candidates
+            observed = Counter(f(bp).chosen for _ in range(samples))
+            results.append(chi_square(f"bp{bp:+d}", observed, expected_bp_distribution(bp), samples))
+    finally:
+        dice.roll_d10 = original
+    return results
+
+
+# ---------- Baselines ----------
+
+def load_baseline(path: Path) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("benchmarks", {})
+
+
+def save_baseline(path: Path, ref: float, results: Sequence[BenchResult]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "reference_ops_per_sec": round(ref, 1),
+        "benchmarks": {r.name: {k: round(v, 4) for k, v in asdict(r).items() if k != "name"} for r in results},
+    }
+    path.write_text(json.dumps(doc, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def compare(results: Sequence[BenchResult], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    failures: List[str] = []
+    for r in results:
+        b = baseline.get(r.name)
+        if not b:
+            continue
+        if r.relative < b["relative"] * (1 - tolerance):
+            failures.append(f"{r.name}: {r.relative:.4f} vs baseline {b['relative']:.4f} (relative speed)")
+        # small absolute slack: tracemalloc peaks jitter by a few blocks
+        if r.alloc_bytes_per_call > b["alloc_bytes_per_call"] * (1 + tolerance) + 256:
+            failures.append(f"{r.name}: {r.alloc_bytes_per_call:.0f} B/call vs baseline {b['alloc_bytes_per_call']:.0f}")
+    return failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark and statistically check cocbot.mechanics.")
+    ap.add_argument("--samples", type=int, default=200_000, help="Rolls per bonus/penalty level (chi-square).")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--min-time", type=float, default=0.1, help="Seconds per timing sample.")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--only", nargs="*", default=(), help="Run only these benchmarks.")
+    ap.add_argument("--skip-bench", action="store_true")
+    ap.add_argument("--skip-stats", action="store_true")
+    args = ap.parse_args()
+
+    failed = False
+
+    if not args.skip_stats:
+        t0 = time.perf_counter()
+        for r in conformance(args.samples, args.seed):
+            mark = "OK" if r.ok else "FAIL"
+            print(f"[{mark}] chi2 {r.name:<10} n={r.samples:<9} chi2={r.chi2:9.2f} dof={r.dof:<3} p={r.p_value:.4f}")
+            failed |= not r.ok
+        print(f"[INFO] conformance in {time.perf_counter() - t0:.2f}s")
+
+    if not args.skip_bench:
+        ref, results = run_benchmarks(args.min_time, args.repeat, args.only)
+        print(f"[INFO] reference loop: {ref:,.0f} ops/s")
+        for r in results:
+            print(
+                f"  {r.name:<24} {r.ops_per_sec:>12,.0f} ops/s  rel {r.relative:.4f}  "
+                f"{r.alloc_bytes_per_call:7.0f} B/call  retained {r.retained_blocks_per_call:.3f} blk/call"
+            )
+        if args.update_baseline:
+            save_baseline(args.baseline, ref, results)
+            print(f"[OK] baseline written to {args.baseline}")
+        else:
+            baseline = load_baseline(args.baseline)
+            if not baseline:
+                print(f"[WARN] no baseline at {args.baseline} — run with --update-baseline")
+            for msg in compare(results, baseline, args.tolerance):
+                print(f"[FAIL] regression {msg}")
+                failed = True
+
+    if failed:
+        raise SystemExit(1)
+    print("[DONE] mechanics OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from cocbot.db import resources as ledger  # noqa: E402
+from cocbot.db.characters import allocate_character_ids, set_active_character_id  # noqa: E402
+from cocbot.db.partition import GuildDBPool  # noqa: E402
+from cocbot.db.skill_catalog import SkillCatalog  # noqa: E402
+
+SQL_DIR = ROOT / "data" / "sql"
+
+# Behaviour checks for the storage layer, run against a throwaway DB built from
+# data/sql (the real DB is never touched). Each check returns a list of failures.
+
+
+def build_db(path: Path) -> None:
+    conn = sqlite3.connect(str(path))
+    try:
+        for p in sorted(SQL_DIR.glob("[0-9][0-9][0-9]_*.sql")):
+            conn.executescript(p.read_text(encoding="utf-8"))
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def _add_character(conn: sqlite3.Connection, guild_id: str, cid: int) -> None:
+    conn.execute("INSERT INTO characters (character_id, guild_id, user_id, name) VALUES (?, ?, '1', ?)",
+                 (cid, guild_id, f"PC-{cid}"))
+    conn.execute("INSERT INTO attributes (character_id, con, siz, pow) VALUES (?, 50, 60, 55)", (cid,))
+
+
+def check_luck_cache(db: Path) -> List[str]:
+    """
+    /setchar on a character without a ledger row, then /adjust luck value:,
+    must leave "Luck Now" in the cache (no reload in between).
+    """
+    failures: List[str] = []
+    g = "check-luck"
+    conn = sqlite3.connect(str(db))
+    try:
+        _add_character(conn, g, 9001)
+        _add_character(conn, g, 9002)
+        # /setchar: no ledger row yet, guild marked as known
+        set_active_character_id(conn, g, 9001)
+        if ledger.get_resources(conn, g, 9001) is not None:
+            failures.append("ledger row exists before /adjust")
+        ledger.cache.set_active(g, 9001)
+        # /adjust luck value:40
+        ledger.ensure_resources(conn, 9001)
+        ledger.set_resource(conn, g, 9001, "luck", 40)
+        if ledger.cache.active_value(g, "luck") != 40:
+            failures.append(f"Luck Now after set: {ledger.cache.active_value(g, 'luck')} (want 40)")
+        ledger.adjust_resource(conn, g, 9001, "luck", -5)
+        ledger.spend_resource(conn, g, 9001, "luck", 10)
+        if ledger.cache.active_value(g, "luck") != 25:
+            failures.append(f"Luck Now after adjust/spend: {ledger.cache.active_value(g, 'luck')} (want 25)")
+        # a row created after the guild was loaded, changed only through adjust_many
+        ledger.ensure_resources(conn, 9002)
+        ledger.adjust_many(conn, g, "san", {9002: -3})
+        if ledger.cache.value(g, 9002, "san") != 52:
+            failures.append(f"SAN after adjust_many: {ledger.cache.value(g, 9002, 'san')} (want 52)")
+        conn.commit()
+    finally:
+        conn.close()
+    return failures
+
+
+def _race(workers: int, fn: Callable[[int], List[int]]) -> Tuple[List[int], List[str]]:
+    # run fn(worker) on `workers` threads released together; (all ids, errors)
+    barrier = threading.Barrier(workers)
+    ids: List[int] = []
+    errors: List[str] = []
+
+    def _run(w: int) -> None:
+        barrier.wait()
+        try:
+            ids.extend(fn(w))
+        except Exception as e:  # noqa: BLE001 - reported as a failure
+            errors.append(f"worker {w}: {e!r}")
+
+    threads = [threading.Thread(target=_run, args=(w,)) for w in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return ids, errors
+
+
+def _insert(conn: sqlite3.Connection, guild_id: str, start: int, n: int) -> List[int]:
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    conn.executemany(
+        "INSERT INTO characters (character_id, guild_id, name) VALUES (?, ?, 'NPC')",
+        ((cid, guild_id) for cid in range(start, start + n)),
+    )
+    return list(range(start, start + n))
+
+
+def check_id_allocation(db: Path, workers: int = 8, rounds: int = 5, n: int = 3) -> List[str]:
+    """
+    Concurrent allocate_character_ids + insert, on the single file and on
+    per-guild files sharing one sequence: no errors, no id handed out twice.
+    """
+    failures: List[str] = []
+
+    def _single(w: int) -> List[int]:
+        out: List[int] = []
+        for _ in range(rounds):
+            conn = sqlite3.connect(str(db), timeout=10)
+            try:
+                out += _insert(conn, "check-ids", allocate_character_ids(conn, n), n)
+                conn.commit()
+            finally:
+                conn.close()
+        return out
+
+    with tempfile.TemporaryDirectory(prefix="cocbot-guilds-") as guild_dir:
+        pool = GuildDBPool(db, Path(guild_dir), max_open=workers)
+
+        def _guild(w: int) -> List[int]:
+            out: List[int] = []
+            for _ in range(rounds):
+                with pool.connection(f"check-{w}") as conn:
+                    out += _insert(conn, f"check-{w}", allocate_character_ids(conn, n), n)
+            return out
+
+        for mode, fn in (("single file", _single), ("guild files", _guild)):
+            ids, errors = _race(workers, fn)
+            failures += [f"{mode}: {e}" for e in errors]
+            dupes = len(ids) - len(set(ids))
+            if dupes:
+                failures.append(f"{mode}: {dupes} id(s) allocated twice")
+        pool.close_all()
+    return failures
+
+
+def check_skill_master(db: Path) -> List[str]:
+    """
+    skills_master rows are found by key/zh whether or not they map to a
+    skill_defs entry (house skills only in the Excel sheet).
+    """
+    failures: List[str] = []
+    conn = sqlite3.connect(str(db))
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS skills_master (key TEXT PRIMARY KEY, zh TEXT, base INTEGER, category TEXT)")
+        key = conn.execute("SELECT key FROM skill_defs ORDER BY skill_id LIMIT 1").fetchone()[0]
+        conn.executemany("INSERT OR REPLACE INTO skills_master (key, zh, base) VALUES (?, ?, ?)",
+                         ((key, "", 7), ("Check House Skill", "检查专用技能", 13)))
+        cat = SkillCatalog.load(conn)
+        conn.rollback()
+    finally:
+        conn.close()
+    for query, base in ((key, 7), ("check house skill", 13), ("Check-House/Skill", 13), ("检查专用技能", 13)):
+        row = cat.master(query)
+        if row is None or row.base != base:
+            failures.append(f"master({query!r}) = {row} (want base {base})")
+    if cat.master("") is not None:
+        failures.append("master('') matched a row")
+    return failures
+
+
+CHECKS: Tuple[Tuple[str, Callable[[Path], List[str]]], ...] = (
+    ("luck_cache", check_luck_cache),
+    ("id_allocation", check_id_allocation),
+    ("skill_master", check_skill_master),
+)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Behaviour checks for the DB layer (throwaway DB built from data/sql).")
+    ap.add_argument("--only", nargs="*", default=(), help="Run only these checks.")
+    args = ap.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="cocbot-check-") as tmp:
+        db = Path(tmp) / "coc_bot.sqlite3"
+        build_db(db)
+        for name, fn in CHECKS:
+            if args.only and name not in args.only:
+                continue
+            t0 = time.perf_counter()
+            failures = fn(db)
+            dt = (time.perf_counter() - t0) * 1000
+            if failures:
+                failed = True
+                for msg in failures:
+                    print(f"[FAIL] {name}: {msg}")
+            else:
+                print(f"[OK] {name} ({dt:.0f} ms)")
+
+    if failed:
+        raise SystemExit(1)
+    print("[DONE] storage OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from cocbot.config import settings  # noqa: E402
+from cocbot.db.characters import bulk_insert_characters  # noqa: E402
+from cocbot.db.partition import GuildDBPool  # noqa: E402
+from cocbot.db.professions import find_template, get_generation_data  # noqa: E402
+from cocbot.mechanics.chargen import generate  # noqa: E402
+
+DB_PATH = ROOT / "data" / "coc_bot.sqlite3"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Bulk-generate NPC investigators (e.g. for load tests).")
+    ap.add_argument("--count", type=int, default=100_000)
+    ap.add_argument("--profession", help="Profession name (职业). Default: random per NPC.")
+    ap.add_argument("--guild", default="npc", help="guild_id to file the NPCs under.")
+    ap.add_argument("--chunk", type=int, default=25_000, help="Rows per generate/insert batch.")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--db", type=Path, default=DB_PATH)
+    ap.add_argument("--dry-run", action="store_true", help="Generate only, don't write.")
+    args = ap.parse_args()
+
+    if not args.db.exists():
+        raise FileNotFoundError(f"DB not found: {args.db} (run scripts/apply_sql.py first)")
+
+    conn = sqlite3.connect(str(args.db))
+    conn.execute("PRAGMA foreign_keys = ON;")
+    rng = np.random.default_rng(args.seed)
+    # COC_STORAGE_MODE=guild: the NPCs go to the guild's own file, `--db` is the shared DB
+    pool = GuildDBPool(args.db, settings.GUILD_DB_DIR, max_open=1) if settings.STORAGE_MODE == "guild" else None
+    if pool is not None and not args.dry_run:
+        print(f"[OK] Writing to {pool.guild_dir / (args.guild + '.sqlite3')}")
+
+    t0 = time.perf_counter()
+    table, templates = get_generation_data(conn)
+    t_load = time.perf_counter() - t0
+    print(f"[OK] Loaded {len(templates)} profession templates in {t_load * 1000:.0f} ms")
+
+    if args.profession:
+        tpl = find_template(templates, args.profession)
+        if tpl is None:
+            raise SystemExit(f"Unknown profession: {args.profession}")
+        plan = [(tpl, args.count)]
+    elif templates:
+        names = sorted(templates)
+        counts = np.bincount(rng.integers(0, len(names), size=args.count), minlength=len(names))
+        plan = [(templates[nm], int(c)) for nm, c in zip(names, counts) if c]
+    else:
+        print("[WARN] No professions imported — generating characteristics only.")
+        plan = [(None, args.count)]
+
+    t_gen = t_write = 0.0
+    total = 0
+    for tpl, count in plan:
+        left = count
+        while left > 0:
+            n = min(args.chunk, left)
+            t1 = time.perf_counter()
+            batch = generate(n, tpl, table, rng)
+            t2 = time.perf_counter()
+            if args.dry_run:
+                pass
+            elif pool is not None:
+                with pool.connection(args.guild) as gconn:
+                    bulk_insert_characters(gconn, batch, guild_id=args.guild)
+            else:
+                bulk_insert_characters(conn, batch, guild_id=args.guild)
+            t3 = time.perf_counter()
+            t_gen += t2 - t1
+            t_write += t3 - t2
+            total += n
+            left -= n
+
+    conn.close()
+    if pool is not None:
+        pool.close_all()
+    wall = time.perf_counter() - t0
+    print(
+        f"[DONE] {total} NPCs in {wall:.2f}s "
+        f"(generate {t_gen:.2f}s, write {t_write:.2f}s, {total / max(wall, 1e-9):,.0f}/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
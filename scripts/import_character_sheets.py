@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from cocbot.config import settings  # noqa: E402
+from cocbot.db.characters import upsert_sheet_characters  # noqa: E402
+from cocbot.db.partition import GuildDBPool  # noqa: E402
+from cocbot.db.repo_skill_defs import load_skill_name_index  # noqa: E402
+from cocbot.importers.character_sheet import (  # noqa: E402
+    ParsedSheet,
+    find_workbooks,
+    parse_sheet,
+    resolve_sheet_skills,
+)
+
+DB_PATH = ROOT / "data" / "coc_bot.sqlite3"
+
+
+def load_name_index(conn: sqlite3.Connection) -> Dict[str, int]:
+    # one pass over i18n/aliases for every file; zh names win over en on collisions
+    index = load_skill_name_index(conn, "en")
+    index.update(load_skill_name_index(conn, "zh"))
+    return index
+
+
+def parse_all(paths: List[str], workers: int) -> Iterable[ParsedSheet]:
+    if workers <= 1:
+        yield from map(parse_sheet, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // (workers * 4))
+        yield from pool.map(parse_sheet, paths, chunksize=chunksize)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Import 人物卡 workbooks (COC七版人物卡 format) into the DB.")
+    ap.add_argument("path", type=Path, help="A .xlsx file or a directory of them (searched recursively).")
+    ap.add_argument("--guild", required=True, help="guild_id the characters belong to.")
+    ap.add_argument("--user", default=None, help="Discord user id to own the characters (optional).")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes (1 = in-process).")
+    ap.add_argument("--batch-size", type=int, default=200, help="Sheets per DB transaction.")
+    ap.add_argument("--db", type=Path, default=DB_PATH)
+    ap.add_argument("--dry-run", action="store_true", help="Parse and resolve only, don't write.")
+    ap.add_argument("--quiet", action="store_true", help="Only print failures and the summary.")
+    args = ap.parse_args()
+
+    if not args.db.exists():
+        raise FileNotFoundError(f"DB not found: {args.db} (run scripts/apply_sql.py first)")
+    paths = [str(p) for p in find_workbooks(args.path)]
+    if not paths:
+        print(f"[WARN] No .xlsx files under {args.path}")
+        return
+
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(str(args.db))
+    conn.execute("PRAGMA foreign_keys = ON;")
+    index = load_name_index(conn)
+    print(f"[OK] {len(paths)} workbooks, {len(index)} skill names/aliases, {args.workers} worker(s)")
+    # COC_STORAGE_MODE=guild: characters go to the guild's own file, `--db` is the shared DB
+    pool = GuildDBPool(args.db, settings.GUILD_DB_DIR, max_open=1) if settings.STORAGE_MODE == "guild" else None
+    if pool is not None and not args.dry_run:
+        print(f"[OK] Writing to {pool.guild_dir / (args.guild + '.sqlite3')}")
+
+    ok = failed = 0
+    parse_ms = write_ms = 0.0
+    batch: List[Tuple[ParsedSheet, Mapping[int, int], List[str]]] = []
+
+    def flush() -> None:
+        nonlocal write_ms
+        if not batch:
+            return
+        t1 = time.perf_counter()
+        if args.dry_run:
+            ids = [None] * len(batch)
+        else:
+            items = [(s, skills) for s, skills, _ in batch]
+            if pool is not None:
+                with pool.connection(args.guild) as gconn:
+                    ids = upsert_sheet_characters(gconn, items, guild_id=args.guild, user_id=args.user)
+            else:
+                ids = upsert_sheet_characters(conn, items, guild_id=args.guild, user_id=args.user)
+        dt = (time.perf_counter() - t1) * 1000
+        write_ms += dt
+        if not args.quiet:
+            for (s, skills, unresolved), cid in zip(batch, ids):
+                extra = f", unresolved: {'、'.join(unresolved)}" if unresolved else ""
+                print(
+                    f"  {Path(s.path).name}: {s.name or '-'} → id {cid} "
+                    f"(parse {s.parse_ms:.0f} ms, {len(skills)} skills{extra})"
+                )
+            print(f"[OK] batch of {len(batch)} written in {dt:.0f} ms")
+        batch.clear()
+
+    for sheet in parse_all(paths, args.workers):
+        parse_ms += sheet.parse_ms
+        if not sheet.ok:
+            failed += 1
+            print(f"[FAIL] {sheet.path}: {sheet.error} ({sheet.parse_ms:.0f} ms)")
+            continue
+        skills, unresolved = resolve_sheet_skills(sheet.skills, index)
+        batch.append((sheet, skills, unresolved))
+        ok += 1
+        if len(batch) >= args.batch_size:
+            flush()
+    flush()
+    conn.close()
+    if pool is not None:
+        pool.close_all()
+
+    wall = time.perf_counter() - t0
+    print(
+        f"[DONE] {ok} imported, {failed} failed in {wall:.2f}s "
+        f"(parse {parse_ms / 1000:.2f}s cpu across workers, write {write_ms / 1000:.2f}s, "
+        f"{len(paths) / max(wall, 1e-9):.1f} files/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from cocbot.config import settings  # noqa: E402
+from cocbot.db.partition import GUILD_TABLES, GuildDBPool  # noqa: E402
+
+# guild files allocate character ids from this table in the shared DB
+ID_SEQUENCES_SQL = ROOT / "data" / "sql" / "011_id_sequences.sql"
+
+# guild-keyed tables copy by guild_id; the rest by the guild's character ids
+_BY_GUILD = ("guild_settings", "guild_rules", "characters", "combatants", "combat_state")
+_BY_CHARACTER = tuple(t for t in GUILD_TABLES if t not in _BY_GUILD)
+
+_GUILD_CHARACTERS = """
+    SELECT character_id FROM ref.characters WHERE guild_id = :gid
+    UNION
+    SELECT active_character_id FROM ref.guild_settings
+    WHERE guild_id = :gid AND active_character_id IS NOT NULL
+"""
+
+
+def existing_tables(conn: sqlite3.Connection) -> set:
+    return {str(r[0]) for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def list_guilds(conn: sqlite3.Connection, tables: set) -> List[str]:
+    parts = [f"SELECT guild_id FROM {t} WHERE guild_id IS NOT NULL" for t in _BY_GUILD if t in tables]
+    if not parts:
+        return []
+    return [str(r[0]) for r in conn.execute(" UNION ".join(parts) + " ORDER BY 1")]
+
+
+def migrate_guild(conn: sqlite3.Connection, gid: str, tables: set) -> Dict[str, int]:
+    """
+    Copy one guild's rows from the reference DB (attached as `ref`) into the
+    guild file, in one transaction. Re-running replaces rows with the same key.
+    """
+    counts: Dict[str, int] = {}
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for t in _BY_GUILD:
+            if t in tables:
+                cur = conn.execute(f"INSERT OR REPLACE INTO main.{t} SELECT * FROM ref.{t} WHERE guild_id = :gid", {"gid": gid})
+                counts[t] = cur.rowcount
+        for t in _BY_CHARACTER:
+            if t in tables:
+                cur = conn.execute(
+                    f"INSERT OR REPLACE INTO main.{t} SELECT * FROM ref.{t} WHERE character_id IN ({_GUILD_CHARACTERS})",
+                    {"gid": gid},
+                )
+                counts[t] = cur.rowcount
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return counts
+
+
+def delete_migrated(src: sqlite3.Connection, guilds: List[str], tables: set) -> None:
+    marks = ",".join("?" * len(guilds))
+    char_ids = f"""
+        SELECT character_id FROM characters WHERE guild_id IN ({marks})
+        UNION SELECT active_character_id FROM guild_settings
+        WHERE guild_id IN ({marks}) AND active_character_id IS NOT NULL
+    """
+    with src:
+        for t in _BY_CHARACTER:
+            if t in tables:
+                src.execute(f"DELETE FROM {t} WHERE character_id IN ({char_ids})", (*guilds, *guilds))
+        for t in _BY_GUILD:
+            if t in tables:
+                src.execute(f"DELETE FROM {t} WHERE guild_id IN ({marks})", guilds)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Split guild data from the single DB into one file per guild.")
+    ap.add_argument("--db", type=Path, default=settings.DB_PATH, help="Single-file DB (becomes the reference DB).")
+    ap.add_argument("--out-dir", type=Path, default=settings.GUILD_DB_DIR)
+    ap.add_argument("--guild", action="append", help="Only these guild ids (repeatable).")
+    ap.add_argument("--delete", action="store_true", help="Remove migrated rows from the single DB afterwards.")
+    args = ap.parse_args()
+
+    if not args.db.exists():
+        raise FileNotFoundError(f"DB not found: {args.db}")
+
+    src = sqlite3.connect(str(args.db))
+    tables = existing_tables(src) & set(GUILD_TABLES)
+    guilds = args.guild or list_guilds(src, tables)
+    if not guilds:
+        print("[INFO] No guild data found.")
+        return
+    print(f"[OK] {len(guilds)} guild(s), tables: {', '.join(sorted(tables))}")
+    src.executescript(ID_SEQUENCES_SQL.read_text(encoding="utf-8"))
+
+    pool = GuildDBPool(args.db, args.out_dir, max_open=1)
+    t_all = time.perf_counter()
+    for gid in guilds:
+        t0 = time.perf_counter()
+        with pool.connection(gid) as conn:
+            counts = migrate_guild(conn, gid, tables)
+        rows = ", ".join(f"{t}={n}" for t, n in counts.items() if n)
+        print(f"  {gid}: {rows or 'no rows'} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    pool.close_all()
+
+    if args.delete:
+        delete_migrated(src, guilds, tables)
+        print("[OK] Removed migrated rows from the single DB")
+    src.close()
+
+    print(
+        f"[DONE] {len(guilds)} guild DB(s) in {args.out_dir} ({time.perf_counter() - t_all:.2f}s). "
+        f"Set COC_STORAGE_MODE=guild to use them."
+    )
+
+
+if __name__ == "__main__":
+    main()